@@ -0,0 +1,67 @@
+'''
+Benchmark full scan rates of an LmdbLayer with and without the covering prop indexes.
+'''
+import os
+import asyncio
+import tempfile
+
+from time import perf_counter as now
+
+import synapse.common as s_common
+
+import synapse.lib.lmdblayer as s_lmdblayer
+
+async def fill(layr, count):
+
+    sops = []
+    for i in range(count):
+
+        buid = os.urandom(32)
+        valu = f'{i:08d}.vertex.link'
+        tick = s_common.now()
+
+        sops.append(('prop:set', (buid, 'inet:fqdn', '', valu, valu.encode('utf8'), {})))
+        sops.append(('prop:set', (buid, 'inet:fqdn', 'zone', valu, valu.encode('utf8'), {})))
+        sops.append(('prop:set', (buid, 'inet:fqdn', '.created', tick, s_common.int64en(tick), {'univ': True})))
+
+        if len(sops) >= 10000:
+            await layr.stor(sops)
+            sops.clear()
+
+    await layr.stor(sops)
+    await layr.commit()
+
+async def scan(layr):
+
+    tick = now()
+
+    count = 0
+    async for row in layr.iterPropRows('inet:fqdn', 'zone'):
+        count += 1
+
+    took = now() - tick
+    return count / took
+
+async def benchmark(count):
+
+    with tempfile.TemporaryDirectory() as dirn:
+
+        for covering in (False, True):
+
+            path = s_common.gendir(dirn, f'covering-{covering}')
+            s_common.yamlsave({'lmdb:covering': covering}, path, 'cell.yaml')
+
+            async with await s_lmdblayer.LmdbLayer.anit(path) as layr:
+
+                await fill(layr, count)
+
+                rate = max([await scan(layr) for i in range(3)])
+                print('%50s: %10.2f rows/sec' % (f'iterPropRows (covering={covering})', rate))
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=100000)
+    opts = parser.parse_args()
+    asyncio.run(benchmark(opts.count))
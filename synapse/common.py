@@ -255,8 +255,14 @@ def genfile(*paths):
     return io.open(path, 'r+b')
 
 @contextlib.contextmanager
-def getTempDir():
-    tempdir = tempfile.mkdtemp()
+def getTempDir(dirn=None):
+    '''
+    Create a temporary directory (within dirn if specified) which is removed on exit.
+    '''
+    if dirn is not None:
+        gendir(dirn)
+
+    tempdir = tempfile.mkdtemp(dir=dirn)
 
     try:
         yield tempdir
@@ -56,6 +56,17 @@ Example Node
 })
 '''
 
+def _propsize(props):
+    '''
+    Return the approximate memory size of a layer props dict.
+    '''
+    size = 256
+    for name, valu in props.items():
+        size += 64 + len(name)
+        if isinstance(valu, str):
+            size += len(valu)
+    return size
+
 class View:
     '''
     A view represents a cortex as seen from a specific set of layers.
@@ -370,10 +381,7 @@ class CoreApi(s_cell.CellApi):
         Returns:
             (int): The number of nodes resulting from the query.
         '''
-        i = 0
-        async for _ in self.cell.eval(text, opts=opts, user=self.user):
-            i += 1
-        return i
+        return await self.cell.count(text, opts=opts, user=self.user)
 
     async def eval(self, text, opts=None):
         '''
@@ -435,6 +443,16 @@ class Cortex(s_cell.Cell):
             'doc': 'Logging log level to emit storm logs at.'
         }),
 
+        ('storm:spool:size', {
+            'type': 'int', 'defval': 100000,
+            'doc': 'The number of nodes storm dedup sets hold in memory before spilling to a temporary slab.'
+        }),
+
+        ('storm:pool:size', {
+            'type': 'int', 'defval': 0,
+            'doc': 'The number of worker processes which run readonly streamstorm queries (0 to disable).'
+        }),
+
         ('splice:sync', {
             'type': 'str', 'defval': None,
             'doc': 'A telepath URL for an upstream cortex.'
@@ -454,6 +472,16 @@ class Cortex(s_cell.Cell):
             'type': 'bool', 'defval': True,
             'doc': 'Enable cron jobs running.'
         }),
+
+        ('node:cache:size', {
+            'type': 'int', 'defval': 100000,
+            'doc': 'The maximum number of layer node props to cache across snaps (0 to disable).'
+        }),
+
+        ('node:cache:bytes', {
+            'type': 'int', 'defval': None,
+            'doc': 'An approximate memory budget in bytes for the cortex node cache.'
+        }),
     )
 
     cellapi = CoreApi
@@ -462,18 +490,14 @@ class Cortex(s_cell.Cell):
 
         await s_cell.Cell.__anit__(self, dirn)
 
-        self.layers = []
-        self.modules = {}
-        self.feedfuncs = {}
-
-        self.stormcmds = {}
-        self.stormrunts = {}
-
-        self.libroot = (None, {}, {})
-        self.bldgbuids = {} # buid -> (Node, Event)  Nodes under construction
+        self._initCoreState()
 
         self.addStormCmd(s_storm.MaxCmd)
         self.addStormCmd(s_storm.MinCmd)
+        self.addStormCmd(s_storm.TopCmd)
+        self.addStormCmd(s_storm.SortCmd)
+        self.addStormCmd(s_storm.StatsCmd)
+        self.addStormCmd(s_storm.BottomCmd)
         self.addStormCmd(s_storm.HelpCmd)
         self.addStormCmd(s_storm.IdenCmd)
         self.addStormCmd(s_storm.SpinCmd)
@@ -514,16 +538,8 @@ class Cortex(s_cell.Cell):
         self.onfini(self.agenda)
 
         # these may be used directly
-        self.model = s_datamodel.Model()
         self.view = View(self, self.layers)
 
-        self.ontagadds = collections.defaultdict(list)
-        self.ontagdels = collections.defaultdict(list)
-
-        self._runtLiftFuncs = {}
-        self._runtPropSetFuncs = {}
-        self._runtPropDelFuncs = {}
-
         await self.addCoreMods(s_modules.coremods)
 
         self.triggers = s_trigger.Triggers(self)
@@ -534,6 +550,8 @@ class Cortex(s_cell.Cell):
 
         await self.addCoreMods(mods)
 
+        await self._initStormPool()
+
         if self.conf.get('cron:enable'):
             await self.agenda.enable()
 
@@ -541,6 +559,60 @@ class Cortex(s_cell.Cell):
         self._initPushLoop()
         self._initFeedLoops()
 
+    def _initCoreState(self):
+        '''
+        Initialize the model, storm and node state used by snaps and the storm runtime.
+
+        Notes:
+            This is also used to construct the read-only cortex in a storm pool
+            worker process (see synapse.lib.stormpool.WorkerCore).
+        '''
+        self.layers = []
+        self.modules = {}
+        self.feedfuncs = {}
+
+        self.stormcmds = {}
+        self.stormrunts = {}
+
+        # raw query text -> Query and canonical plan key -> Query
+        self.querycache = s_cache.FixedCache(self._getStormQuery, size=10000)
+        self.plancache = s_cache.FixedCache(self._getStormPlan, size=10000)
+        self.planstats = {'hits': 0, 'misses': 0}
+
+        self.libroot = (None, {}, {})
+
+        # (layer, buid) -> props for layers which are only written through our snaps
+        self.nodecache = None
+        self.nodecachegen = 0
+
+        size = self.conf.get('node:cache:size')
+        if size:
+            maxbytes = self.conf.get('node:cache:bytes')
+            self.nodecache = s_cache.LruCache(None, size=size, maxbytes=maxbytes, sizefunc=_propsize)
+        self.bldgbuids = {} # buid -> (Node, Event)  Nodes under construction
+
+        self.model = s_datamodel.Model()
+
+        self.ontagadds = collections.defaultdict(list)
+        self.ontagdels = collections.defaultdict(list)
+
+        self._runtLiftFuncs = {}
+        self._runtPropSetFuncs = {}
+        self._runtPropDelFuncs = {}
+
+    async def _initStormPool(self):
+
+        self.stormpool = None
+
+        size = self.conf.get('storm:pool:size')
+        if not size:
+            return
+
+        import synapse.lib.stormpool as s_stormpool  # avoid import cycle
+
+        self.stormpool = await s_stormpool.StormPool.anit(self, size=size)
+        self.onfini(self.stormpool.fini)
+
     def _initFormCounts(self):
 
         self.counts = {}
@@ -773,6 +845,9 @@ class Cortex(s_cell.Cell):
             # Setup the fallback/default single LMDB layer
             self.layers.append(await self._makeDefaultLayer())
 
+        for layr in self.layers:
+            layr.on('layer:stor', self._onLayrStor)
+
         self.layer = self.layers[-1]
         logger.debug('Cortex using the following layers: %s\n', (''.join(f'\n   {l.dirn}' for l in self.layers)))
 
@@ -784,6 +859,7 @@ class Cortex(s_cell.Cell):
             raise s_exc.BadCmdName(name=ctor.name)
 
         self.stormcmds[ctor.name] = ctor
+        self._clearStormPlans()
 
     def getStormCmd(self, name):
         return self.stormcmds.get(name)
@@ -1211,6 +1287,14 @@ class Cortex(s_cell.Cell):
             async for node in snap.eval(text, opts=opts, user=user):
                 yield node
 
+    async def count(self, text, opts=None, user=None):
+        '''
+        Return the number of nodes which result from a storm query.
+        '''
+        await self.boss.promote('storm', user=user, info={'query': text})
+        async with await self.snap(user=user) as snap:
+            return await snap.count(text, opts=opts, user=user)
+
     @s_coro.genrhelp
     async def storm(self, text, opts=None, user=None):
         '''
@@ -1244,10 +1328,21 @@ class Cortex(s_cell.Cell):
                 # First, try text parsing. If this fails, we won't be able to get
                 # a storm runtime in the snap, so catch and pass the `err` message
                 # before handing a `fini` message along.
-                self.getStormQuery(text)
+                query = self.getStormQuery(text)
 
                 await chan.put(('init', {'tick': tick, 'text': text, 'task': synt.iden}))
 
+                if self._isPoolQuery(query, opts):
+
+                    self._logStormQuery(text, user)
+
+                    async for mesg in self.stormpool.storm(text, opts=opts):
+                        await chan.put(mesg)
+                        if mesg[0] == 'node':
+                            count += 1
+
+                    return
+
                 async with await self.snap(user=user) as snap:
 
                     snap.link(chan.put)
@@ -1286,6 +1381,15 @@ class Cortex(s_cell.Cell):
             if mesg[0] == 'fini':
                 break
 
+    def _isPoolQuery(self, query, opts):
+        '''
+        Return True if a streamstorm query should be run by the storm worker pool.
+        '''
+        if self.stormpool is None or opts is None or not opts.get('readonly'):
+            return False
+
+        return self.stormpool.canRunQuery(query)
+
     @s_coro.genrhelp
     async def iterStormPodes(self, text, opts=None, user=None):
         synt = await self.boss.promote('storm', user=user, info={'query': text})
@@ -1293,19 +1397,112 @@ class Cortex(s_cell.Cell):
             async for pode in snap.iterStormPodes(text, opts=opts, user=user):
                 yield pode
 
-    @s_cache.memoize(size=10000)
     def getStormQuery(self, text):
         '''
-        Parse storm query text and return a Query object.
+        Parse storm query text and return an initialized and optimized Query object.
+
+        Notes:
+            Queries which differ only in formatting share a single cached Query
+            whose plan is only built once.  The caches are cleared when modules,
+            the data model, or storm commands change.
         '''
+        query = self.querycache.cache.get(text)
+        if query is not None:
+            self.planstats['hits'] += 1
+            return query
+
+        return self.querycache.get(text)
+
+    def _getStormQuery(self, text):
+
         parseinfo = {
             'stormcmds': {cmd: {} for cmd in self.stormcmds.keys()},
             'modelinfo': self.model.getModelInfo(),
         }
+
         query = s_syntax.Parser(parseinfo, text).query()
+
+        plankey = query.getPlanKey()
+
+        plan = self.plancache.get(plankey)
+        if plan is not s_common.novalu:
+            self.planstats['hits'] += 1
+            return plan
+
+        self.planstats['misses'] += 1
+
         query.init(self)
+        query.optimize()
+
+        self.plancache.put(plankey, query)
         return query
 
+    def _getStormPlan(self, plankey):
+        # plans are only added by _getStormQuery() once they are initialized
+        return s_common.novalu
+
+    def _clearStormPlans(self):
+        self.querycache.clear()
+        self.plancache.clear()
+
+    async def getLayrPropsMulti(self, layr, buids):
+        '''
+        Yield (buid, props) tuples for the buids from the given layer, using the node cache.
+
+        Notes:
+            Only layers with cancache set are cached.  The entries for a buid are
+            removed by popLayrProps() whenever the layer fires layer:stor.
+        '''
+        cache = self.nodecache
+        if cache is None or not layr.cancache:
+            async for item in layr.getBuidPropsMulti(buids):
+                yield item
+            return
+
+        todo = []
+        for buid in buids:
+
+            props = cache.cached((layr, buid))
+            if props is None:
+                todo.append(buid)
+                continue
+
+            yield buid, props
+
+        if not todo:
+            return
+
+        gen = self.nodecachegen
+        async for buid, props in layr.getBuidPropsMulti(todo):
+
+            # do not cache rows which may have been read before an edit
+            if gen == self.nodecachegen:
+                cache.put((layr, buid), props)
+
+            yield buid, props
+
+    def _onLayrStor(self, mesg):
+        self.popLayrProps(mesg[1].get('layr'), mesg[1].get('sops'))
+
+    def popLayrProps(self, layr, sops):
+        '''
+        Remove the node cache entries for buids edited by the storage operations.
+        '''
+        if self.nodecache is None:
+            return
+
+        self.nodecachegen += 1
+
+        for oper in sops:
+
+            if oper[0] == 'buid:set':
+                _, oldb, newb = oper[1]
+                self.nodecache.pop((layr, oldb))
+                self.nodecache.pop((layr, newb))
+                continue
+
+            self.nodecache.pop((layr, oper[1][0]))
+
     def _logStormQuery(self, text, user):
         '''
         Log a storm query.
@@ -1450,6 +1647,7 @@ class Cortex(s_cell.Cell):
 
         # add all data models at once.
         self.model.addDataModels(mdefs)
+        self._clearStormPlans()
 
         # now that we've loaded all their models
         # we can call their init functions
@@ -1472,6 +1670,7 @@ class Cortex(s_cell.Cell):
 
         mdefs = modu.getModelDefs()
         self.model.addDataModels(mdefs)
+        self._clearStormPlans()
 
         await s_coro.ornot(modu.initCoreModule)
         await self.fire('core:module:load', module=ctor)
@@ -1494,6 +1693,16 @@ class Cortex(s_cell.Cell):
             'iden': self.iden,
             'layer': await self.layer.stat(),
             'formcounts': self.counts,
+            'node:cache': {
+                'size': len(self.nodecache) if self.nodecache is not None else 0,
+                'bytes': self.nodecache.bytes if self.nodecache is not None else 0,
+            },
+            'storm:plans': {
+                'size': len(self.plancache),
+                'hits': self.planstats.get('hits'),
+                'misses': self.planstats.get('misses'),
+            },
+            'storm:pool': self.stormpool.stat() if self.stormpool is not None else None,
         }
         return stats
 
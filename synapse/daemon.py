@@ -15,10 +15,27 @@ import synapse.lib.base as s_base
 import synapse.lib.coro as s_coro
 import synapse.lib.link as s_link
 import synapse.lib.scope as s_scope
+import synapse.lib.const as s_const
 import synapse.lib.share as s_share
 import synapse.lib.certdir as s_certdir
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.urlhelp as s_urlhelp
 
+# the budgets for a batch of generator items in a t2:yields message
+YIELDS_COUNT = 1000
+YIELDS_BYTES = s_const.mebibyte
+YIELDS_DELAY = 0.05
+
+# the serialized ('t2:yields', {'items': ...}) prefix (without the trailing nil)
+t2yields = s_msgpack.en(('t2:yields', {'items': None}))[:-1]
+
+async def _agenr(genr):
+    try:
+        for item in genr:
+            yield item
+    finally:
+        genr.close()
+
 class Sess(s_base.Base):
 
     async def __anit__(self):
@@ -26,8 +43,12 @@ class Sess(s_base.Base):
         await s_base.Base.__anit__(self)
 
         self.items = {}
+        self.feats = set()
         self.iden = s_common.guid()
 
+        # the (codec, size) compression options for the session links
+        self.zip = None
+
     def getSessItem(self, name):
         return self.items.get(name)
 
@@ -37,6 +58,121 @@ class Sess(s_base.Base):
     def popSessItem(self, name):
         return self.items.pop(name, None)
 
+class Yields:
+    '''
+    Batch generator items into t2:yields messages for a link.
+
+    Items are serialized once as they are added.  A batch is sent when it
+    reaches the count or byte budget, or when its oldest item has waited
+    for the delay.
+    '''
+    def __init__(self, link, count=YIELDS_COUNT, size=YIELDS_BYTES, delay=YIELDS_DELAY):
+
+        self.link = link
+
+        self.count = count
+        self.size = size
+        self.delay = delay
+
+        self.items = []
+        self.bytes = 0
+        self.timer = None
+
+    async def add(self, item):
+
+        byts = s_msgpack.en(item)
+
+        self.items.append(byts)
+        self.bytes += len(byts)
+
+        if len(self.items) >= self.count or self.bytes >= self.size:
+            await self.flush()
+            return
+
+        if self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.delay, self._onDelay)
+
+    def _onDelay(self):
+        self.timer = None
+        self.link.schedCoro(self._flushDelay())
+
+    async def _flushDelay(self):
+        try:
+            await self.flush()
+        except Exception:
+            # the generator loop sees the link errors on its next send
+            pass
+
+    def clear(self):
+        '''
+        Discard any pending items.
+        '''
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        self.items = []
+        self.bytes = 0
+
+    async def flush(self):
+        '''
+        Send any pending items.
+        '''
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        if not self.items:
+            return
+
+        if self.link.isfini:
+            raise s_exc.IsFini()
+
+        # the items are swapped out before the write to keep batches in order
+        byts = t2yields + s_msgpack.enarray(self.items)
+
+        self.items = []
+        self.bytes = 0
+
+        await self.link.txbyts(byts)
+
+class Credit:
+    '''
+    The number of generator items a client will accept on a pool link.
+
+    The client grants more credit with t2:credit messages as it consumes
+    items and may end the stream early with a t2:cancel message.
+    '''
+    def __init__(self, valu):
+        self.valu = valu
+        self.cancelled = False
+        self.event = asyncio.Event()
+
+    def grant(self, valu):
+        self.valu += valu
+        self.event.set()
+
+    def cancel(self):
+        self.cancelled = True
+        self.event.set()
+
+    async def take(self):
+        '''
+        Wait for and consume credit for one item.
+
+        Returns:
+            bool: False if the stream was cancelled.
+        '''
+        while self.valu <= 0 and not self.cancelled:
+            self.event.clear()
+            await self.event.wait()
+
+        if self.cancelled:
+            return False
+
+        self.valu -= 1
+        return True
+
 class Genr(s_share.Share):
 
     typename = 'genr'
@@ -151,6 +287,8 @@ class Daemon(s_base.Base):
 
             # task version 2 API
             't2:init': self._onTaskV2Init,
+            't2:credit': self._onTaskV2Credit,
+            't2:cancel': self._onTaskV2Cancel,
         }
 
         self.onfini(self._onDmonFini)
@@ -286,14 +424,22 @@ class Daemon(s_base.Base):
 
         async def rxloop():
 
-            while not link.isfini:
+            try:
+
+                while not link.isfini:
 
-                mesg = await link.rx()
-                if mesg is None:
-                    return
+                    mesg = await link.rx()
+                    if mesg is None:
+                        return
 
-                coro = self._onLinkMesg(link, mesg)
-                self.schedCoro(coro)
+                    coro = self._onLinkMesg(link, mesg)
+                    self.schedCoro(coro)
+
+            finally:
+                # release a generator which is waiting for credit
+                credit = link.get('t2:credit')
+                if credit is not None:
+                    credit.cancel()
 
         self.schedCoro(rxloop())
 
@@ -331,6 +477,8 @@ class Daemon(s_base.Base):
             'retn': (True, None),
         })
 
+        sess = None
+
         try:
 
             vers = mesg[1].get('vers')
@@ -365,6 +513,19 @@ class Daemon(s_base.Base):
 
             link.set('sess', sess)
 
+            feats = mesg[1].get('feats', ())
+            sess.feats.update(f for f in feats if f in s_telepath.telefeats)
+            reply[1]['feats'] = tuple(sorted(sess.feats))
+
+            # use the first compression codec the client asked for which we support
+            zipinfo = mesg[1].get('zip')
+            if zipinfo is not None:
+                for name in zipinfo.get('codecs', ()):
+                    if name in s_link.zipcodecs:
+                        sess.zip = (name, zipinfo.get('size', s_link.zipsize))
+                        reply[1]['zip'] = name
+                        break
+
             if isinstance(item, s_telepath.Aware):
                 item = await s_coro.ornot(item.getTeleApi, link, mesg)
                 if isinstance(item, s_base.Base):
@@ -379,6 +540,9 @@ class Daemon(s_base.Base):
 
         await link.tx(reply)
 
+        if sess is not None and sess.zip is not None:
+            link.setLinkZip(*sess.zip)
+
     async def _runTodoMeth(self, link, meth, args, kwargs):
 
         valu = meth(*args, **kwargs)
@@ -423,6 +587,9 @@ class Daemon(s_base.Base):
             if item is None:
                 raise s_exc.NoSuchObj(name=name)
 
+            if sess.zip is not None and link.zip is None:
+                link.setLinkZip(*sess.zip)
+
             s_scope.set('sess', sess)
             # TODO set user....
 
@@ -442,39 +609,11 @@ class Daemon(s_base.Base):
                 valu = await valu
 
             if isinstance(valu, types.AsyncGeneratorType):
-
-                try:
-
-                    await link.tx(('t2:genr', {}))
-
-                    async for item in valu:
-                        await link.tx(('t2:yield', {'retn': (True, item)}))
-
-                    await link.tx(('t2:yield', {'retn': None}))
-
-                except Exception as e:
-                    if not link.isfini:
-                        retn = s_common.retnexc(e)
-                        await link.tx(('t2:yield', {'retn': retn}))
-
+                await self._txGenr(link, sess, valu, credit=mesg[1].get('credit'))
                 return
 
             if isinstance(valu, types.GeneratorType):
-
-                try:
-
-                    await link.tx(('t2:genr', {}))
-
-                    for item in valu:
-                        await link.tx(('t2:yield', {'retn': (True, item)}))
-
-                    await link.tx(('t2:yield', {'retn': None}))
-
-                except Exception as e:
-                    if not link.isfini:
-                        retn = s_common.retnexc(e)
-                        await link.tx(('t2:yield', {'retn': (False, retn)}))
-
+                await self._txGenr(link, sess, _agenr(valu), credit=mesg[1].get('credit'))
                 return
 
             if isinstance(valu, s_share.Share):
@@ -493,6 +632,89 @@ class Daemon(s_base.Base):
                 retn = s_common.retnexc(e)
                 await link.tx(('t2:fini', {'retn': retn}))
 
+    async def _onTaskV2Credit(self, link, mesg):
+
+        credit = link.get('t2:credit')
+        if credit is None:
+            return
+
+        credit.grant(mesg[1].get('credit', 0))
+
+    async def _onTaskV2Cancel(self, link, mesg):
+
+        credit = link.get('t2:credit')
+        if credit is None:
+            return
+
+        credit.cancel()
+
+    async def _txGenr(self, link, sess, genr, credit=None):
+        '''
+        Send the items from an async generator on a pool link.
+
+        Items are batched in t2:yields messages if the session supports them.
+        If the session supports t2:credit and the client granted credit, the
+        generator is only advanced while the client has credit and the stream
+        ends early (with a normal t2:yield end message) when it is cancelled.
+        '''
+        yields = None
+        if 't2:yields' in sess.feats:
+            yields = Yields(link)
+
+        if credit is not None and 't2:credit' in sess.feats:
+            credit = Credit(credit)
+            link.set('t2:credit', credit)
+        else:
+            credit = None
+
+        try:
+
+            await link.tx(('t2:genr', {}))
+
+            while True:
+
+                if credit is not None:
+
+                    # the client may be waiting for pending items to grant more credit
+                    if credit.valu <= 0 and yields is not None:
+                        await yields.flush()
+
+                    if not await credit.take():
+                        if yields is not None:
+                            yields.clear()
+                        break
+
+                try:
+                    item = await genr.__anext__()
+                except StopAsyncIteration:
+                    break
+
+                if yields is not None:
+                    await yields.add(item)
+                    continue
+
+                await link.tx(('t2:yield', {'retn': (True, item)}))
+
+            if yields is not None:
+                await yields.flush()
+
+            await link.tx(('t2:yield', {'retn': None}))
+
+        except Exception as e:
+            if not link.isfini:
+                # items which were yielded before the exception are sent first
+                if yields is not None:
+                    await yields.flush()
+                retn = s_common.retnexc(e)
+                await link.tx(('t2:yield', {'retn': retn}))
+
+        finally:
+
+            if credit is not None:
+                link.set('t2:credit', None)
+
+            await genr.aclose()
+
     async def _onTaskInit(self, link, mesg):
 
         task = mesg[1].get('task')
@@ -104,10 +104,6 @@ class Prop(PropBase):
         self.type = None
         self.typedef = typedef
 
-        self.storinfo = {
-            'univ': name.startswith('.')
-        }
-
         self.univ = None
         if name.startswith('.'):
             self.univ = name
@@ -121,6 +117,11 @@ class Prop(PropBase):
 
         self.type = self.modl.getTypeClone(typedef)
 
+        self.storinfo = {
+            'univ': name.startswith('.'),
+            'ival': isinstance(self.type, s_types.Ival),
+        }
+
         self.form.props[name] = self
 
         self.modl.propsbytype[self.type.name].append(self)
@@ -149,7 +150,7 @@ class Prop(PropBase):
         # of fun failures, we'll put this off until another flag day
         if cmpr == '~=':
             return (
-                ('prop:re', (self.form.name, self.name, valu, {})),
+                ('prop:re', (self.form.name, self.name, valu, self.type.getRegexLiftInfo(valu))),
             )
 
         lops = self.type.getLiftOps('prop', cmpr, (self.form.name, self.name, valu))
@@ -211,7 +212,7 @@ class Univ(PropBase):
         # of fun failures, we'll put this off until another flag day
         if cmpr == '~=':
             return (
-                ('univ:re', (self.name, valu, {})),
+                ('univ:re', (self.name, valu, self.type.getRegexLiftInfo(valu))),
             )
 
         lops = self.type.getLiftOps('univ', cmpr, (None, self.name, valu))
@@ -254,6 +255,10 @@ class Form:
         self.props = {}     # name: Prop()
         self.defvals = {}   # name: valu
 
+        self.storinfo = {
+            'ival': isinstance(self.type, s_types.Ival),
+        }
+
     def onAdd(self, func):
         '''
         Add a callback for adding this type of node.
@@ -309,12 +314,12 @@ class Form:
     def getSetOps(self, buid, norm):
         indx = self.type.getStorIndx(norm)
         return (
-            ('prop:set', (buid, self.name, '', norm, indx, {})),
+            ('prop:set', (buid, self.name, '', norm, indx, self.storinfo)),
         )
 
     def getDelOps(self, buid):
         return (
-            ('prop:del', (buid, self.name, '', {})),
+            ('prop:del', (buid, self.name, '', self.storinfo)),
         )
 
     def getLiftOps(self, valu, cmpr='='):
@@ -332,7 +337,7 @@ class Form:
         # of fun failures, we'll put this off until another flag day
         if cmpr == '~=':
             return (
-                ('form:re', (self.name, valu, {})),
+                ('form:re', (self.name, valu, self.type.getRegexLiftInfo(valu))),
             )
 
         lops = self.type.getLiftOps('form', cmpr, (None, self.name, valu))
@@ -426,6 +431,12 @@ class Model:
 
         self.propsbytype = collections.defaultdict(list) # name: Prop()
 
+        # precomputed pivot maps (see _initPivMaps)
+        self.pivsin = {}    # formname: (Prop(), ...) props which reference the form
+        self.pivsout = {}   # formname: ((propname, formname), ...) outbound props (formname is None for ndefs)
+        self.pivsrc = {}    # (srcform, dstform): (propname, ...) props on the source which reference the dest
+        self.pivdst = {}    # (srcform, dstform): (propfull, ...) props on the dest which reference the source
+
         self._type_pends = collections.defaultdict(list)
         self._modeldef = {
             'ctors': [],
@@ -638,6 +649,37 @@ class Model:
 
         self._modelinfo.addDataModels(mods)
 
+        self._initPivMaps()
+
+    def _initPivMaps(self):
+        '''
+        Precompute the form to form pivot maps used by the storm pivot operators.
+        '''
+        pivsout = collections.defaultdict(list)
+        pivsrc = collections.defaultdict(list)
+        pivdst = collections.defaultdict(list)
+
+        for form in self.forms.values():
+
+            for name, prop in form.props.items():
+
+                if isinstance(prop.type, s_types.Ndef):
+                    pivsout[form.name].append((name, None))
+                    continue
+
+                dest = self.forms.get(prop.type.name)
+                if dest is None:
+                    continue
+
+                pivsout[form.name].append((name, dest.name))
+                pivsrc[(form.name, dest.name)].append(name)
+                pivdst[(dest.name, form.name)].append(prop.full)
+
+        self.pivsin = {name: tuple(props) for name, props in self.propsbytype.items()}
+        self.pivsout = {name: tuple(props) for name, props in pivsout.items()}
+        self.pivsrc = {key: tuple(names) for key, names in pivsrc.items()}
+        self.pivdst = {key: tuple(names) for key, names in pivdst.items()}
+
     def _addFormUniv(self, form, name, tdef, info):
 
         self._modelinfo.addUnivForm(name, form.name)
@@ -665,6 +707,8 @@ class Model:
         for form in self.forms.values():
             self._addFormUniv(form, name, tdef, info)
 
+        self._initPivMaps()
+
     def addBaseType(self, item):
         '''
         Add a Type instance to the data model.
@@ -55,6 +55,7 @@ class BadPropName(SynErr): pass
 class BadCoreName(SynErr): pass
 class BadCtorType(SynErr): pass
 class BadMesgVers(SynErr): pass
+class BadMesgFormat(SynErr): pass
 class BadInfoValu(SynErr): pass
 class BadStorValu(SynErr): pass
 class BadRuleValu(SynErr): pass
@@ -1,6 +1,7 @@
 import asyncio
 import fnmatch
 import logging
+import operator
 import collections
 
 import synapse.exc as s_exc
@@ -8,7 +9,6 @@ import synapse.glob as s_glob
 import synapse.common as s_common
 
 import synapse.lib.coro as s_coro
-import synapse.lib.cache as s_cache
 import synapse.lib.types as s_types
 import synapse.lib.stormtypes as s_stormtypes
 
@@ -101,6 +101,12 @@ class AstNode:
     def optimize(self):
         [k.optimize() for k in self.kids]
 
+    def getPlanKey(self):
+        '''
+        Return a hashable key which is equal for equivalent syntax trees.
+        '''
+        return (self.__class__.__name__, tuple(k.getPlanKey() for k in self.kids))
+
     def __iter__(self):
         for kid in self.kids:
             yield kid
@@ -110,6 +116,12 @@ class AstNode:
             for name in kid.getRuntVars(runt):
                 yield name
 
+    def isReadOnly(self):
+        '''
+        Return True if the syntax tree may be run without editing nodes.
+        '''
+        return all(k.isReadOnly() for k in self.kids)
+
 class Query(AstNode):
 
     def __init__(self, kids=()):
@@ -121,6 +133,10 @@ class Query(AstNode):
         # for options parsed from the query itself
         self.opts = {}
 
+    def getPlanKey(self):
+        opts = tuple(sorted((n, repr(v)) for (n, v) in self.opts.items()))
+        return AstNode.getPlanKey(self) + (opts,)
+
     async def run(self, runt, genr):
 
         for oper in self.kids:
@@ -132,6 +148,34 @@ class Query(AstNode):
 
             yield node, path
 
+    async def getNodeCount(self, runt, count=0, maxsize=None):
+        '''
+        Return the number of nodes the query yields if it may be counted without running it.
+
+        Args:
+            runt (synapse.lib.storm.Runtime): The storm runtime.
+            count (int): The number of inbound nodes.
+            maxsize (int): Stop counting index rows once there are at least this many nodes.
+
+        Returns:
+            (int): The number of nodes or None if the query must be run to count them.
+
+        Notes:
+            Only queries made of lift operations and node count neutral commands
+            (such as count and spin) are counted from the layer index rows.
+        '''
+        for oper in self.kids:
+            if not isinstance(oper, Oper) or not oper.isCountable(runt):
+                return None
+
+        for oper in self.kids:
+
+            count = await oper.getNodeCount(runt, count, maxsize=maxsize)
+            if count is None:
+                return None
+
+        return count
+
     async def iterNodePaths(self, runt):
 
         count = 0
@@ -145,8 +189,6 @@ class Query(AstNode):
 
             subgraph = SubGraph(rules)
 
-        self.optimize()
-
         # turtles all the way down...
         genr = runt.getInput()
 
@@ -177,6 +219,9 @@ class SubGraph:
 
         'degrees': 1,
 
+        'maxnodes': 10000,
+        'maxedges': 100000,
+
         'filters': [
             '-(#foo or #bar)',
             '-(foo:bar or baz:faz)',
@@ -203,114 +248,243 @@ class SubGraph:
 
     # nodes which were original seeds have path.meta('graph:seed')
     # all nodes have path.meta('edges') which is a list of (iden, info) tuples.
+
+    Notes:
+        The graph is expanded breadth first one degree at a time for windows of
+        inbound nodes.  Each frontier is deduplicated and every filter or pivot
+        query which only contains filter and pivot operations is run once for the
+        whole frontier.  Other queries are run for each node, up to concurrency
+        nodes at a time.  Once the maxnodes or maxedges budget is spent, the
+        remaining nodes and edges are pruned and the counts are printed.
     '''
 
     def __init__(self, rules):
 
-        self.omits = {}
         self.rules = rules
 
         self.rules.setdefault('forms', {})
         self.rules.setdefault('pivots', ())
         self.rules.setdefault('filters', ())
         self.rules.setdefault('degrees', 1)
+        self.rules.setdefault('maxnodes', None)
+        self.rules.setdefault('maxedges', None)
+        self.rules.setdefault('concurrency', 8)
 
-    async def omit(self, node):
+        self.window = 1000
 
-        answ = self.omits.get(node.buid)
-        if answ is not None:
-            return answ
-
-        for filt in self.rules.get('filters'):
-            if await node.filter(filt, user=self.user):
-                self.omits[node.buid] = True
-                return True
+    def _getFormRules(self, node):
 
         rules = self.rules['forms'].get(node.form.name)
         if rules is None:
             rules = self.rules['forms'].get('*')
 
-        if rules is None:
-            self.omits[node.buid] = False
-            return False
+        return rules
 
-        for filt in rules.get('filters', ()):
-            if await node.filter(filt, user=self.user):
-                self.omits[node.buid] = True
-                return True
+    def _getNodeQueries(self, node, name):
 
-        self.omits[node.buid] = False
-        return False
+        texts = list(self.rules.get(name))
+
+        rules = self._getFormRules(node)
+        if rules is not None:
+            texts.extend(rules.get(name, ()))
 
-    async def pivots(self, node):
+        return texts
 
-        for pivq in self.rules.get('pivots'):
+    def _isNodeLocal(self, query):
+        '''
+        Return True if the query output for a node does not depend on the other inbound nodes.
+        '''
+        return all(isinstance(oper, (FiltOper, PivotOper)) for oper in query.kids)
 
-            async for pivo in node.storm(pivq, user=self.user):
-                yield pivo
+    async def _runNodeQuery(self, runt, text, nodes):
+        '''
+        Yield (srcnode, (node, path)) tuples for a query run with each of the nodes as input.
+        '''
+        query = runt.snap.core.getStormQuery(text)
 
-        rules = self.rules['forms'].get(node.form.name)
-        if rules is None:
-            rules = self.rules['forms'].get('*')
+        if self._isNodeLocal(query):
+
+            with runt.snap.getStormRuntime(user=runt.user) as qrunt:
+
+                [qrunt.addInput(node) for node in nodes]
+
+                async for node, path in qrunt.iterStormQuery(query):
+                    yield path.nodes[0], (node, path)
 
-        if rules is None:
             return
 
-        for pivq in rules.get('pivots', ()):
-            async for pivo in node.storm(pivq, user=self.user):
-                yield pivo
+        async def genr(node):
+            async for item in node.storm(text, user=runt.user):
+                yield node, item
+
+        size = self.rules.get('concurrency')
+        for i in range(0, len(nodes), size):
+            async for item in s_coro.ordered([genr(n) for n in nodes[i:i + size]]):
+                yield item
+
+    async def _getOmits(self, runt, nodes, omits):
+        '''
+        Run the filters for any of the nodes which have not been checked and return the set of omitted buids.
+        '''
+        todo = {}
+        for node in nodes:
+            if node.buid not in omits:
+                todo.setdefault(node.buid, node)
+
+        # filter text -> list of nodes which it applies to
+        filts = collections.defaultdict(list)
+        for node in todo.values():
+            for text in self._getNodeQueries(node, 'filters'):
+                filts[text].append(node)
+
+        # a node is omitted unless a filter query yields it
+        omitted = set()
+        for text, filtnodes in filts.items():
+
+            keep = set()
+            async for srcnode, item in self._runNodeQuery(runt, text, filtnodes):
+                keep.add(srcnode.buid)
+
+            omitted.update(n.buid for n in filtnodes if n.buid not in keep)
+
+        for buid in todo.keys():
+            await omits.set(buid, buid in omitted)
+
+        return {node.buid for node in nodes if omits.get(node.buid)}
+
+    async def _getPivots(self, runt, nodes):
+        '''
+        Return a dict of buid -> list of (node, path) tuples for the pivot queries of the nodes.
+        '''
+        pivs = collections.defaultdict(list)
+        for node in nodes:
+            for text in self._getNodeQueries(node, 'pivots'):
+                pivs[text].append(node)
+
+        retn = collections.defaultdict(list)
+        for text, pivnodes in pivs.items():
+            async for srcnode, item in self._runNodeQuery(runt, text, pivnodes):
+                retn[srcnode.buid].append(item)
+
+        return retn
 
     async def run(self, runt, genr):
 
-        done = {}
         degrees = self.rules.get('degrees')
+        maxnodes = self.rules.get('maxnodes')
+        maxedges = self.rules.get('maxedges')
 
-        self.user = runt.user
+        nodecount = 0
+        edgecount = 0
 
-        async for node, path in genr:
+        prunednodes = 0
+        prunededges = 0
 
-            if await self.omit(node):
-                continue
+        async with await runt.getSpooledDict() as done, await runt.getSpooledDict() as omits:
 
-            path.meta('graph:seed', True)
+            async for chunk in s_coro.chunks(genr, size=self.window):
 
-            todo = collections.deque([(node, path, 0)])
+                omitted = await self._getOmits(runt, [node for node, path in chunk], omits)
 
-            while todo:
+                frontier = []
+                for node, path in chunk:
 
-                tnode, tpath, tdist = todo.popleft()
+                    if node.buid in omitted:
+                        continue
 
-                # filter out nodes that we've already done at
-                # the given distance or less... (best possible)
-                donedist = done.get(tnode.buid)
-                if donedist is not None and donedist <= tdist:
-                    continue
+                    path.meta('graph:seed', True)
+                    frontier.append((node, path))
 
-                done[tnode.buid] = tdist
+                dist = 0
+                while frontier:
 
-                edges = set()
-                ndist = tdist + 1
+                    # filter out nodes that we've already done at
+                    # the given distance or less... (best possible)
+                    todo = []
+                    seen = set()
+                    for node, path in frontier:
 
-                async for pivn, pivp in self.pivots(tnode):
+                        if node.buid in seen:
+                            continue
 
-                    if await self.omit(pivn):
-                        continue
+                        seen.add(node.buid)
 
-                    edges.add(pivn.iden())
+                        donedist = done.get(node.buid)
+                        if donedist is not None and donedist <= dist:
+                            continue
 
-                    if degrees is not None and ndist > degrees:
-                        continue
+                        if donedist is None and maxnodes is not None and nodecount >= maxnodes:
+                            prunednodes += 1
+                            continue
+
+                        if donedist is None:
+                            nodecount += 1
+
+                        await done.set(node.buid, dist)
+                        todo.append((node, path, donedist))
+
+                    frontier = []
+                    ndist = dist + 1
+
+                    for i in range(0, len(todo), self.window):
+
+                        window = todo[i:i + self.window]
+
+                        pivots = await self._getPivots(runt, [node for node, path, donedist in window])
+
+                        pivnodes = [pivn for items in pivots.values() for pivn, pivp in items]
+                        omitted = await self._getOmits(runt, pivnodes, omits)
+
+                        for node, path, donedist in window:
+
+                            edges = set()
+
+                            for pivn, pivp in pivots.get(node.buid, ()):
+
+                                if pivn.buid in omitted:
+                                    continue
+
+                                iden = pivn.iden()
+                                if iden not in edges:
 
-                    todo.append((pivn, pivp, ndist))
+                                    if maxedges is not None and edgecount >= maxedges:
+                                        prunededges += 1
+                                        continue
 
-                edgelist = [(iden, {}) for iden in edges]
-                tpath.meta('edges', edgelist)
+                                    edgecount += 1
+                                    edges.add(iden)
 
-                if donedist is None:
-                    yield tnode, tpath
+                                if degrees is not None and ndist > degrees:
+                                    continue
+
+                                frontier.append((pivn, pivp))
+
+                            edgelist = [(iden, {}) for iden in edges]
+                            path.meta('edges', edgelist)
+
+                            if donedist is None:
+                                yield node, path
+
+                    dist = ndist
+
+        if prunednodes or prunededges:
+            await runt.printf(f'graph pruned {prunednodes} nodes and {prunededges} edges over budget')
 
 class Oper(AstNode):
-    pass
+
+    def isCountable(self, runt):
+        '''
+        Return True if getNodeCount() may produce the node count for the operator.
+        '''
+        return False
+
+    async def getNodeCount(self, runt, count, maxsize=None):
+        '''
+        Return the number of nodes yielded for count inbound nodes or None if they must be run.
+
+        If maxsize is specified, any count of at least maxsize may be returned once it is reached.
+        '''
+        return None
 
 class SubQuery(Oper):
 
@@ -414,6 +588,23 @@ class CmdOper(Oper):
         async for item in scmd.execStormCmd(runt, genr):
             yield item
 
+    def isCountable(self, runt):
+        ctor = runt.snap.core.getStormCmd(self.kids[0].value())
+        return ctor is not None and ctor.countable
+
+    def isReadOnly(self):
+        ctor = self.core.getStormCmd(self.kids[0].value())
+        return ctor is not None and ctor.readonly
+
+    async def getNodeCount(self, runt, count, maxsize=None):
+
+        scmd = runt.snap.core.getStormCmd(self.kids[0].value())(self.kids[1].value())
+
+        if not await scmd.hasValidOpts(runt.snap):
+            return 0
+
+        return await scmd.getNodeCount(runt, count)
+
 class VarSetOper(Oper):
 
     async def run(self, runt, genr):
@@ -522,6 +713,8 @@ class CaseEntry(AstNode):
 
 class LiftOper(Oper):
 
+    countable = False
+
     async def run(self, runt, genr):
 
         async for item in genr:
@@ -530,8 +723,34 @@ class LiftOper(Oper):
         async for node in self.lift(runt):
             yield node, runt.initPath(node)
 
+    def isCountable(self, runt):
+        return self.countable
+
+    async def getNodeCount(self, runt, count, maxsize=None):
+
+        if maxsize is not None:
+
+            if count >= maxsize:
+                return count
+
+            maxsize -= count
+
+        size = await self.getLiftCount(runt, maxsize=maxsize)
+        if size is None:
+            return None
+
+        return count + size
+
+    async def getLiftCount(self, runt, maxsize=None):
+        '''
+        Return the number of nodes the lift yields or None if they can not be counted from the index rows.
+        '''
+        return None
+
 class LiftTag(LiftOper):
 
+    countable = True
+
     async def lift(self, runt):
         cmpr = '='
         valu = None
@@ -542,6 +761,15 @@ class LiftTag(LiftOper):
         async for node in runt.snap._getNodesByTag(tag, valu=valu, cmpr=cmpr):
             yield node
 
+    async def getLiftCount(self, runt, maxsize=None):
+        cmpr = '='
+        valu = None
+        tag = await self.kids[0].runtval(runt)
+        if len(self.kids) == 3:
+            cmpr = await self.kids[1].runtval(runt)
+            valu = await self.kids[2].runtval(runt)
+        return await runt.snap.getNodeCountBy('#' + tag, valu=valu, cmpr=cmpr, maxsize=maxsize)
+
 class LiftTagTag(LiftOper):
     '''
     ##foo.bar
@@ -585,6 +813,8 @@ class LiftTagTag(LiftOper):
 
 class LiftFormTag(LiftOper):
 
+    countable = True
+
     async def lift(self, runt):
 
         form = self.kids[0].value()
@@ -600,8 +830,52 @@ class LiftFormTag(LiftOper):
         async for node in runt.snap._getNodesByFormTag(form, tag, valu=valu, cmpr=cmpr):
             yield node
 
+    async def getLiftCount(self, runt, maxsize=None):
+
+        form = self.kids[0].value()
+        tag = await self.kids[1].runtval(runt)
+
+        cmpr = None
+        valu = None
+
+        if len(self.kids) == 4:
+            cmpr = self.kids[2].value()
+            valu = await self.kids[3].runtval(runt)
+
+        return await runt.snap.getNodeCountBy(f'{form}#{tag}', valu=valu, cmpr=cmpr, maxsize=maxsize)
+
 class LiftProp(LiftOper):
 
+    countable = True
+
+    def __init__(self, kids=()):
+        LiftOper.__init__(self, kids=kids)
+        self.hints = ()
+
+    def optimize(self):
+
+        LiftOper.optimize(self)
+
+        # lifting by a form only is pretty bad, maybe
+        # we can pick up a near by filter based hint...
+        if len(self.kids) == 3:
+            return
+
+        hints = []
+        for oper in self.iterright():
+
+            if isinstance(oper, FiltOper):
+                hints.extend(oper.getLiftHints())
+                continue
+
+            # we can skip other lifts but that's it...
+            if isinstance(oper, LiftOper):
+                continue
+
+            break
+
+        self.hints = tuple(hints)
+
     async def lift(self, runt):
 
         name = self.kids[0].value()
@@ -614,41 +888,101 @@ class LiftProp(LiftOper):
             valu = await self.kids[2].runtval(runt)
 
         # If its a secondary prop, there's no optimization
-        if runt.snap.model.forms.get(name) is None:
+        form = runt.snap.model.forms.get(name)
+        if form is None:
             async for node in runt.snap.getNodesBy(name, valu=valu, cmpr=cmpr):
                 yield node
             return
 
-        if cmpr is not None:
+        if cmpr is not None or not self.hints:
             async for node in runt.snap.getNodesBy(name, valu=valu, cmpr=cmpr):
                 yield node
             return
 
-        # lifting by a form only is pretty bad, maybe
-        # we can pick up a near by filter based hint...
-        for oper in self.iterright():
+        kind, full, valu = await self._getHintLift(runt, form)
 
-            if isinstance(oper, FiltOper):
+        if kind == 'tag':
+            async for node in runt.snap._getNodesByFormTag(name, full):
+                yield node
+            return
 
-                for hint in oper.getLiftHints():
+        async for node in runt.snap.getNodesBy(full, valu=valu):
+            yield node
 
-                    if hint[0] == 'tag':
-                        tagname = hint[1].get('name')
-                        async for node in runt.snap._getNodesByFormTag(name, tagname):
-                            yield node
-                        return
+    async def getLiftCount(self, runt, maxsize=None):
 
-            # we can skip other lifts but that's it...
-            if isinstance(oper, LiftOper):
+        name = self.kids[0].value()
+
+        cmpr = None
+        valu = None
+
+        if len(self.kids) == 3:
+            cmpr = self.kids[1].value()
+            valu = await self.kids[2].runtval(runt)
+
+        # lift hints only choose among lifts which yield the same nodes
+        return await runt.snap.getNodeCountBy(name, valu=valu, cmpr=cmpr, maxsize=maxsize)
+
+    async def _getHintLift(self, runt, form):
+        '''
+        Return a (kind, name, valu) tuple for the most selective lift of the form or its filter hints.
+
+        Notes:
+            The alternatives are the form#tag lift for each tag hint and the prop=valu
+            lift for each prop hint.  If the layers do not keep prop counts, the first
+            tag hint is used.
+        '''
+        lifts = []
+        for hint in self.hints:
+
+            if hint[0] == 'tag':
+                lifts.append(('tag', hint[1].get('name'), None))
                 continue
 
-            break
+            if hint[0] == 'relprop':
+                prop = form.props.get(hint[1].get('name'))
 
-        async for node in runt.snap.getNodesBy(name, valu=valu, cmpr=cmpr):
-            yield node
+            elif hint[0] == 'absprop':
+                prop = runt.snap.model.props.get(hint[1].get('name'))
+                if prop is not None and prop is not form and prop.form is not form:
+                    prop = None
+
+            else:
+                continue
+
+            if prop is not None:
+                lifts.append(('prop', prop.full, hint[1].get('valu')))
+
+        best = ('form', form.name, None)
+        bestcount = await runt.snap.getPropCount(form.name)
+
+        if bestcount is None:
+            for lift in lifts:
+                if lift[0] == 'tag':
+                    return lift
+            return best
+
+        for lift in lifts:
+
+            try:
+                if lift[0] == 'tag':
+                    count = await runt.snap.getPropCount(form.name, '#' + lift[1])
+                else:
+                    count = await runt.snap.getEqCount(lift[1], lift[2])
+
+            except s_exc.SynErr:
+                continue
+
+            if count is not None and count < bestcount:
+                best = lift
+                bestcount = count
+
+        return best
 
 class LiftPropBy(LiftOper):
 
+    countable = True
+
     async def lift(self, runt):
 
         name = self.kids[0].value()
@@ -659,79 +993,261 @@ class LiftPropBy(LiftOper):
         async for node in runt.snap.getNodesBy(name, valu, cmpr=cmpr):
             yield node
 
+    async def getLiftCount(self, runt, maxsize=None):
+
+        name = self.kids[0].value()
+        cmpr = self.kids[1].value()
+
+        valu = await self.kids[2].runtval(runt)
+
+        return await runt.snap.getNodeCountBy(name, valu, cmpr=cmpr, maxsize=maxsize)
+
 class LiftByScrape(LiftOper):
 
     def __init__(self, ndefs):
         LiftOper.__init__(self)
         self.ndefs = ndefs
 
+    def getPlanKey(self):
+        return LiftOper.getPlanKey(self) + (repr(self.ndefs),)
+
     async def lift(self, runt):
         for name, valu in self.ndefs:
             async for node in runt.snap.getNodesBy(name, valu):
                 yield node
 
+class PivotLifter:
+    '''
+    Compute the equality index lifts for the pivot values of a single query.
+
+    Lifts are memoized by (prop, valu), and values which were already normalized
+    by the type of the destination prop are encoded without calling norm() again.
+    '''
+    def __init__(self, model, size=10000):
+        self.size = size
+        self.model = model
+        self.memo = {}      # (full, valu): ((tabl, pref, rawprop), indx) or None
+        self.tmpls = {}     # full: (tabl, pref, rawprop)
+
+    def getLift(self, full, valu, srctype=None):
+        '''
+        Return a ((tabl, pref, rawprop), indx) tuple for an equality pivot to a prop or None.
+
+        Args:
+            full (str): The full name of the destination prop.
+            valu (obj): The pivot value.
+            srctype (synapse.lib.types.Type): The type which normalized the value or None.
+
+        Notes:
+            Props whose lift is anything other than a single index equality
+            return None and are lifted one value at a time.
+        '''
+        try:
+            lift = self.memo.get((full, valu), s_common.novalu)
+        except TypeError:
+            # unhashable values (from storm vars) are not memoized
+            return self._getLift(full, valu, srctype)
+
+        if lift is not s_common.novalu:
+            return lift
+
+        lift = self._getLift(full, valu, srctype)
+
+        if len(self.memo) >= self.size:
+            self.memo.clear()
+
+        self.memo[(full, valu)] = lift
+        return lift
+
+    def _getLift(self, full, valu, srctype):
+
+        prop = self.model.prop(full)
+        if prop is None:
+            raise s_exc.NoSuchProp(name=full)
+
+        tmpl = self.tmpls.get(full)
+        if tmpl is not None and srctype is not None:
+            if srctype is prop.type or (srctype.name == prop.type.name and srctype.opts == prop.type.opts):
+                return tmpl, prop.type.indxByNorm(valu)
+
+        if prop.isrunt:
+            return None
+
+        if prop.type.getLiftHintCmpr(valu, '=') is not None:
+            return None
+
+        lops = prop.getLiftOps(valu)
+        if len(lops) != 1 or lops[0][0] != 'indx':
+            return None
+
+        tabl, pref, iops = lops[0][1]
+        if len(iops) != 1 or iops[0][0] != 'eq':
+            return None
+
+        tmpl = self.tmpls[full] = (tabl, pref, prop.name)
+        return tmpl, iops[0][1]
+
 class PivotOper(Oper):
 
     def __init__(self, kids=(), isjoin=False):
         Oper.__init__(self, kids=kids)
         self.isjoin = isjoin
 
+    def getPlanKey(self):
+        return Oper.getPlanKey(self) + (self.isjoin,)
+
+    async def _iterPivots(self, runt, genr, func, onerr=None):
+        '''
+        Yield (pivo, path) tuples for the pivot targets of windows of inbound nodes.
+
+        Args:
+            runt (Runtime): The storm runtime.
+            genr: The inbound (node, path) generator.
+            func: An async function which returns a list of pivot targets for a (node, path).
+                Targets are ('ndef', ndef, mesg), ('prop', full, valu, srctype) or ('genr', genr, valu)
+                tuples.  The srctype is the Type of an already normalized prop value or None.
+            onerr: An optional async function called with (valu, exc) for bad pivot values.
+
+        Notes:
+            The targets for a window of pivwindow inbound nodes are resolved at once.  The nodes
+            for all the ndefs are loaded together and the equality lifts for each prop are sorted
+            and resolved with a single cursor pass per layer.  Pivots are still yielded in inbound
+            node order.
+        '''
+        snap = runt.snap
+        lifter = PivotLifter(snap.model)
+
+        async for chunk in s_coro.chunks(genr, size=snap.pivwindow):
+
+            todo = []
+            ndefs = []
+            eqlifts = collections.defaultdict(list)
+
+            for node, path in chunk:
+
+                targs = []
+                for targ in await func(node, path):
+
+                    if targ[0] == 'ndef':
+                        ndefs.append(targ[1])
+                        targs.append(targ)
+                        continue
+
+                    if targ[0] == 'prop':
+
+                        try:
+                            lift = lifter.getLift(targ[1], targ[2], srctype=targ[3])
+                        except (s_exc.BadTypeValu, s_exc.BadLiftValu) as e:
+                            if onerr is None:
+                                raise
+                            await onerr(targ[2], e)
+                            continue
+
+                        if lift is None:
+                            targs.append(('genr', snap.getNodesBy(targ[1], targ[2]), targ[2]))
+                            continue
+
+                        eqlifts[lift[0]].append(lift[1])
+                        targs.append(('indx',) + lift)
+                        continue
+
+                    targs.append(targ)
+
+                todo.append((node, path, targs))
+
+            pivos = iter(await snap.getNodesByNdefs(ndefs))
+
+            found = {}
+            for (tabl, pref, rawprop), indxs in eqlifts.items():
+                found[(tabl, pref, rawprop)] = await snap.getNodesByIndxEqs(tabl, pref, indxs, rawprop)
+
+            for node, path, targs in todo:
+
+                if self.isjoin:
+                    yield node, path
+
+                for targ in targs:
+
+                    if targ[0] == 'ndef':
+
+                        pivo = next(pivos)
+                        if pivo is None:
+                            if targ[2] is not None:
+                                logger.warning(f'{targ[2]} {targ[1]}')
+                            continue
+
+                        yield pivo, path.fork(pivo)
+                        continue
+
+                    if targ[0] == 'indx':
+                        for pivo in found[targ[1]].get(targ[2], ()):
+                            yield pivo, path.fork(pivo)
+                        continue
+
+                    try:
+                        async for pivo in targ[1]:
+                            yield pivo, path.fork(pivo)
+                    except (s_exc.BadTypeValu, s_exc.BadLiftValu) as e:
+                        if onerr is None:
+                            raise
+                        await onerr(targ[2], e)
+
+    def _getPivotWarn(self, runt):
+        '''
+        Return an onerr function which fires storm warnings for bad pivot values.
+        '''
+        warned = False
+
+        async def onerr(valu, e):
+            nonlocal warned
+            if not warned:
+                logger.warning(f'Caught error during pivot: {e.items()}')
+                warned = True
+            items = e.items()
+            mesg = items.pop('mesg', '')
+            mesg = ': '.join((f'{e.__class__.__qualname__} [{repr(valu)}] during pivot', mesg))
+            await runt.snap.fire('warn', mesg=mesg, **items)
+
+        return onerr
+
 class PivotOut(PivotOper):
     '''
     -> *
     '''
     async def run(self, runt, genr):
 
-        async for node, path in genr:
-
-            if self.isjoin:
-                yield node, path
+        async def pivots(node, path):
 
             # <syn:tag> -> * is "from tags to nodes with tags"
             if node.form.name == 'syn:tag':
-
-                async for pivo in runt.snap._getNodesByTag(node.ndef[1]):
-                    yield pivo, path.fork(pivo)
-
-                continue
+                return [('genr', runt.snap._getNodesByTag(node.ndef[1]), node.ndef[1])]
 
             if isinstance(node.form.type, s_types.Edge):
-                n2def = node.get('n2')
-                pivo = await runt.snap.getNodeByNdef(n2def)
-                if pivo is None:
-                    logger.warning(f'Missing node corresponding to ndef {n2def} on edge')
-                    continue
-                yield pivo, path.fork(pivo)
-                continue
+                return [('ndef', node.get('n2'), 'Missing node corresponding to ndef on edge')]
 
-            for name, prop in node.form.props.items():
+            targs = []
+            for name, form in runt.snap.model.pivsout.get(node.form.name, ()):
 
                 valu = node.get(name)
                 if valu is None:
                     continue
 
                 # if the outbound prop is an ndef...
-                if isinstance(prop.type, s_types.Ndef):
-                    pivo = await runt.snap.getNodeByNdef(valu)
-                    if pivo is None:
-                        continue
-
-                    yield pivo, path.fork(pivo)
-                    continue
-
-                form = runt.snap.model.forms.get(prop.type.name)
                 if form is None:
-                    continue
-
-                pivo = await runt.snap.getNodeByNdef((form.name, valu))
-                if pivo is None:
+                    targs.append(('ndef', valu, None))
                     continue
 
                 # avoid self references
-                if pivo.buid == node.buid:
+                ndef = (form, valu)
+                if ndef == node.ndef:
                     continue
 
-                yield pivo, path.fork(pivo)
+                targs.append(('ndef', ndef, None))
+
+            return targs
+
+        async for pivo, path in self._iterPivots(runt, genr, pivots):
+            yield pivo, path
 
 class PivotToTags(PivotOper):
     '''
@@ -760,24 +1276,14 @@ class PivotToTags(PivotOper):
 
         else:
 
-            def filter(x):
-                return x == mval
-
-        async for node, path in genr:
-
-            if self.isjoin:
-                yield node, path
-
-            for name, valu in node.getTags(leaf=leaf):
-
-                if not filter(name):
-                    continue
+            def filter(x):
+                return x == mval
 
-                pivo = await runt.snap.getNodeByNdef(('syn:tag', name))
-                if pivo is None:
-                    continue
+        async def pivots(node, path):
+            return [('ndef', ('syn:tag', name), None) for name, valu in node.getTags(leaf=leaf) if filter(name)]
 
-                yield pivo, path.fork(pivo)
+        async for pivo, path in self._iterPivots(runt, genr, pivots):
+            yield pivo, path
 
 class PivotIn(PivotOper):
     '''
@@ -786,29 +1292,17 @@ class PivotIn(PivotOper):
 
     async def run(self, runt, genr):
 
-        async for node, path in genr:
-
-            if self.isjoin:
-                yield node, path
+        async def pivots(node, path):
 
-            # if it's a graph edge, use :n2
+            # if it's a graph edge, use :n1
             if isinstance(node.form.type, s_types.Edge):
-
-                ndef = node.get('n1')
-
-                pivo = await runt.snap.getNodeByNdef(ndef)
-                if pivo is None:
-                    continue
-
-                yield pivo, path.fork(pivo)
-
-                continue
+                return [('ndef', node.get('n1'), None)]
 
             name, valu = node.ndef
+            return [('prop', prop.full, valu, node.form.type) for prop in runt.snap.model.pivsin.get(name, ())]
 
-            for prop in runt.snap.model.propsbytype.get(name, ()):
-                async for pivo in runt.snap.getNodesBy(prop.full, valu):
-                    yield pivo, path.fork(pivo)
+        async for pivo, path in self._iterPivots(runt, genr, pivots):
+            yield pivo, path
 
 class PivotInFrom(PivotOper):
 
@@ -824,83 +1318,65 @@ class PivotInFrom(PivotOper):
         if isinstance(form.type, s_types.Edge):
 
             full = form.name + ':n2'
+            ndeftype = runt.snap.model.type('ndef')
 
-            async for node, path in genr:
-
-                if self.isjoin:
-                    yield node, path
+            async def pivots(node, path):
+                return [('prop', full, node.ndef, ndeftype)]
 
-                async for pivo in runt.snap.getNodesBy(full, node.ndef):
-                    yield pivo, path.fork(pivo)
+            async for pivo, path in self._iterPivots(runt, genr, pivots):
+                yield pivo, path
 
             return
 
         # edge <- form
-        async for node, path in genr:
-
-            if self.isjoin:
-                yield node, path
+        async def pivots(node, path):
 
             if not isinstance(node.form.type, s_types.Edge):
-                continue
+                return ()
 
             # dont bother traversing edges to the wrong form
             if node.get('n1:form') != form.name:
-                continue
-
-            n1def = node.get('n1')
+                return ()
 
-            pivo = await runt.snap.getNodeByNdef(n1def)
-            if pivo is None:
-                continue
+            return [('ndef', node.get('n1'), None)]
 
-            yield pivo, path.fork(pivo)
+        async for pivo, path in self._iterPivots(runt, genr, pivots):
+            yield pivo, path
 
 class FormPivot(PivotOper):
 
     async def run(self, runt, genr):
-        warned = False
+
         name = self.kids[0].value()
 
         prop = runt.snap.model.props.get(name)
         if prop is None:
             raise s_exc.NoSuchProp(name=name)
 
+        onerr = self._getPivotWarn(runt)
+        ndeftype = runt.snap.model.type('ndef')
+
         # -> baz:ndef
         if isinstance(prop.type, s_types.Ndef):
 
-            async for node, path in genr:
-
-                if self.isjoin:
-                    yield node, path
+            async def pivots(node, path):
+                return [('prop', prop.full, node.ndef, ndeftype)]
 
-                async for pivo in runt.snap.getNodesBy(prop.full, node.ndef):
-                    yield pivo, path.fork(pivo)
+            async for pivo, path in self._iterPivots(runt, genr, pivots):
+                yield pivo, path
 
             return
 
         if not prop.isform:
 
             # plain old pivot...
-            async for node, path in genr:
-
-                if self.isjoin:
-                    yield node, path
+            async def pivots(node, path):
+                return [('prop', prop.full, node.ndef[1], node.form.type)]
 
-                valu = node.ndef[1]
+            async for pivo, path in self._iterPivots(runt, genr, pivots, onerr=onerr):
+                yield pivo, path
 
-                # TODO cache/bypass normalization in loop!
-                try:
-                    async for pivo in runt.snap.getNodesBy(prop.full, valu):
-                        yield pivo, path.fork(pivo)
-                except (s_exc.BadTypeValu, s_exc.BadLiftValu) as e:
-                    if not warned:
-                        logger.warning(f'Caught error during pivot: {e.items()}')
-                        warned = True
-                    items = e.items()
-                    mesg = items.pop('mesg', '')
-                    mesg = ': '.join((f'{e.__class__.__qualname__} [{repr(valu)}] during pivot', mesg))
-                    await runt.snap.fire('warn', mesg=mesg, **items)
+            return
 
         # form -> form pivot is nonsensical. Lets help out...
 
@@ -909,124 +1385,80 @@ class FormPivot(PivotOper):
 
             full = prop.name + ':n1'
 
-            async for node, path in genr:
-
-                if self.isjoin:
-                    yield node, path
+            async def pivots(node, path):
+                return [('prop', full, node.ndef, ndeftype)]
 
-                async for pivo in runt.snap.getNodesBy(full, node.ndef):
-                    yield pivo, path.fork(pivo)
+            async for pivo, path in self._iterPivots(runt, genr, pivots):
+                yield pivo, path
 
             return
 
         # form name and type name match
-        formprop = prop
         destform = prop.name
 
-        # TODO: both of these should be precomputed in the model
-
-        @s_cache.memoize()
-        def getsrc(form):
-            names = []
-            for name, prop in form.props.items():
-                if prop.type.name == destform:
-                    names.append(name)
-            return names
-
-        @s_cache.memoize()
-        def getdst(form):
-            # formprop is really a form here...
-            names = []
-            for name, prop in formprop.props.items():
-                if prop.type.name == form.type.name:
-                    names.append(prop.full)
-            return names
-
-        async for node, path in genr:
+        pivsrc = runt.snap.model.pivsrc
+        pivdst = runt.snap.model.pivdst
 
-            if self.isjoin:
-                yield node, path
+        async def pivots(node, path):
 
             # <syn:tag> -> <form> is "from tags to nodes" pivot
             if node.form.name == 'syn:tag' and prop.isform:
-                async for pivo in runt.snap.getNodesBy(f'{prop.name}#{node.ndef[1]}'):
-                    yield pivo, path.fork(pivo)
-
-                continue
+                return [('genr', runt.snap.getNodesBy(f'{prop.name}#{node.ndef[1]}'), node.ndef[1])]
 
             # if the source node is a graph edge, use n2
             if isinstance(node.form.type, s_types.Edge):
 
                 n2def = node.get('n2')
                 if n2def[0] != destform:
-                    continue
-
-                pivo = await runt.snap.getNodeByNdef(node.get('n2'))
-                yield pivo, path.fork(pivo)
+                    return ()
 
-                continue
+                return [('ndef', n2def, None)]
 
-            names = getsrc(node.form)
+            names = pivsrc.get((node.form.name, destform))
             if names:
-                for name in names:
-
-                    valu = node.get(name)
-                    if valu is None:
-                        continue
-
-                    async for pivo in runt.snap.getNodesBy(prop.name, valu):
-                        yield pivo, path.fork(pivo)
-
-                continue
+                return [('prop', prop.name, node.get(name), node.form.props[name].type)
+                        for name in names if node.get(name) is not None]
 
-            names = getdst(node.form)
+            names = pivdst.get((node.form.name, destform))
             if names:
-                for name in names:
-                    found = True
-
-                    valu = node.ndef[1]
-                    async for pivo in runt.snap.getNodesBy(name, valu):
-                        yield pivo, path.fork(pivo)
-
-                continue
+                return [('prop', name, node.ndef[1], node.form.type) for name in names]
 
             raise s_exc.NoSuchPivot(n1=node.form.name, n2=destform)
 
+        async for pivo, path in self._iterPivots(runt, genr, pivots, onerr=onerr):
+            yield pivo, path
+
 class PropPivotOut(PivotOper):
 
     async def run(self, runt, genr):
 
         name = self.kids[0].value()
 
-        async for node, path in genr:
+        async def pivots(node, path):
 
             prop = node.form.props.get(name)
             if prop is None:
-                continue
+                return ()
 
             valu = node.get(name)
             if valu is None:
-                continue
+                return ()
 
             # ndef pivot out syntax...
             # :ndef -> *
             if isinstance(prop.type, s_types.Ndef):
-                pivo = await runt.snap.getNodeByNdef(valu)
-                if pivo is None:
-                    logger.warning(f'Missing node corresponding to ndef {valu}')
-                    continue
-                yield pivo, path.fork(pivo)
-                continue
+                return [('ndef', valu, 'Missing node corresponding to ndef')]
 
             # :ipv4 -> *
-            ndef = (prop.type.name, valu)
-            pivo = await runt.snap.getNodeByNdef(ndef)
-            yield pivo, path.fork(pivo)
+            return [('ndef', (prop.type.name, valu), None)]
+
+        async for pivo, path in self._iterPivots(runt, genr, pivots):
+            yield pivo, path
 
 class PropPivot(PivotOper):
 
     async def run(self, runt, genr):
-        warned = False
+
         name = self.kids[1].value()
 
         prop = runt.snap.model.props.get(name)
@@ -1035,35 +1467,69 @@ class PropPivot(PivotOper):
 
         # TODO if we are pivoting to a form, use ndef!
 
-        async for node, path in genr:
+        async def pivots(node, path):
 
-            if self.isjoin:
-                yield node, path
+            # values of node props are already normalized by the prop type
+            srctype = None
+            if isinstance(self.kids[0], PropValue):
+                srcprop, valu = await self.kids[0].getPropAndValu(path)
+                if srcprop is not None:
+                    srctype = srcprop.type
+            else:
+                valu = await self.kids[0].compute(path)
 
-            valu = await self.kids[0].compute(path)
             if valu is None:
-                continue
+                return ()
 
-            # TODO cache/bypass normalization in loop!
-            try:
-                async for pivo in runt.snap.getNodesBy(prop.full, valu):
-                    yield pivo, path.fork(pivo)
-            except (s_exc.BadTypeValu, s_exc.BadLiftValu) as e:
-                if not warned:
-                    logger.warning(f'Caught error during pivot: {e.items()}')
-                    warned = True
-                items = e.items()
-                mesg = items.pop('mesg', '')
-                mesg = ': '.join((f'{e.__class__.__qualname__} [{repr(valu)}] during pivot', mesg))
-                await runt.snap.fire('warn', mesg=mesg, **items)
+            return [('prop', prop.full, valu, srctype)]
+
+        async for pivo, path in self._iterPivots(runt, genr, pivots, onerr=self._getPivotWarn(runt)):
+            yield pivo, path
 
 class Cond(AstNode):
 
     def getLiftHints(self):
         return ()
 
+    def getCondCost(self):
+        '''
+        Return a relative estimate of the cost of evaluating the condition for a node.
+        '''
+        return 10
+
+    def isReadOnly(self):
+        '''
+        Return True if evaluating the condition can not edit nodes or otherwise have side effects.
+        '''
+        todo = [self]
+        while todo:
+
+            astn = todo.pop()
+            if isinstance(astn, (SubqCond, FuncCall)):
+                return False
+
+            todo.extend(astn.kids)
+
+        return True
+
     def getCondEval(self, runt):
-        raise s_exc.NoSuchImpl(name=f'{self.__class__.__name__}.evaluate()')
+        '''
+        Return an async cond(node, path) function which wraps getCondSync() by default.
+        '''
+        sync = self.getCondSync(runt)
+        if sync is None:
+            raise s_exc.NoSuchImpl(name=f'{self.__class__.__name__}.evaluate()')
+
+        async def cond(node, path):
+            return sync(node, path)
+
+        return cond
+
+    def getCondSync(self, runt):
+        '''
+        Return a synchronous cond(node, path) function or None if the condition must be awaited.
+        '''
+        return None
 
 class SubqCond(Cond):
 
@@ -1077,6 +1543,17 @@ class SubqCond(Cond):
             '<=': self._subqCondLe,
             '!=': self._subqCondNe,
         }
+        self.opers = {
+            '=': operator.eq,
+            '>': operator.gt,
+            '<': operator.lt,
+            '>=': operator.ge,
+            '<=': operator.le,
+            '!=': operator.ne,
+        }
+
+    def getCondCost(self):
+        return 1000
 
     async def _runSubQuery(self, runt, node, path):
         size = 1
@@ -1177,6 +1654,32 @@ class SubqCond(Cond):
 
         return cond
 
+    def _isNodeStatic(self):
+        '''
+        Return True if the subquery yields the same nodes for any inbound node.
+
+        Notes:
+            Only a subquery which begins with a lift by constant values and
+            has no variable or relative property references is static.
+        '''
+        opers = self.kids[0].kids
+        if not opers or not isinstance(opers[0], LiftOper):
+            return False
+
+        if not all(isinstance(k, (Const, TagName)) for k in opers[0].kids):
+            return False
+
+        todo = list(opers)
+        while todo:
+
+            astn = todo.pop()
+            if isinstance(astn, (VarValue, VarDeref, FuncCall, TagVar, PropValue, TagPropValue, RelProp)):
+                return False
+
+            todo.extend(astn.kids)
+
+        return True
+
     def getCondEval(self, runt):
 
         if len(self.kids) == 3:
@@ -1185,7 +1688,40 @@ class SubqCond(Cond):
             if ctor is None:
                 raise s_exc.NoSuchCmpr(cmpr=cmpr, type='subquery')
 
-            return ctor(runt)
+            subq = self.kids[0]
+            oper = self.opers.get(cmpr)
+            runcond = ctor(runt)
+
+            # the subquery is run for each node if it may yield different nodes per node
+            if not self._isNodeStatic():
+                return runcond
+
+            # the count does not depend on the inbound node so it is only
+            # made again if a larger value needs a count past the last cap
+            memo = {}
+
+            async def cond(node, path):
+
+                valu = int(await self.kids[2].compute(path))
+
+                # any count above valu compares the same way
+                maxsize = valu + 1
+
+                size = memo.get('size')
+                if not memo or (size is not None and size >= memo.get('maxsize') and maxsize > memo.get('maxsize')):
+
+                    # the inbound node is always the first subquery result
+                    size = await subq.getNodeCount(runt, count=1, maxsize=maxsize)
+
+                    memo['size'] = size
+                    memo['maxsize'] = maxsize
+
+                if size is None:
+                    return await runcond(node, path)
+
+                return oper(size, valu)
+
+            return cond
 
         subq = self.kids[0]
         async def cond(node, path):
@@ -1200,6 +1736,9 @@ class OrCond(Cond):
     '''
     <cond> or <cond>
     '''
+    def getCondCost(self):
+        return self.kids[0].getCondCost() + self.kids[1].getCondCost()
+
     def getCondEval(self, runt):
 
         cond0 = self.kids[0].getCondEval(runt)
@@ -1214,6 +1753,18 @@ class OrCond(Cond):
 
         return cond
 
+    def getCondSync(self, runt):
+
+        cond0 = self.kids[0].getCondSync(runt)
+        cond1 = self.kids[1].getCondSync(runt)
+        if cond0 is None or cond1 is None:
+            return None
+
+        def cond(node, path):
+            return cond0(node, path) or cond1(node, path)
+
+        return cond
+
 class AndCond(Cond):
     '''
     <cond> and <cond>
@@ -1223,6 +1774,23 @@ class AndCond(Cond):
         h1 = self.kids[1].getLiftHints()
         return h0 + h1
 
+    def getCondCost(self):
+        return self.kids[0].getCondCost() + self.kids[1].getCondCost()
+
+    def optimize(self):
+
+        Cond.optimize(self)
+
+        # conditions with side effects (such as edits in a subquery) run in the order given
+        if not (self.kids[0].isReadOnly() and self.kids[1].isReadOnly()):
+            return
+
+        # evaluate the cheaper (and usually more selective) condition first
+        if self.kids[1].getCondCost() < self.kids[0].getCondCost():
+            cond0, cond1 = self.kids
+            self.setKid(0, cond1)
+            self.setKid(1, cond0)
+
     def getCondEval(self, runt):
 
         cond0 = self.kids[0].getCondEval(runt)
@@ -1237,10 +1805,24 @@ class AndCond(Cond):
 
         return cond
 
+    def getCondSync(self, runt):
+
+        cond0 = self.kids[0].getCondSync(runt)
+        cond1 = self.kids[1].getCondSync(runt)
+        if cond0 is None or cond1 is None:
+            return None
+
+        def cond(node, path):
+            return cond0(node, path) and cond1(node, path)
+
+        return cond
+
 class NotCond(Cond):
     '''
     not <cond>
     '''
+    def getCondCost(self):
+        return self.kids[0].getCondCost()
 
     def getCondEval(self, runt):
 
@@ -1251,6 +1833,17 @@ class NotCond(Cond):
 
         return cond
 
+    def getCondSync(self, runt):
+
+        kidcond = self.kids[0].getCondSync(runt)
+        if kidcond is None:
+            return None
+
+        def cond(node, path):
+            return not kidcond(node, path)
+
+        return cond
+
 class TagCond(Cond):
     '''
     #foo.bar
@@ -1261,29 +1854,38 @@ class TagCond(Cond):
             ('tag', {'name': name}),
         )
 
-    def getCondEval(self, runt):
+    def getCondCost(self):
+        return 1
+
+    def getCondSync(self, runt):
 
         name = self.kids[0].value()
 
-        async def cond(node, path):
+        def cond(node, path):
             return node.tags.get(name) is not None
 
         return cond
 
 class HasRelPropCond(Cond):
 
-    def getCondEval(self, runt):
+    def getCondCost(self):
+        return 1
+
+    def getCondSync(self, runt):
 
         name = self.kids[0].value()
 
-        async def cond(node, path):
+        def cond(node, path):
             return node.has(name)
 
         return cond
 
 class HasAbsPropCond(Cond):
 
-    def getCondEval(self, runt):
+    def getCondCost(self):
+        return 1
+
+    def getCondSync(self, runt):
 
         name = self.kids[0].value()
 
@@ -1293,12 +1895,12 @@ class HasAbsPropCond(Cond):
 
         if prop.isform:
 
-            async def cond(node, path):
+            def cond(node, path):
                 return node.form.name == prop.name
 
             return cond
 
-        async def cond(node, path):
+        def cond(node, path):
 
             if node.form.name != prop.form.name:
                 return False
@@ -1309,7 +1911,19 @@ class HasAbsPropCond(Cond):
 
 class AbsPropCond(Cond):
 
-    def getCondEval(self, runt):
+    def getLiftHints(self):
+
+        if self.kids[1].value() != '=' or not isinstance(self.kids[2], Const):
+            return ()
+
+        return (
+            ('absprop', {'name': self.kids[0].value(), 'valu': self.kids[2].value()}),
+        )
+
+    def getCondCost(self):
+        return 2
+
+    def _getPropCmpr(self, runt):
 
         name = self.kids[0].value()
         cmpr = self.kids[1].value()
@@ -1322,11 +1936,20 @@ class AbsPropCond(Cond):
         if ctor is None:
             raise s_exc.NoSuchCmpr(cmpr=cmpr, name=prop.type.name)
 
+        return prop, ctor
+
+    def getCondEval(self, runt):
+
+        if isinstance(self.kids[2], Const):
+            return Cond.getCondEval(self, runt)
+
+        prop, ctor = self._getPropCmpr(runt)
+
         if prop.isform:
 
             async def cond(node, path):
 
-                if node.ndef[0] != name:
+                if node.ndef[0] != prop.name:
                     return False
 
                 val1 = node.ndef[1]
@@ -1346,11 +1969,49 @@ class AbsPropCond(Cond):
 
         return cond
 
+    def getCondSync(self, runt):
+
+        if not isinstance(self.kids[2], Const):
+            return None
+
+        prop, ctor = self._getPropCmpr(runt)
+        valu = self.kids[2].value()
+
+        # the comparator is built on first use to raise for bad values only when a node has the prop
+        funcs = []
+        def getfunc():
+            if not funcs:
+                funcs.append(ctor(valu))
+            return funcs[0]
+
+        if prop.isform:
+
+            def cond(node, path):
+
+                if node.ndef[0] != prop.name:
+                    return False
+
+                return getfunc()(node.ndef[1])
+
+            return cond
+
+        def cond(node, path):
+
+            val1 = node.get(prop.name)
+            if val1 is None:
+                return False
+
+            return getfunc()(val1)
+
+        return cond
+
 class TagValuCond(Cond):
 
-    def getCondEval(self, runt):
+    def getCondCost(self):
+        return 3
+
+    def _getCmprCtor(self, runt):
 
-        name = self.kids[0].value()
         cmpr = self.kids[1].value()
 
         ival = runt.snap.model.type('ival')
@@ -1359,16 +2020,15 @@ class TagValuCond(Cond):
         if cmprctor is None:
             raise s_exc.NoSuchCmpr(cmpr=cmpr, name=ival.name)
 
-        if isinstance(self.kids[2], Const):
-
-            valu = self.kids[2].value()
+        return cmprctor
 
-            cmpr = cmprctor(valu)
+    def getCondEval(self, runt):
 
-            async def cond(node, path):
-                return cmpr(node.tags.get(name))
+        if isinstance(self.kids[2], Const):
+            return Cond.getCondEval(self, runt)
 
-            return cond
+        name = self.kids[0].value()
+        cmprctor = self._getCmprCtor(runt)
 
         # it's a runtime value...
         async def cond(node, path):
@@ -1377,12 +2037,48 @@ class TagValuCond(Cond):
 
         return cond
 
+    def getCondSync(self, runt):
+
+        if not isinstance(self.kids[2], Const):
+            return None
+
+        name = self.kids[0].value()
+        func = self._getCmprCtor(runt)(self.kids[2].value())
+
+        def cond(node, path):
+            return func(node.tags.get(name))
+
+        return cond
+
 class RelPropCond(Cond):
     '''
     :foo:bar <cmpr> <value>
     '''
+    def getLiftHints(self):
+
+        if self.kids[0].ispiv:
+            return ()
+
+        if self.kids[1].value() != '=' or not isinstance(self.kids[2], Const):
+            return ()
+
+        return (
+            ('relprop', {'name': self.kids[0].name, 'valu': self.kids[2].value()}),
+        )
+
+    def getCondCost(self):
+
+        # implicit pivots lift a node per pivot
+        if self.kids[0].ispiv:
+            return 100
+
+        return 2
+
     def getCondEval(self, runt):
 
+        if not self.kids[0].ispiv and isinstance(self.kids[2], Const):
+            return Cond.getCondEval(self, runt)
+
         cmpr = self.kids[1].value()
 
         async def cond(node, path):
@@ -1398,6 +2094,34 @@ class RelPropCond(Cond):
 
         return cond
 
+    def getCondSync(self, runt):
+
+        if self.kids[0].ispiv or not isinstance(self.kids[2], Const):
+            return None
+
+        name = self.kids[0].name
+        cmpr = self.kids[1].value()
+        xval = self.kids[2].value()
+
+        # the relative prop may differ in type by form so cache a comparator per prop
+        funcs = {}
+
+        def cond(node, path):
+
+            valu = node.get(name)
+            if valu is None:
+                return False
+
+            prop = node.form.props.get(name)
+
+            func = funcs.get(prop.full)
+            if func is None:
+                func = funcs[prop.full] = prop.type.getCmprCtor(cmpr)(xval)
+
+            return func(valu)
+
+        return cond
+
 class FiltOper(Oper):
 
     def getLiftHints(self):
@@ -1410,6 +2134,22 @@ class FiltOper(Oper):
     async def run(self, runt, genr):
 
         must = self.kids[0].value() == '+'
+
+        sync = self.kids[1].getCondSync(runt)
+        if sync is not None:
+
+            count = 0
+            async for node, path in genr:
+
+                if bool(sync(node, path)) == must:
+                    yield node, path
+
+                count += 1
+                if count % runt.snap.filtpace == 0:
+                    await asyncio.sleep(0)
+
+            return
+
         cond = self.kids[1].getCondEval(runt)
 
         async for node, path in genr:
@@ -1451,6 +2191,9 @@ class Value(RunValue):
         RunValue.__init__(self, kids=kids)
         self.valu = valu
 
+    def getPlanKey(self):
+        return RunValue.getPlanKey(self) + (repr(self.valu),)
+
     async def runtval(self, runt):
         return self.value()
 
@@ -1631,7 +2374,9 @@ class AbsProp(Value):
         return f'AbsProp: {self.valu}'
 
 class Edit(Oper):
-    pass
+
+    def isReadOnly(self):
+        return False
 
 class EditNodeAdd(Edit):
 
@@ -99,6 +99,113 @@ class FixedCache:
         self.fifo.clear()
         self.cache.clear()
 
+class LruCache:
+    '''
+    A least recently used cache with an optional (approximate) byte budget.
+
+    Args:
+        callback (func): Called (or awaited) with a key to produce a missing value.
+        size (int): The maximum number of entries to keep.
+        maxbytes (int): The maximum total size of the entries to keep or None.
+        sizefunc (func): Returns the approximate size in bytes of a value.
+
+    Notes:
+        Values returned by the callback which are s_common.novalu are not cached.
+    '''
+    def __init__(self, callback, size=10000, maxbytes=None, sizefunc=None):
+
+        self.size = size
+        self.maxbytes = maxbytes
+        self.sizefunc = sizefunc
+        self.callback = callback
+        self.iscorocall = asyncio.iscoroutinefunction(self.callback)
+
+        self.bytes = 0
+        self.sizes = {}
+        self.cache = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.cache)
+
+    def cached(self, key):
+        '''
+        Return the cached value for key (or None) without calling the callback.
+        '''
+        valu = self.cache.get(key, s_common.novalu)
+        if valu is s_common.novalu:
+            return None
+
+        self.cache.move_to_end(key)
+        return valu
+
+    def pop(self, key):
+
+        valu = self.cache.pop(key, None)
+        self.bytes -= self.sizes.pop(key, 0)
+
+        return valu
+
+    def put(self, key, val):
+
+        self.pop(key)
+
+        self.cache[key] = val
+
+        if self.sizefunc is not None:
+            size = self.sizefunc(val)
+            self.sizes[key] = size
+            self.bytes += size
+
+        self._evict()
+
+    def get(self, key):
+        if self.iscorocall:
+            raise s_exc.BadOperArg('cache was initialized with coroutine.  Must use aget')
+
+        valu = self.cache.get(key, s_common.novalu)
+        if valu is not s_common.novalu:
+            self.cache.move_to_end(key)
+            return valu
+
+        valu = self.callback(key)
+        if valu is s_common.novalu:
+            return valu
+
+        self.put(key, valu)
+        return valu
+
+    async def aget(self, key):
+        if not self.iscorocall:
+            raise s_exc.BadOperArg('cache was initialized with non coroutine.  Must use get')
+
+        valu = self.cache.get(key, s_common.novalu)
+        if valu is not s_common.novalu:
+            self.cache.move_to_end(key)
+            return valu
+
+        valu = await self.callback(key)
+        if valu is s_common.novalu:
+            return valu
+
+        self.put(key, valu)
+        return valu
+
+    def clear(self):
+        self.bytes = 0
+        self.sizes.clear()
+        self.cache.clear()
+
+    def _evict(self):
+
+        while len(self.cache) > self.size:
+            self.pop(next(iter(self.cache)))
+
+        if self.maxbytes is None:
+            return
+
+        while self.bytes > self.maxbytes and self.cache:
+            self.pop(next(iter(self.cache)))
+
 class TagGlobs:
     '''
     An object that manages multiple tag globs and values for caching.
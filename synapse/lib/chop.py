@@ -103,3 +103,107 @@ def stormstring(s):
     s = s.replace('\\', '\\\\')
     s = s.replace('"', '\\"')
     return s
+
+remetas = set('.^$*+?{}[]\\|()')
+requants = set('*?{')
+
+@s_cache.memoize(size=10000)
+def regexpref(text):
+    '''
+    Return the literal prefix which any string matching an anchored regex must begin with.
+
+    Args:
+        text (str): A regular expression such as "^foo.*".
+
+    Returns:
+        (str): The literal prefix (which may be empty) or None if the regex is not anchored.
+    '''
+    if not text.startswith('^'):
+        return None
+
+    # alternation or inline flags may invalidate the anchor (or the literal)
+    if '|' in text or '(?' in text:
+        return None
+
+    chars = []
+
+    offs = 1
+    size = len(text)
+
+    while offs < size:
+
+        char = text[offs]
+
+        if char == '\\':
+
+            nextc = text[offs + 1:offs + 2]
+            # escaped alnum chars are classes (\d \w) or special (\A \b)
+            if not nextc or nextc.isalnum():
+                break
+
+            chars.append(nextc)
+            offs += 2
+
+        elif char in remetas:
+
+            # a quantifier makes the previous literal optional
+            if char in requants and chars:
+                chars.pop()
+
+            break
+
+        else:
+            chars.append(char)
+            offs += 1
+
+    return ''.join(chars)
+
+@s_cache.memoize(size=10000)
+def regexsufx(text):
+    '''
+    Return the literal suffix which any string matching an end anchored regex must end with.
+
+    Args:
+        text (str): A regular expression such as ".*foo$".
+
+    Returns:
+        (str): The literal suffix (which may be empty) or None if the regex is not end anchored.
+    '''
+    def escaped(offs):
+        # an odd number of preceding backslashes escapes the char at offs
+        count = 0
+        while offs > 0 and text[offs - 1] == '\\':
+            count += 1
+            offs -= 1
+        return count % 2 == 1
+
+    if not text.endswith('$') or escaped(len(text) - 1):
+        return None
+
+    if '|' in text or '(?' in text:
+        return None
+
+    chars = []
+
+    offs = len(text) - 2
+    while offs >= 0:
+
+        char = text[offs]
+
+        if escaped(offs):
+
+            # escaped alnum chars are classes (\d \w) or special (\A \b)
+            if char.isalnum():
+                break
+
+            chars.append(char)
+            offs -= 2
+            continue
+
+        if char in remetas:
+            break
+
+        chars.append(char)
+        offs -= 1
+
+    return ''.join(reversed(chars))
@@ -44,6 +44,86 @@ async def genr2agenr(func, *args, qsize=100, **kwargs):
 
         await task
 
+async def chunks(genr, size=100):
+    '''
+    Divide an async generator into lists of up to size items.
+    '''
+    chunk = []
+
+    async for item in genr:
+
+        chunk.append(item)
+
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+async def ordered(genrs, size=1000):
+    '''
+    Yield the items from each async generator in turn while consuming all of them concurrently.
+
+    Args:
+        genrs (list): A list of async generators.
+        size (int): The maximum number of items to prefetch from each generator.
+
+    Notes:
+        Each generator (after the first) is drained into a bounded queue by its own
+        task, so the total latency is that of the slowest generator rather than the
+        sum of all of them.  Exceptions are raised when the failed generator is reached.
+    '''
+    genrs = list(genrs)
+    if len(genrs) == 1:
+        async for item in genrs[0]:
+            yield item
+        return
+
+    loop = asyncio.get_running_loop()
+
+    async def fill(genr, queue):
+        try:
+            async for item in genr:
+                await queue.put((True, item))
+            await queue.put((False, None))
+
+        except asyncio.CancelledError:
+            raise
+
+        except Exception as e:
+            await queue.put((False, e))
+
+    queues = []
+    tasks = []
+
+    for genr in genrs[1:]:
+        queue = asyncio.Queue(maxsize=size)
+        tasks.append(loop.create_task(fill(genr, queue)))
+        queues.append(queue)
+
+    try:
+
+        async for item in genrs[0]:
+            yield item
+
+        for queue in queues:
+
+            while True:
+
+                ok, item = await queue.get()
+                if ok:
+                    yield item
+                    continue
+
+                if item is not None:
+                    raise item
+
+                break
+
+    finally:
+        [task.cancel() for task in tasks]
+
 def executor(func, *args, **kwargs):
 
     def real():
@@ -97,12 +97,21 @@ class EditAtom:
 
         await self.rendevous()
 
-        for node in self.mybldgbuids.values():
+        for i, node in enumerate(self.mybldgbuids.values()):
+
+            # give other tasks some time during large (bulk) commits
+            if i and not i % 100:
+                await asyncio.sleep(0)
+
             await snap.splice('node:add', ndef=node.ndef)
             await node.form.wasAdded(node)
 
         # fire all his prop sets
-        for node, prop, oldv, valu in self.npvs:
+        for i, (node, prop, oldv, valu) in enumerate(self.npvs):
+
+            if i and not i % 100:
+                await asyncio.sleep(0)
+
             await snap.splice('prop:set', ndef=node.ndef, prop=prop.name, valu=valu, oldv=oldv)
             await prop.wasSet(node, oldv)
 
@@ -2,6 +2,7 @@
 The layer library contains the base Layer object and helpers used for
 cortex construction.
 '''
+import time
 import asyncio
 import logging
 import collections
@@ -14,7 +15,39 @@ import synapse.lib.msgpack as s_msgpack
 
 logger = logging.getLogger(__name__)
 
-FAIR_ITERS = 10  # every this many rows, yield CPU to other tasks
+FAIR_ITERS = 10  # every this many rows, check if we should yield CPU to other tasks
+FAIR_TIME = 0.005  # the number of seconds a scan may run before yielding CPU to other tasks
+
+class FairPace:
+    '''
+    Track the elapsed time of a scan loop to yield CPU to other tasks.
+
+    Example:
+
+        pace = FairPace()
+        for row in rows:
+            if pace.due():
+                await asyncio.sleep(0)
+    '''
+    def __init__(self):
+        self.count = 0
+        self.tick = time.monotonic()
+
+    def due(self):
+
+        # the caller yielded CPU after our last call
+        if self.tick is None:
+            self.tick = time.monotonic()
+
+        self.count += 1
+        if self.count % FAIR_ITERS:
+            return False
+
+        if time.monotonic() - self.tick < FAIR_TIME:
+            return False
+
+        self.tick = None
+        return True
 
 class Encoder(collections.defaultdict):
     def __missing__(self, name):
@@ -26,9 +59,9 @@ class Utf8er(collections.defaultdict):
 
 class LayerApi(s_cell.PassThroughApi):
     allowed_methods = [
-        'getLiftRows', 'stor', 'commit', 'abort', 'getBuidProps',
+        'getLiftRows', 'stor', 'commit', 'abort', 'getBuidProps', 'getBuidPropsMulti',
         'iterFormRows', 'iterPropRows', 'iterUnivRows', 'getOffset',
-        'setOffset', 'initdb', 'splicelistAppend', 'splices', 'stat'
+        'setOffset', 'initdb', 'splicelistAppend', 'splices', 'stat', 'getPropCount', 'getIndxCount',
     ]
     async def getModelVers(self):
         return await self.cell.getModelVers()
@@ -48,6 +81,7 @@ class Layer(s_cell.Cell):
 
         self._lift_funcs = {
             'indx': self._liftByIndx,
+            'indx:eqs': self._liftByIndxEqs,
             'prop:re': self._liftByPropRe,
             'univ:re': self._liftByUnivRe,
             'form:re': self._liftByFormRe,
@@ -70,6 +104,7 @@ class Layer(s_cell.Cell):
 
         self.fresh = False
         self.canrev = not readonly
+        self.cancache = not readonly
         self.readonly = readonly
         self.spliced = asyncio.Event(loop=self.loop)
         self.splicelist = []
@@ -91,72 +126,101 @@ class Layer(s_cell.Cell):
     async def stor(self, sops):
         '''
         Execute a series of storage operations.
+
+        Notes:
+            A layer:stor event is fired with the sops once they are stored (or
+            fail) so that any cached props for the edited buids may be dropped.
         '''
+        try:
+            await self._storSops(sops)
+        finally:
+            await self.fire('layer:stor', layr=self, sops=sops)
+
+    async def _storSops(self, sops):
         for oper in sops:
             func = self._stor_funcs.get(oper[0])
             if func is None:
                 raise s_exc.NoSuchStor(name=oper[0])
             await func(oper)
 
-    async def _liftByFormRe(self, oper):
-
-        form, query, info = oper[1]
-
-        regx = regex.compile(query)
-
-        count = 0
+    async def getBuidPropsMulti(self, buids):
+        '''
+        Yield (buid, props) tuples for each of the given buids.
 
-        async for buid, valu in self.iterFormRows(form):
+        Notes:
+            Layer implementations should override this to avoid a round trip per buid.
+        '''
+        for buid in buids:
+            yield buid, await self.getBuidProps(buid)
 
-            count += 1
-            if not count % FAIR_ITERS:
-                await asyncio.sleep(0)  # give other tasks a chance
+    async def getPropCount(self, form, prop=''):
+        '''
+        Return the number of rows for a form, prop, univ prop or tag in this layer.
 
-            # for now... but maybe repr eventually?
-            if not isinstance(valu, str):
-                valu = str(valu)
+        Args:
+            form (str): The form name (or None for a univ prop or tag across all forms).
+            prop (str): The relative prop name ('' for the form itself, '#tag' for a tag).
 
-            if not regx.search(valu):
-                continue
+        Returns:
+            (int): The row count or None if the layer does not keep prop counts.
+        '''
+        return None
 
-            yield (buid, )
+    async def getIndxCount(self, name, pref, indx):
+        '''
+        Return the number of rows for an index value or None if the layer can not count them.
+        '''
+        return None
 
-    async def _liftByUnivRe(self, oper):
+    async def _liftByIndxEqs(self, oper):
+        '''
+        Yield (buid, indx) rows for each of a list of equality index values.
 
-        prop, query, info = oper[1]
+        Notes:
+            Layer implementations should override this to resolve all of the
+            index values in a single pass.
+        '''
+        # ('indx:eqs', (<dbname>, <prefix>, (<indx>, ...)))
+        name, pref, indxs = oper[1]
 
-        regx = regex.compile(query)
+        for indx in sorted(set(indxs)):
+            async for row in self._liftByIndx(('indx', (name, pref, (('eq', indx),)))):
+                yield row[0], indx
 
-        count = 0
+    async def _liftByFormRe(self, oper):
 
-        async for buid, valu in self.iterUnivRows(prop):
+        form, query, info = oper[1]
 
-            count += 1
-            if not count % FAIR_ITERS:
-                await asyncio.sleep(0)  # give other tasks a chance
+        rows = self.iterFormRows(form, pref=info.get('pref', b''))
+        async for row in self._iterReRows(rows, query):
+            yield row
 
-            # for now... but maybe repr eventually?
-            if not isinstance(valu, str):
-                valu = str(valu)
+    async def _liftByUnivRe(self, oper):
 
-            if not regx.search(valu):
-                continue
+        prop, query, info = oper[1]
 
-            yield (buid, )
+        rows = self.iterUnivRows(prop, pref=info.get('pref', b''))
+        async for row in self._iterReRows(rows, query):
+            yield row
 
     async def _liftByPropRe(self, oper):
         # ('regex', (<form>, <prop>, <regex>, info))
         form, prop, query, info = oper[1]
 
+        # anchored regexes on string types may include an index prefix to scan
+        rows = self.iterPropRows(form, prop, pref=info.get('pref', b''))
+        async for row in self._iterReRows(rows, query):
+            yield row
+
+    async def _iterReRows(self, rows, query):
+
         regx = regex.compile(query)
 
-        count = 0
+        pace = FairPace()
 
-        # full table scan...
-        async for buid, valu in self.iterPropRows(form, prop):
+        async for buid, valu in rows:
 
-            count += 1
-            if not count % FAIR_ITERS:
+            if pace.due():
                 await asyncio.sleep(0)  # give other tasks a chance
 
             # for now... but maybe repr eventually?
@@ -166,7 +230,6 @@ class Layer(s_cell.Cell):
             if not regx.search(valu):
                 continue
 
-            # yield buid, form, prop, valu
             yield (buid, )
 
     # TODO: Hack until we get interval trees pushed all the way through
@@ -182,51 +245,32 @@ class Layer(s_cell.Cell):
 
     async def _liftByPropIval(self, oper):
         form, prop, ival = oper[1]
-        count = 0
-        async for buid, valu in self.iterPropRows(form, prop):
-            count += 1
-
-            if not count % FAIR_ITERS:
-                await asyncio.sleep(0)
-
-            if type(valu) not in (list, tuple):
-                continue
-
-            if len(valu) != 2:
-                continue
-
-            if not self._cmprIval(ival, valu):
-                continue
-
-            yield (buid, )
+        async for row in self._iterIvalRows(self.iterPropRows(form, prop), ival):
+            yield row
 
     async def _liftByUnivIval(self, oper):
         _, prop, ival = oper[1]
-        count = 0
-        async for buid, valu in self.iterUnivRows(prop):
-            count += 1
-
-            if not count % FAIR_ITERS:
-                await asyncio.sleep(0)
-
-            if type(valu) not in (list, tuple):
-                continue
+        async for row in self._iterIvalRows(self.iterUnivRows(prop), ival):
+            yield row
 
-            if len(valu) != 2:
-                continue
+    async def _liftByFormIval(self, oper):
+        _, form, ival = oper[1]
+        async for row in self._iterIvalRows(self.iterFormRows(form), ival):
+            yield row
 
-            if not self._cmprIval(ival, valu):
-                continue
+    async def _iterIvalRows(self, rows, ival):
+        '''
+        Yield (buid,) rows whose value overlaps the ival from a full scan.
 
-            yield (buid, )
+        Notes:
+            Layer implementations with an ordered index should override the
+            _liftBy*Ival methods to avoid scanning every row.
+        '''
+        pace = FairPace()
 
-    async def _liftByFormIval(self, oper):
-        _, form, ival = oper[1]
-        count = 0
-        async for buid, valu in self.iterFormRows(form):
-            count += 1
+        async for buid, valu in rows:
 
-            if not count % FAIR_ITERS:
+            if pace.due():
                 await asyncio.sleep(0)
 
             if type(valu) not in (list, tuple):
@@ -263,6 +307,24 @@ class Layer(s_cell.Cell):
     async def getBuidProps(self, buid):  # pragma: no cover
         raise NotImplementedError
 
+    async def initIvalIndx(self, props):  # pragma: no cover
+        '''
+        Build the interval index for the given (form, prop) ival props and all tags.
+        '''
+        raise NotImplementedError
+
+    async def initCovering(self):  # pragma: no cover
+        '''
+        Build the covering (value carrying) prop indexes for the layer.
+        '''
+        raise NotImplementedError
+
+    async def initPropCounts(self):  # pragma: no cover
+        '''
+        Count the existing rows for each prop and tag in the layer.
+        '''
+        raise NotImplementedError
+
     async def _storPropSet(self, oper):  # pragma: no cover
         raise NotImplementedError
 
@@ -284,21 +346,34 @@ class Layer(s_cell.Cell):
     async def _rowsByRange(self, curs, pref, valu):  # pragma: no cover
         raise NotImplementedError
 
-    async def iterFormRows(self, form):  # pragma: no cover
+    async def iterFormRows(self, form, pref=b''):  # pragma: no cover
         '''
         Iterate (buid, valu) rows for the given form in this layer.
+
+        Args:
+            form (str): The form name.
+            pref (bytes): An optional index prefix used to restrict the rows.
         '''
         raise NotImplementedError
 
-    async def iterPropRows(self, form, prop):  # pragma: no cover
+    async def iterPropRows(self, form, prop, pref=b''):  # pragma: no cover
         '''
         Iterate (buid, valu) rows for the given form:prop in this layer.
+
+        Args:
+            form (str): The form name.
+            prop (str): The relative property name.
+            pref (bytes): An optional index prefix used to restrict the rows.
         '''
         raise NotImplementedError
 
-    async def iterUnivRows(self, prop):  # pragma: no cover
+    async def iterUnivRows(self, prop, pref=b''):  # pragma: no cover
         '''
         Iterate (buid, valu) rows for the given universal prop
+
+        Args:
+            prop (str): The universal property name.
+            pref (bytes): An optional index prefix used to restrict the rows.
         '''
         raise NotImplementedError
 
@@ -1,14 +1,18 @@
+import zlib
 import socket
 import asyncio
 import logging
 
 import collections
 
+import msgpack
+
 logger = logging.getLogger(__name__)
 
 import synapse.exc as s_exc
 import synapse.glob as s_glob
 import synapse.common as s_common
+import synapse.dyndeps as s_dyndeps
 
 import synapse.lib.base as s_base
 import synapse.lib.coro as s_coro
@@ -18,12 +22,53 @@ import synapse.lib.msgpack as s_msgpack
 
 readsize = 10 * s_const.megabyte
 
+# the stream reader buffer limit ( reading from the socket pauses at twice this )
+bufsize = s_const.mebibyte
+
+# messages smaller than this many bytes are not compressed
+zipsize = s_const.kibibyte
+
+# compressed messages may not decompress to more than this many bytes
+unzipsize = 256 * s_const.mebibyte
+
+def _getZipCodecs():
+
+    # name -> (msgpack ext type code, compress, decompress) in order of preference
+    # the decompress functions return at most size bytes
+    codecs = collections.OrderedDict()
+
+    zstd = s_dyndeps.getDynMod('zstandard')
+    if zstd is not None:  # pragma: no cover
+
+        def zstdunzip(byts, size):
+            return zstd.ZstdDecompressor().stream_reader(byts).read(size)
+
+        codecs['zstd'] = (3, zstd.ZstdCompressor().compress, zstdunzip)
+
+    lz4 = s_dyndeps.getDynMod('lz4.frame')
+    if lz4 is not None:  # pragma: no cover
+
+        def lz4unzip(byts, size):
+            return lz4.LZ4FrameDecompressor().decompress(byts, max_length=size)
+
+        codecs['lz4'] = (2, lz4.compress, lz4unzip)
+
+    def zlibunzip(byts, size):
+        return zlib.decompressobj().decompress(byts, size)
+
+    codecs['zlib'] = (1, zlib.compress, zlibunzip)
+
+    return codecs
+
+zipcodecs = _getZipCodecs()
+zipbycode = {code: decomp for (code, comp, decomp) in zipcodecs.values()}
+
 async def connect(host, port, ssl=None):
     '''
     Async connect and return a Link().
     '''
     info = {'host': host, 'port': port, 'ssl': ssl}
-    reader, writer = await asyncio.open_connection(host, port, ssl=ssl)
+    reader, writer = await asyncio.open_connection(host, port, ssl=ssl, limit=bufsize)
     return await Link.anit(reader, writer, info=info)
 
 async def listen(host, port, onlink, ssl=None):
@@ -36,7 +81,7 @@ async def listen(host, port, onlink, ssl=None):
         link = await Link.anit(reader, writer)
         link.schedCoro(onlink(link))
 
-    server = await asyncio.start_server(onconn, host=host, port=port, ssl=ssl)
+    server = await asyncio.start_server(onconn, host=host, port=port, ssl=ssl, limit=bufsize)
     return server
 
 class Link(s_base.Base):
@@ -78,6 +123,10 @@ class Link(s_base.Base):
 
         self.unpk = s_msgpack.Unpk()
 
+        # compressed messages are only sent or received once enabled
+        self.zip = None
+        self.zipsize = zipsize
+
         async def fini():
             self.writer.close()
 
@@ -89,6 +138,27 @@ class Link(s_base.Base):
         async with self._drain_lock:
             await self.writer.drain()
 
+    def setLinkZip(self, name, size=zipsize):
+        '''
+        Compress transmitted messages which are at least size bytes.
+
+        Args:
+            name (str): The name of a codec in zipcodecs.
+            size (int): The minimum serialized message size to compress.
+
+        Notes:
+            A compressed message is sent as a msgpack ext type which wraps
+            the compressed message bytes.  Only enable compression once the
+            peer is known to support the codec.  Compressed messages received
+            before compression is enabled are rejected.
+        '''
+        codec = zipcodecs.get(name)
+        if codec is None:
+            raise s_exc.BadOptValu(name='zip', valu=name, mesg=f'Unknown compression codec: {name}')
+
+        self.zip = codec
+        self.zipsize = size
+
     async def tx(self, mesg):
         '''
         Async transmit routine which will wait for writer drain().
@@ -96,7 +166,19 @@ class Link(s_base.Base):
         if self.isfini:
             raise s_exc.IsFini()
 
-        byts = s_msgpack.en(mesg)
+        await self.txbyts(s_msgpack.en(mesg))
+
+    async def txbyts(self, byts):
+        '''
+        Transmit an already serialized message ( compressing it if enabled ).
+        '''
+        if self.isfini:
+            raise s_exc.IsFini()
+
+        if self.zip is not None and len(byts) >= self.zipsize:
+            code, comp, decomp = self.zip
+            byts = s_msgpack.en(msgpack.ExtType(code, comp(byts)))
+
         try:
 
             self.writer.write(byts)
@@ -118,18 +200,13 @@ class Link(s_base.Base):
         return await self.reader.read(size)
 
     async def recvsize(self, size):
-        byts = b''
-        while size:
 
-            recv = await self.reader.read(size)
-            if not recv:
-                await self.fini()
-                return None
-
-            size -= len(recv)
-            byts += recv
+        try:
+            return await self.reader.readexactly(size)
 
-        return byts
+        except asyncio.IncompleteReadError:
+            await self.fini()
+            return None
 
     async def rx(self):
 
@@ -146,6 +223,10 @@ class Link(s_base.Base):
                     return None
 
                 for size, mesg in self.feed(byts):
+
+                    if isinstance(mesg, msgpack.ExtType):
+                        mesg = self._unzip(mesg)
+
                     self.rxqu.append(mesg)
 
             except (BrokenPipeError, ConnectionResetError) as e:
@@ -164,6 +245,21 @@ class Link(s_base.Base):
 
         return self.rxqu.popleft()
 
+    def _unzip(self, mesg):
+
+        if self.zip is None:
+            raise s_exc.BadMesgFormat(mesg='Compressed message received before compression was enabled.')
+
+        unzip = zipbycode.get(mesg.code)
+        if unzip is None:
+            raise s_exc.BadMesgFormat(mesg=f'Unknown compressed message code: {mesg.code}')
+
+        byts = unzip(mesg.data, unzipsize + 1)
+        if len(byts) > unzipsize:
+            raise s_exc.BadMesgFormat(mesg=f'Compressed message exceeds {unzipsize} bytes.')
+
+        return s_msgpack.un(byts)
+
     def get(self, name, defval=None):
         '''
         Get a property from the Link info.
@@ -3,9 +3,11 @@ The layer library contains the base Layer object and helpers used for
 cortex construction.
 '''
 import os
+import asyncio
 import logging
 
 import synapse.exc as s_exc
+import synapse.common as s_common
 
 import synapse.lib.const as s_const
 import synapse.lib.lmdbslab as s_lmdbslab
@@ -23,6 +25,31 @@ MAX_INDEX_LEN = 256
 # The layer map size can start much lower because the underlying slab auto-grows.
 LMDB_LAYER_DEFAULT_MAP_SIZE = 512 * s_const.mebibyte
 
+# The ival index stores each interval in the smallest aligned time bucket which contains it.
+# Each level has buckets 16x larger than the one before, starting at 2**10 msec (~1 sec).
+IVAL_SHIFTS = tuple(range(10, 70, 4))
+
+def ivalindx(indx):
+    '''
+    Return the <level><bucket><min><max> ival index bytes for a <min><max> ival index.
+    '''
+    minv = int.from_bytes(indx[:8], 'big')
+    maxv = int.from_bytes(indx[8:], 'big')
+
+    # the ival max is exclusive
+    lastv = max(minv, maxv - 1)
+
+    for level, shift in enumerate(IVAL_SHIFTS):
+        bukt = minv >> shift
+        if bukt == lastv >> shift:
+            return bytes((level,)) + bukt.to_bytes(8, 'big') + indx
+
+def timeindx(tick):
+    '''
+    Encode a time value the same way as synapse.lib.types.Time.indx().
+    '''
+    return (tick + 0x8000000000000000).to_bytes(8, 'big')
+
 class LmdbLayer(s_layer.Layer):
     '''
     A layer implements btree indexed storage for a cortex.
@@ -37,6 +64,10 @@ class LmdbLayer(s_layer.Layer):
         ('lmdb:growsize', {'type': 'int', 'defval': None,
                            'doc': 'The amount in bytes to grow the DB file when full.  Defaults to doubling'}),
         ('lmdb:readahead', {'type': 'bool', 'defval': True}),
+        ('lmdb:covering', {'type': 'bool', 'defval': False,
+                           'doc': 'Store prop values in the prop indexes of a new layer to speed up full scans.'}),
+        ('lmdb:sync', {'type': 'str', 'defval': 'always',
+                       'doc': 'The commit durability mode (always, periodic or none).  See lmdbslab.Slab.'}),
     )
 
     async def __anit__(self, dirn, readonly=False):
@@ -50,9 +81,10 @@ class LmdbLayer(s_layer.Layer):
         readahead = self.conf.get('lmdb:readahead')
         maxsize = self.conf.get('lmdb:maxsize')
         growsize = self.conf.get('lmdb:growsize')
+        sync = self.conf.get('lmdb:sync')
 
         self.layrslab = await s_lmdbslab.Slab.anit(path, max_dbs=128, map_size=mapsize, maxsize=maxsize, growsize=growsize,
-                                               writemap=True, readahead=readahead, readonly=readonly)
+                                               writemap=True, readahead=readahead, readonly=readonly, sync=sync)
 
         self.onfini(self.layrslab.fini)
 
@@ -61,6 +93,12 @@ class LmdbLayer(s_layer.Layer):
         self.utf8 = s_layer.Utf8er()
         self.encoder = s_layer.Encoder()
 
+        # storage operations which may be accumulated into a Batch
+        self._edit_funcs = {
+            'prop:set': self._editPropSet,
+            'prop:del': self._editPropDel,
+        }
+
         self.tid = s_threads.iden()
 
         self.bybuid = await self.initdb('bybuid') # <buid><prop>=<valu>
@@ -72,6 +110,300 @@ class LmdbLayer(s_layer.Layer):
         self.splicedb = await self.initdb('splices')
         self.splicelog = s_slabseqn.SlabSeqn(self.layrslab, 'splices')
 
+        # the optional "covering" indexes carry the prop value to allow full scans without a bybuid join
+        self.covering = False
+        self.bypropvalu = None
+        self.byunivvalu = None
+
+        if self.fresh and self.conf.get('lmdb:covering') and not readonly:
+            await self._initCoverDbs()
+            self._setCovering()
+
+        elif self.layrslab.get(b'layer:covering') is not None:
+            await self._initCoverDbs()
+            self.covering = True
+
+        # the ival index allows @= lifts without a scan of every row
+        self.bypropival = None
+        self.byunivival = None
+
+        if self.fresh and not readonly:
+            self.layrslab.put(b'layer:ivalindx', b'\x01')
+
+        self.ivalindx = self.layrslab.get(b'layer:ivalindx') is not None
+
+        # writable layers maintain the index (but only use it once it has been built)
+        if self.ivalindx or not readonly:
+            self.bypropival = await self.initdb('byprop:ival', dupsort=True) # <form>00<prop>00<ivalindx>=<buid>
+            self.byunivival = await self.initdb('byuniv:ival', dupsort=True) # <prop>00<ivalindx>=<buid>
+
+        # the prop counts are maintained the same way (but only used once they have been counted)
+        if self.fresh and not readonly:
+            self.layrslab.put(b'layer:propcounts', b'\x01')
+
+        self.propcounted = self.layrslab.get(b'layer:propcounts') is not None
+
+        self.propcounts = {}
+        self.bypropcount = None
+
+        if self.propcounted or not readonly:
+
+            self.bypropcount = await self.initdb('prop:counts') # <form>00<prop>00=<count> / <prop>00=<count>
+
+            for lkey, lval in self.layrslab.scanByFull(db=self.bypropcount):
+                self.propcounts[lkey] = s_common.int64un(lval)
+
+    async def initIvalIndx(self, props):
+        '''
+        Build the ival index from the existing rows in the layer.
+
+        Args:
+            props (set): A set of (form, prop) tuples for ival props (tags are always included).
+
+        Notes:
+            This is run by synapse.lib.migrate.Migration.addIvalIndx().  The index is maintained
+            by storage operations as long as the layer is writable, but it is only used by lifts
+            once it has been built.
+        '''
+        if self.ivalindx:
+            return
+
+        self.layrslab.dropdb(self.bypropival)
+        self.layrslab.dropdb(self.byunivival)
+
+        count = 0
+
+        lastbuid = None
+        buidrows = []
+
+        for lkey, lval in self.layrslab.scanByFull(db=self.bybuid):
+
+            count += 1
+            if not count % 1000:
+                await asyncio.sleep(0)
+
+            buid = lkey[:32]
+            if buid != lastbuid:
+                self._putIvalRows(lastbuid, buidrows, props)
+                lastbuid = buid
+                buidrows.clear()
+
+            buidrows.append((lkey[32:], lval))
+
+        self._putIvalRows(lastbuid, buidrows, props)
+
+        self.layrslab.put(b'layer:ivalindx', b'\x01')
+        self.ivalindx = True
+
+    def _putIvalRows(self, buid, rows, props):
+
+        form = None
+        for penc, lval in rows:
+            if penc[0] == 42:
+                form = penc[1:].decode('utf8')
+                break
+
+        if form is None:
+            return
+
+        fenc = self.encoder[form]
+        pvvalu = s_msgpack.en((buid,))
+
+        for penc, lval in rows:
+
+            valu, indx = s_msgpack.un(lval)
+            if len(indx) != 16:
+                continue
+
+            if penc[0] == 42:
+                prop = ''
+            else:
+                prop = penc.decode('utf8')
+
+            if penc[0] != 35 and (form, prop) not in props: # "#tag"
+                continue
+
+            ivalkey = self.encoder[prop] + ivalindx(indx)
+            self.layrslab.put(fenc + ivalkey, pvvalu, dupdata=True, db=self.bypropival)
+
+            if penc[0] in (46, 35): # ".univ" or "#tag"
+                self.layrslab.put(ivalkey, pvvalu, dupdata=True, db=self.byunivival)
+
+    async def initPropCounts(self):
+        '''
+        Count the existing rows for each prop, univ prop and tag in the layer.
+
+        Notes:
+            This is run by synapse.lib.migrate.Migration.addPropCounts().  The counts
+            are maintained by storage operations as long as the layer is writable, but
+            they are only returned by getPropCount() once they have been counted.
+        '''
+        if self.propcounted:
+            return
+
+        self.layrslab.dropdb(self.bypropcount)
+        self.propcounts.clear()
+
+        count = 0
+
+        lastbuid = None
+        buidrows = []
+
+        for lkey, lval in self.layrslab.scanByFull(db=self.bybuid):
+
+            count += 1
+            if not count % 1000:
+                await asyncio.sleep(0)
+
+            buid = lkey[:32]
+            if buid != lastbuid:
+                self._addPropCounts(buidrows)
+                lastbuid = buid
+                buidrows.clear()
+
+            buidrows.append(lkey[32:])
+
+        self._addPropCounts(buidrows)
+
+        rows = [(lkey, s_common.int64en(valu)) for lkey, valu in sorted(self.propcounts.items())]
+        self.layrslab.putmulti(rows, db=self.bypropcount)
+
+        self.layrslab.put(b'layer:propcounts', b'\x01')
+        self.propcounted = True
+
+    def _addPropCounts(self, rows):
+
+        form = None
+        for penc in rows:
+            if penc[0] == 42:
+                form = penc[1:].decode('utf8')
+                break
+
+        if form is None:
+            return
+
+        fenc = self.encoder[form]
+
+        for penc in rows:
+
+            if penc[0] == 42:
+                lkey = fenc + b'\x00'
+            else:
+                lkey = fenc + penc + b'\x00'
+
+            self.propcounts[lkey] = self.propcounts.get(lkey, 0) + 1
+
+            if penc[0] in (46, 35): # ".univ" or "#tag"
+                lkey = penc + b'\x00'
+                self.propcounts[lkey] = self.propcounts.get(lkey, 0) + 1
+
+    def _incPropCount(self, batch, lkey, valu):
+        newv = self.propcounts.get(lkey, 0) + valu
+        self.propcounts[lkey] = newv
+        batch.put(lkey, s_common.int64en(newv), self.bypropcount)
+
+    async def getPropCount(self, form, prop=''):
+
+        if not self.propcounted:
+            return None
+
+        if form is None:
+            return self.propcounts.get(self.encoder[prop], 0)
+
+        return self.propcounts.get(self.encoder[form] + self.encoder[prop], 0)
+
+    async def getIndxCount(self, name, pref, indx):
+
+        db = self.dbs.get(name)
+        if db is None:
+            raise s_exc.NoSuchName(name=name)
+
+        return self.layrslab.countByDups(pref + indx, db=db)
+
+    async def _initCoverDbs(self):
+        self.bypropvalu = await self.initdb('byprop:valu') # <form>00<prop>00<indx><buid>=<valu>
+        self.byunivvalu = await self.initdb('byuniv:valu') # <prop>00<indx><buid>=<valu>
+
+    def _setCovering(self):
+        self.layrslab.put(b'layer:covering', b'\x01')
+        self.covering = True
+
+    async def initCovering(self):
+        '''
+        Build the covering prop value indexes from the existing rows in the layer.
+
+        Notes:
+            This is run by synapse.lib.migrate.Migration.addCoveringIndx().  The indexes
+            are maintained by storage operations from the start of the build but are only
+            used by lifts once the build is complete.
+        '''
+        if self.covering:
+            return
+
+        await self._initCoverDbs()
+
+        # clear out any rows left behind by an interrupted build
+        self.layrslab.dropdb(self.bypropvalu)
+        self.layrslab.dropdb(self.byunivvalu)
+
+        count = 0
+
+        lastbuid = None
+        buidrows = []
+
+        for lkey, lval in self.layrslab.scanByFull(db=self.bybuid):
+
+            count += 1
+            if not count % 1000:
+                await asyncio.sleep(0)
+
+            buid = lkey[:32]
+            if buid != lastbuid:
+                self._putCoverRows(lastbuid, buidrows)
+                lastbuid = buid
+                buidrows.clear()
+
+            buidrows.append((lkey[32:], lval))
+
+        self._putCoverRows(lastbuid, buidrows)
+
+        self._setCovering()
+
+    def _putCoverRows(self, buid, rows):
+
+        # the "*form" row may not be the first for a buid (#tags sort before it)
+        form = None
+        for penc, lval in rows:
+            if penc[0] == 42:
+                form = penc[1:].decode('utf8')
+                break
+
+        if form is None:
+            return
+
+        fenc = self.encoder[form]
+
+        propkeys = []
+        univkeys = []
+
+        for penc, lval in rows:
+
+            valu, indx = s_msgpack.un(lval)
+            byts = s_msgpack.en(valu)
+
+            if penc[0] == 42:
+                propkeys.append((fenc + b'\x00' + indx + buid, byts))
+                continue
+
+            penc += b'\x00'
+            propkeys.append((fenc + penc + indx + buid, byts))
+
+            if penc[0] in (46, 35): # ".univ" or "#tag"
+                univkeys.append((penc + indx + buid, byts))
+
+        self.layrslab.putmulti(propkeys, db=self.bypropvalu)
+        self.layrslab.putmulti(univkeys, db=self.byunivvalu)
+
     async def getModelVers(self):
         byts = self.layrslab.get(b'layer:model:version')
         if byts is None:
@@ -108,6 +440,19 @@ class LmdbLayer(s_layer.Layer):
 
         return props
 
+    async def getBuidPropsMulti(self, buids):
+
+        for buid, rows in self.layrslab.scanByPrefMulti(buids, db=self.bybuid):
+
+            props = {}
+
+            for lkey, lval in rows:
+                prop = lkey[32:].decode('utf8')
+                valu, indx = s_msgpack.un(lval)
+                props[prop] = valu
+
+            yield buid, props
+
     async def getNodeNdef(self, buid):
         pref = buid + b'*'
         for lkey, lval in self.layrslab.scanByPref(buid + b'*', db=self.bybuid):
@@ -138,10 +483,88 @@ class LmdbLayer(s_layer.Layer):
             self.layrslab.put(bypropkey, pvnewval, db=self.byprop)
             self.layrslab.delete(bypropkey, pvoldval, db=self.byprop)
 
+            if self.bypropvalu is not None:
+                self._moveCoverRow(fenc, penc, indx, oldb, newb)
+
+            if self.bypropival is not None and len(indx) == 16:
+                self._moveIvalRow(fenc, penc, indx, pvoldval, pvnewval)
+
             self.layrslab.put(newb + penc, lval, db=self.bybuid)
             self.layrslab.delete(lkey, db=self.bybuid)
 
+    def _moveCoverRow(self, fenc, penc, indx, oldb, newb):
+
+        # the primary prop is indexed as <form>00 00 <indx>
+        if penc[0] == 42:
+            propkey = fenc + b'\x00' + indx
+        else:
+            propkey = fenc + penc + b'\x00' + indx
+
+        byts = self.layrslab.pop(propkey + oldb, db=self.bypropvalu)
+        if byts is not None:
+            self.layrslab.put(propkey + newb, byts, db=self.bypropvalu)
+
+        if penc[0] in (46, 35): # ".univ" or "#tag"
+            univkey = penc + b'\x00' + indx
+            byts = self.layrslab.pop(univkey + oldb, db=self.byunivvalu)
+            if byts is not None:
+                self.layrslab.put(univkey + newb, byts, db=self.byunivvalu)
+
+    def _moveIvalRow(self, fenc, penc, indx, pvoldval, pvnewval):
+
+        # only ival typed props are present in the ival index
+        if penc[0] == 42:
+            ivalkey = b'\x00' + ivalindx(indx)
+        else:
+            ivalkey = penc + b'\x00' + ivalindx(indx)
+
+        if self.layrslab.delete(fenc + ivalkey, pvoldval, db=self.bypropival):
+            self.layrslab.put(fenc + ivalkey, pvnewval, dupdata=True, db=self.bypropival)
+
+        if self.layrslab.delete(ivalkey, pvoldval, db=self.byunivival):
+            self.layrslab.put(ivalkey, pvnewval, dupdata=True, db=self.byunivival)
+
+    async def _storSops(self, sops):
+        '''
+        Execute a series of storage operations.
+
+        Notes:
+            The prop:set and prop:del operations are reduced to their net edits
+            which are written in sorted order with one putmulti() / delmulti()
+            per database.
+        '''
+        batch = s_lmdbslab.Batch(self.layrslab)
+
+        try:
+
+            for oper in sops:
+
+                func = self._edit_funcs.get(oper[0])
+                if func is not None:
+                    func(batch, oper)
+                    continue
+
+                func = self._stor_funcs.get(oper[0])
+                if func is None:
+                    raise s_exc.NoSuchStor(name=oper[0])
+
+                batch.commit()
+                await func(oper)
+
+        finally:
+            batch.commit()
+
     async def _storPropSet(self, oper):
+        batch = s_lmdbslab.Batch(self.layrslab)
+        self._editPropSet(batch, oper)
+        batch.commit()
+
+    async def _storPropDel(self, oper):
+        batch = s_lmdbslab.Batch(self.layrslab)
+        self._editPropDel(batch, oper)
+        batch.commit()
+
+    def _editPropSet(self, batch, oper):
 
         _, (buid, form, prop, valu, indx, info) = oper
 
@@ -153,6 +576,7 @@ class LmdbLayer(s_layer.Layer):
         penc = self.encoder[prop]
 
         univ = info.get('univ')
+        ival = info.get('ival') and self.bypropival is not None
 
         # special case for setting primary property
         if not prop:
@@ -160,35 +584,64 @@ class LmdbLayer(s_layer.Layer):
 
         bpkey = buid + self.utf8[prop]
 
-        # FIXME:  might need to update any cortex buid cache
-
         bpval = s_msgpack.en((valu, indx))
 
         pvpref = fenc + penc
         pvvalu = s_msgpack.en((buid,))
 
-        byts = self.layrslab.replace(bpkey, bpval, db=self.bybuid)
-        if byts is not None:
+        byts = batch.get(bpkey, self.bybuid)
+        batch.put(bpkey, bpval, self.bybuid)
+
+        if byts is None:
+
+            self._incPropCount(batch, pvpref, 1)
+            if univ:
+                self._incPropCount(batch, penc, 1)
+
+        else:
 
             oldv, oldi = s_msgpack.un(byts)
 
-            self.layrslab.delete(pvpref + oldi, pvvalu, db=self.byprop)
+            batch.deldup(pvpref + oldi, pvvalu, self.byprop)
 
             if univ:
                 unkey = penc + oldi
-                self.layrslab.delete(unkey, pvvalu, db=self.byuniv)
+                batch.deldup(unkey, pvvalu, self.byuniv)
+
+            if self.bypropvalu is not None:
+                batch.delete(pvpref + oldi + buid, self.bypropvalu)
+                if univ:
+                    batch.delete(penc + oldi + buid, self.byunivvalu)
 
-        self.layrslab.put(pvpref + indx, pvvalu, dupdata=True, db=self.byprop)
+            if ival and len(oldi) == 16:
+                self._delIvalIndx(batch, fenc, penc, oldi, pvvalu, univ)
+
+        batch.putdup(pvpref + indx, pvvalu, self.byprop)
 
         if univ:
-            self.layrslab.put(penc + indx, pvvalu, dupdata=True, db=self.byuniv)
+            batch.putdup(penc + indx, pvvalu, self.byuniv)
 
-    async def _storPropDel(self, oper):
+        if self.bypropvalu is not None:
+            cvval = s_msgpack.en(valu)
+            batch.put(pvpref + indx + buid, cvval, self.bypropvalu)
+            if univ:
+                batch.put(penc + indx + buid, cvval, self.byunivvalu)
 
-        _, (buid, form, prop, info) = oper
+        if ival and len(indx) == 16:
+            ivalkey = penc + ivalindx(indx)
+            batch.putdup(fenc + ivalkey, pvvalu, self.bypropival)
+            if univ:
+                batch.putdup(ivalkey, pvvalu, self.byunivival)
+
+    def _delIvalIndx(self, batch, fenc, penc, indx, pvvalu, univ):
+        ivalkey = penc + ivalindx(indx)
+        batch.deldup(fenc + ivalkey, pvvalu, self.bypropival)
+        if univ:
+            batch.deldup(ivalkey, pvvalu, self.byunivival)
 
-        # FIXME:  update any cortex-wide buid cache
-        # FIXME:  this might not have the expected impact if
+    def _editPropDel(self, batch, oper):
+
+        _, (buid, form, prop, info) = oper
 
         fenc = self.encoder[form]
         penc = self.encoder[prop]
@@ -200,17 +653,30 @@ class LmdbLayer(s_layer.Layer):
 
         univ = info.get('univ')
 
-        byts = self.layrslab.pop(bpkey, db=self.bybuid)
+        byts = batch.get(bpkey, self.bybuid)
         if byts is None:
             return
 
+        batch.delete(bpkey, self.bybuid)
+
         oldv, oldi = s_msgpack.un(byts)
 
         pvvalu = s_msgpack.en((buid,))
-        self.layrslab.delete(fenc + penc + oldi, pvvalu, db=self.byprop)
+        batch.deldup(fenc + penc + oldi, pvvalu, self.byprop)
+
+        self._incPropCount(batch, fenc + penc, -1)
 
         if univ:
-            self.layrslab.delete(penc + oldi, pvvalu, db=self.byuniv)
+            batch.deldup(penc + oldi, pvvalu, self.byuniv)
+            self._incPropCount(batch, penc, -1)
+
+        if self.bypropvalu is not None:
+            batch.delete(fenc + penc + oldi + buid, self.bypropvalu)
+            if univ:
+                batch.delete(penc + oldi + buid, self.byunivvalu)
+
+        if info.get('ival') and self.bypropival is not None and len(oldi) == 16:
+            self._delIvalIndx(batch, fenc, penc, oldi, pvvalu, univ)
 
     async def _liftByIndx(self, oper):
         # ('indx', (<dbname>, <prefix>, (<indxopers>...))
@@ -232,6 +698,22 @@ class LmdbLayer(s_layer.Layer):
 
                 yield row
 
+    async def _liftByIndxEqs(self, oper):
+        # ('indx:eqs', (<dbname>, <prefix>, (<indx>, ...)))
+        name, pref, indxs = oper[1]
+
+        db = self.dbs.get(name)
+        if db is None:
+            raise s_exc.NoSuchName(name=name)
+
+        size = len(pref)
+        lkeys = sorted({pref + indx for indx in indxs})
+
+        for lkey, rows in self.layrslab.scanByDupsMulti(lkeys, db=db):
+            indx = lkey[size:]
+            for _, byts in rows:
+                yield s_msgpack.un(byts)[0], indx
+
     async def _rowsByEq(self, db, pref, valu):
         lkey = pref + valu
         for _, byts in self.layrslab.scanByDups(lkey, db=db):
@@ -249,15 +731,20 @@ class LmdbLayer(s_layer.Layer):
         for _, byts in self.layrslab.scanByRange(lmin, lmax, db=db):
             yield s_msgpack.un(byts)
 
-    async def iterFormRows(self, form):
+    async def iterFormRows(self, form, pref=b''):
         '''
         Iterate (buid, valu) rows for the given form in this layer.
         '''
 
         # <form> 00 00 (no prop...)
-        pref = self.encoder[form] + b'\x00'
+        pref = self.encoder[form] + b'\x00' + pref
         penc = self.utf8['*' + form]
 
+        if self.covering:
+            for item in self._iterCoverRows(pref, self.bypropvalu):
+                yield item
+            return
+
         for _, pval in self.layrslab.scanByPref(pref, db=self.byprop):
 
             buid = s_msgpack.un(pval)[0]
@@ -270,14 +757,19 @@ class LmdbLayer(s_layer.Layer):
 
             yield buid, valu
 
-    async def iterPropRows(self, form, prop):
+    async def iterPropRows(self, form, prop, pref=b''):
         '''
         Iterate (buid, valu) rows for the given form:prop in this layer.
         '''
         # iterate byprop and join bybuid to get to value
 
         penc = self.utf8[prop]
-        pref = self.encoder[form] + self.encoder[prop]
+        pref = self.encoder[form] + self.encoder[prop] + pref
+
+        if self.covering:
+            for item in self._iterCoverRows(pref, self.bypropvalu):
+                yield item
+            return
 
         for _, pval in self.layrslab.scanByPref(pref, db=self.byprop):
 
@@ -291,12 +783,17 @@ class LmdbLayer(s_layer.Layer):
 
             yield buid, valu
 
-    async def iterUnivRows(self, prop):
+    async def iterUnivRows(self, prop, pref=b''):
         '''
         Iterate (buid, valu) rows for the given universal prop
         '''
         penc = self.utf8[prop]
-        pref = self.encoder[prop]
+        pref = self.encoder[prop] + pref
+
+        if self.covering:
+            for item in self._iterCoverRows(pref, self.byunivvalu):
+                yield item
+            return
 
         for _, pval in self.layrslab.scanByPref(pref, db=self.byuniv):
             buid = s_msgpack.un(pval)[0]
@@ -309,6 +806,104 @@ class LmdbLayer(s_layer.Layer):
 
             yield buid, valu
 
+    async def _liftByPropIval(self, oper):
+        form, prop, ival = oper[1]
+        pref = self.encoder[form] + self.encoder[prop]
+        async for row in self._iterIvalRowsBy(pref, ival, self.byprop, self.bypropival):
+            yield row
+
+    async def _liftByUnivIval(self, oper):
+        _, prop, ival = oper[1]
+        pref = self.encoder[prop]
+        async for row in self._iterIvalRowsBy(pref, ival, self.byuniv, self.byunivival):
+            yield row
+
+    async def _liftByFormIval(self, oper):
+        _, form, ival = oper[1]
+        pref = self.encoder[form] + b'\x00'
+        async for row in self._iterIvalRowsBy(pref, ival, self.byprop, self.bypropival):
+            yield row
+
+    async def _iterIvalRowsBy(self, pref, ival, db, ivaldb):
+
+        if self.ivalindx:
+            genr = self._iterIvalBukts(pref, ival, ivaldb)
+        else:
+            genr = self._iterIvalIndx(pref, ival, db)
+
+        async for row in genr:
+            yield row
+
+    async def _iterIvalBukts(self, pref, ival, db):
+        '''
+        Yield (buid,) rows from the ival index for intervals which overlap the given ival.
+
+        Notes:
+            At each level, only the range of buckets which overlap the ival are scanned
+            and only the rows in the first and last bucket may not overlap it.
+        '''
+        minb = timeindx(ival[0])
+        maxb = timeindx(ival[1])
+
+        minv = int.from_bytes(minb, 'big')
+        lastv = max(minv, int.from_bytes(maxb, 'big') - 1)
+
+        pace = s_layer.FairPace()
+
+        for level, shift in enumerate(IVAL_SHIFTS):
+
+            lpref = pref + bytes((level,))
+
+            lmin = lpref + (minv >> shift).to_bytes(8, 'big')
+            lmax = lpref + (lastv >> shift).to_bytes(8, 'big')
+
+            for lkey, lval in self.layrslab.scanByRange(lmin, lmax, db=db):
+
+                if pace.due():
+                    await asyncio.sleep(0)
+
+                indx = lkey[-16:]
+                if indx[:8] >= maxb or indx[8:] <= minb:
+                    continue
+
+                yield s_msgpack.un(lval)
+
+    async def _iterIvalIndx(self, pref, ival, db):
+        '''
+        Yield (buid,) rows for ival index entries which overlap the given ival.
+
+        Notes:
+            An ival is indexed as <min><max> so a range scan up to the max of
+            the query skips every row which begins after it.  The max of each
+            row is compared from the index bytes without a bybuid lookup.
+        '''
+        minb = timeindx(ival[0])
+        maxb = timeindx(ival[1])
+
+        size = len(pref)
+
+        pace = s_layer.FairPace()
+
+        for lkey, lval in self.layrslab.scanByRange(pref, pref + maxb, db=db):
+
+            if pace.due():
+                await asyncio.sleep(0)
+
+            indx = lkey[size:]
+
+            # tags without an ival (and the like) have a shorter index
+            if len(indx) != 16:
+                continue
+
+            if indx[:8] >= maxb or indx[8:] <= minb:
+                continue
+
+            yield s_msgpack.un(lval)
+
+    def _iterCoverRows(self, pref, db):
+        for lkey, lval in self.layrslab.scanByPref(pref, db=db):
+            yield lkey[-32:], s_msgpack.un(lval)
+
     async def getOffset(self, iden):
         '''
         Note:  this method doesn't need to be async, but it is probable that future layer implementations would need it
@@ -330,6 +925,7 @@ class LmdbLayer(s_layer.Layer):
     async def stat(self):
         return {
             'splicelog_indx': self.splicelog.index(),
+            'lmdb': self.layrslab.stat(),
         }
 
     async def initdb(self, name, dupsort=False):
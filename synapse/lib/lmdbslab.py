@@ -1,5 +1,7 @@
 import os
+import time
 import functools
+import threading
 import contextlib
 
 import logging
@@ -12,6 +14,7 @@ import synapse.glob as s_glob
 import synapse.common as s_common
 
 import synapse.lib.base as s_base
+import synapse.lib.coro as s_coro
 import synapse.lib.const as s_const
 
 class _LmdbDatabase():
@@ -21,16 +24,38 @@ class _LmdbDatabase():
 
 _DefaultDB = _LmdbDatabase(None, False)
 
+syncmodes = ('always', 'periodic', 'none')
+
 class Slab(s_base.Base):
     '''
     A "monolithic" LMDB instance for use in a asyncio loop thread.
+
+    Args:
+        path (str): The path to the LMDB directory.
+        sync (str): The durability mode used for commits (see notes).
+        **kwargs: Additional options for lmdb.open().
+
+    Notes:
+        The sync modes are:
+
+            always   - Flush to disk within each commit (the LMDB default).
+            periodic - Commits do not wait on the disk.  The map is flushed from a
+                       worker thread after each periodic commit, so a system crash
+                       may lose (or corrupt) the most recent commits.
+            none     - Commits do not wait on the disk and the map is only flushed on fini.
+
+        Write transactions may only be used from the thread which created them, so
+        the commits themselves always run on the loop.
     '''
     COMMIT_PERIOD = 1.0  # time between commits
 
-    async def __anit__(self, path, **kwargs):
+    async def __anit__(self, path, sync='always', **kwargs):
 
         await s_base.Base.__anit__(self)
 
+        if sync not in syncmodes:
+            raise s_exc.BadConfValu(mesg=f'Slab sync mode must be one of {syncmodes}', name='sync', valu=sync)
+
         kwargs.setdefault('map_size', s_const.gibibyte)
 
         opts = kwargs
@@ -58,6 +83,26 @@ class Slab(s_base.Base):
 
         self.readonly = opts.get('readonly', False)
 
+        self.syncmode = sync
+        if sync != 'always':
+            opts['sync'] = False
+            opts['map_async'] = True
+            if sync == 'none':
+                opts['metasync'] = False
+
+        self.unsynced = False
+        self.synclock = threading.Lock()
+
+        self.stats = {
+            'commits': 0,
+            'commit:last': 0.0,
+            'commit:max': 0.0,
+            'syncs': 0,
+            'sync:last': 0.0,
+            'sync:max': 0.0,
+            'xactops:max': 0,
+        }
+
         self.lenv = lmdb.open(path, **opts)
 
         self.scans = set()
@@ -103,11 +148,48 @@ class Slab(s_base.Base):
             if self.holders == 0:
                 self.forcecommit()
 
+            if self.syncmode == 'periodic' and self.unsynced:
+                await self._syncInThread()
+
+    async def _syncInThread(self):
+
+        self.unsynced = False
+
+        tick = time.monotonic()
+        await s_coro.executor(self._syncLenv)
+        took = time.monotonic() - tick
+
+        self.stats['syncs'] += 1
+        self.stats['sync:last'] = took
+        self.stats['sync:max'] = max(took, self.stats['sync:max'])
+
+    def _syncLenv(self):
+        # the lock ensures fini does not close the env while a flush is running
+        with self.synclock:
+            if self.lenv is not None:
+                self.lenv.sync(True)
+
+    def stat(self):
+        '''
+        Return a dictionary of commit/sync statistics for the slab.
+        '''
+        stats = dict(self.stats)
+        stats['sync'] = self.syncmode
+        stats['xactops'] = len(self.xactops)
+        stats['mapsize'] = self.mapsize
+        return stats
+
     async def _onCoFini(self):
         assert s_glob.iAmLoop()
         self._finiCoXact()
-        self.lenv.close()
-        del self.lenv
+
+        with self.synclock:
+
+            if self.syncmode != 'always' and not self.readonly:
+                self.lenv.sync(True)
+
+            self.lenv.close()
+            self.lenv = None
 
     def _finiCoXact(self):
 
@@ -119,8 +201,18 @@ class Slab(s_base.Base):
         if self.xact is None:
             return
 
+        tick = time.monotonic()
+
         self.xact.commit()
 
+        took = time.monotonic() - tick
+
+        self.stats['commits'] += 1
+        self.stats['commit:last'] = took
+        self.stats['commit:max'] = max(took, self.stats['commit:max'])
+        self.stats['xactops:max'] = max(len(self.xactops), self.stats['xactops:max'])
+
+        self.unsynced = True
         self.xactops.clear()
 
         del self.xact
@@ -166,6 +258,24 @@ class Slab(s_base.Base):
 
         return _LmdbDatabase(db, dupsort)
 
+    def dropdb(self, db):
+        '''
+        Remove all the entries from the given database.
+        '''
+        if self.readonly:
+            raise s_exc.IsReadOnly()
+
+        try:
+            self.dirty = True
+
+            if not self.recovering:
+                self._logXactOper(self.dropdb, db)
+
+            self.xact.drop(db.db, delete=False)
+
+        except lmdb.MapFullError:
+            return self._handle_mapfull()
+
     @contextlib.contextmanager
     def _noCoXact(self):
         if not self.readonly or self.txnrefcount:
@@ -210,6 +320,36 @@ class Slab(s_base.Base):
 
                 yield lkey, lval
 
+    def scanByPrefMulti(self, prefs, db=None):
+        '''
+        Yield (pref, rows) tuples for each of the given prefixes using a single cursor.
+
+        Notes:
+            The rows for each prefix are gathered into a list before being yielded,
+            so the cursor may be safely re-used across commit boundaries.
+        '''
+        with Scan(self, db) as scan:
+            for pref in prefs:
+                yield pref, scan.rowsByPref(pref)
+
+    def countByDups(self, lkey, db=None):
+        '''
+        Return the number of values for the given key.
+        '''
+        with Scan(self, db) as scan:
+            return scan.countByDups(lkey)
+
+    def scanByDupsMulti(self, lkeys, db=None):
+        '''
+        Yield (lkey, rows) tuples for each of the given keys using a single cursor.
+
+        Notes:
+            The keys should be sorted to make the scan a single forward pass.
+        '''
+        with Scan(self, db) as scan:
+            for lkey in lkeys:
+                yield lkey, scan.rowsByDups(lkey)
+
     def scanByRange(self, lmin, lmax=None, db=None):
 
         with Scan(self, db) as scan:
@@ -313,7 +453,7 @@ class Slab(s_base.Base):
             self.dirty = True
 
             if not self.recovering:
-                self._logXactOper(self.putmulti, kvpairs, dupdata=dupdata, append=True, db=db)
+                self._logXactOper(self.putmulti, kvpairs, dupdata=dupdata, append=append, db=db)
 
             with self.xact.cursor(db=db.db) as curs:
                 retn = curs.putmulti(kvpairs, dupdata=dupdata, append=append)
@@ -323,14 +463,54 @@ class Slab(s_base.Base):
         except lmdb.MapFullError:
             return self._handle_mapfull()
 
+    def delmulti(self, kvpairs, db=_DefaultDB):
+        '''
+        Delete a list of (key, valu) pairs using a single cursor.
+
+        Args:
+            kvpairs (list): (key, valu) tuples.  A valu of None deletes the key (and all of its dups).
+            db: The database to delete from.
+
+        Returns:
+            (int): The number of entries deleted.
+        '''
+        if self.readonly:
+            raise s_exc.IsReadOnly()
+
+        try:
+            self.dirty = True
+
+            if not self.recovering:
+                self._logXactOper(self.delmulti, kvpairs, db=db)
+
+            count = 0
+            with self.xact.cursor(db=db.db) as curs:
+
+                for lkey, lval in kvpairs:
+
+                    if lval is None:
+                        if curs.set_key(lkey):
+                            curs.delete(dupdata=True)
+                            count += 1
+                        continue
+
+                    if curs.set_key_dup(lkey, lval):
+                        curs.delete()
+                        count += 1
+
+            return count
+
+        except lmdb.MapFullError:
+            return self._handle_mapfull()
+
     def pop(self, lkey, db=None):
         return self._xact_action(self.pop, lmdb.Transaction.pop, lkey, db=db)
 
     def delete(self, lkey, val=None, db=None):
         return self._xact_action(self.delete, lmdb.Transaction.delete, lkey, val, db=db)
 
-    def put(self, lkey, lval, dupdata=False, db=None):
-        return self._xact_action(self.put, lmdb.Transaction.put, lkey, lval, dupdata=dupdata, db=db)
+    def put(self, lkey, lval, dupdata=False, overwrite=True, db=None):
+        return self._xact_action(self.put, lmdb.Transaction.put, lkey, lval, dupdata=dupdata, overwrite=overwrite, db=db)
 
     def replace(self, lkey, lval, db=None):
         '''
@@ -366,6 +546,83 @@ class Slab(s_base.Base):
         self._initCoXact()
         return True
 
+class Batch:
+    '''
+    A state-object which accumulates the net puts and deletes for a Slab.
+
+    Only the last edit of each key (or key/valu pair for dupsort databases)
+    is kept, so commit() may write each database in sorted order with a single
+    delmulti() and putmulti() call (and a single replay log entry) regardless
+    of the order of the edits.
+    '''
+    def __init__(self, slab):
+        self.slab = slab
+        self.edits = {}     # db -> {key: valu or None} or {(key, valu): bool} for dupsort
+
+    def _getEdits(self, db):
+        edits = self.edits.get(db)
+        if edits is None:
+            edits = self.edits[db] = {}
+        return edits
+
+    def get(self, lkey, db):
+        '''
+        Return the current value of a (non-dupsort) key including any pending edits.
+        '''
+        edits = self.edits.get(db)
+        if edits is not None:
+            valu = edits.get(lkey, s_common.novalu)
+            if valu is not s_common.novalu:
+                return valu
+
+        return self.slab.get(lkey, db=db)
+
+    def put(self, lkey, lval, db):
+        self._getEdits(db)[lkey] = lval
+
+    def delete(self, lkey, db):
+        self._getEdits(db)[lkey] = None
+
+    def putdup(self, lkey, lval, db):
+        self._getEdits(db)[(lkey, lval)] = True
+
+    def deldup(self, lkey, lval, db):
+        self._getEdits(db)[(lkey, lval)] = False
+
+    def commit(self):
+        '''
+        Write the pending edits to the slab.
+        '''
+        for db, edits in self.edits.items():
+
+            puts = []
+            dels = []
+
+            if db.dupsort:
+
+                for item, isput in sorted(edits.items()):
+                    if isput:
+                        puts.append(item)
+                    else:
+                        dels.append(item)
+
+            else:
+
+                for lkey in sorted(edits.keys()):
+                    lval = edits[lkey]
+                    if lval is None:
+                        dels.append((lkey, None))
+                    else:
+                        puts.append((lkey, lval))
+
+            if dels:
+                self.slab.delmulti(dels, db=db)
+
+            if puts:
+                self.slab.putmulti(puts, dupdata=db.dupsort, db=db)
+
+        self.edits.clear()
+
 class Scan:
     '''
     A state-object used by Slab.  Not to be instantiated directly.
@@ -441,6 +698,64 @@ class Scan:
 
         return True
 
+    def _reopen(self):
+
+        if not self.bumped:
+            return
+
+        if self.slab.isfini:
+            raise s_exc.IsFini()
+
+        self.bumped = False
+        self.curs = self.slab.xact.cursor(db=self.db)
+
+    def rowsByPref(self, pref):
+        '''
+        Return a list of (lkey, lval) rows which begin with the given prefix.
+        '''
+        self._reopen()
+
+        if not self.curs.set_range(pref):
+            return []
+
+        size = len(pref)
+
+        rows = []
+        for lkey, lval in self.curs.iternext():
+
+            if lkey[:size] != pref:
+                break
+
+            rows.append((lkey, lval))
+
+        return rows
+
+    def rowsByDups(self, lkey):
+        '''
+        Return a list of (lkey, lval) rows for the given key.
+        '''
+        self._reopen()
+
+        if not self.curs.set_key(lkey):
+            return []
+
+        if not self.dupsort:
+            return [self.curs.item()]
+
+        return list(self.curs.iternext_dup(keys=True))
+
+    def countByDups(self, lkey):
+
+        self._reopen()
+
+        if not self.curs.set_key(lkey):
+            return 0
+
+        if not self.dupsort:
+            return 1
+
+        return self.curs.count()
+
     def iternext(self):
 
         try:
@@ -5,6 +5,7 @@ import logging
 import synapse.common as s_common
 
 import synapse.lib.base as s_base
+import synapse.lib.types as s_types
 import synapse.lib.lmdbslab as s_slab
 
 logger = logging.getLogger(__name__)
@@ -28,6 +29,51 @@ class Migration(s_base.Base):
         #dirn = s_common.gendir(path)
         #slab
 
+    async def addCoveringIndx(self):
+        '''
+        Add the covering prop value indexes to each layer which may be revised.
+        '''
+        for layr in self._getRevLayers('covering index'):
+            await layr.initCovering()
+            logger.warning('...complete!')
+
+    async def addIvalIndx(self):
+        '''
+        Build the ival index for existing rows in each layer which may be revised.
+        '''
+        props = set()
+        for form in self.core.model.forms.values():
+
+            if isinstance(form.type, s_types.Ival):
+                props.add((form.name, ''))
+
+            for prop in form.props.values():
+                if isinstance(prop.type, s_types.Ival):
+                    props.add((form.name, prop.name))
+
+        for layr in self._getRevLayers('ival index'):
+            await layr.initIvalIndx(props)
+            logger.warning('...complete!')
+
+    async def addPropCounts(self):
+        '''
+        Count the existing rows for each prop and tag in each layer which may be revised.
+        '''
+        for layr in self._getRevLayers('prop counts'):
+            await layr.initPropCounts()
+            logger.warning('...complete!')
+
+    def _getRevLayers(self, name):
+
+        for layr in self.getLayers():
+
+            if not layr.canrev:
+                logger.warning(f'skipping {name} for layer {layr.iden} ({layr.dirn}) which may not be revised')
+                continue
+
+            logger.warning(f'building {name} (layer: {layr.iden})')
+            yield layr
+
     async def setNodeBuid(self, form, oldb, newb):
         '''
         Carry out the rewrite of a node buid in all layers.
@@ -11,6 +11,9 @@ if isinstance(pakr, m_fallback.Packer):  # pragma: no cover
     logger.warning('msgpack is using the pure python fallback implementation. This will impact performance negatively.')
     pakr = None
 
+# used to serialize the headers of containers for already serialized items
+hdrpakr = msgpack.Packer()
+
 # synapse.lib.msgpack.un uses a hardcoded subset of these arguments for speed
 unpacker_kwargs = {
     'raw': False,
@@ -42,6 +45,18 @@ def en(item):
         pakr.reset()
         raise
 
+def enarray(items):
+    '''
+    Serialize a list of already msgpack serialized items as a msgpack array.
+
+    Args:
+        items (list): A list of msgpack serialized bytes.
+
+    Returns:
+        bytes: The serialized bytes for the array.
+    '''
+    return hdrpakr.pack_array_header(len(items)) + b''.join(items)
+
 def un(byts):
     '''
     Use msgpack to de-serialize a python object.
@@ -411,7 +411,7 @@ class Node:
         valu = s_time.ival(*valu, *curv)
 
         indx = self.snap.model.types['ival'].indx(valu)
-        info = {'univ': True}
+        info = {'univ': True, 'ival': True}
         await self._setTagProp(name, valu, indx, info)
 
     async def _setTagProp(self, name, norm, indx, info):
@@ -424,7 +424,7 @@ class Node:
         # these are cached based on norm...
         await self.snap.addTagNode(name)
 
-        info = {'univ': True}
+        info = {'univ': True, 'ival': True}
         if norm == (None, None):
             indx = b'\x00'
         else:
@@ -465,7 +465,7 @@ class Node:
 
         removed.append((name, curv))
 
-        info = {'univ': True}
+        info = {'univ': True, 'ival': True}
         sops = [('prop:del', (self.buid, self.form.name, '#' + t, info)) for (t, v) in removed]
 
         await self.snap.stor(sops)
@@ -12,6 +12,7 @@ logger = logging.getLogger(__name__)
 
 PASSTHROUGHFUNCS = (
     'commit', 'getBuidProps', 'getOffset', 'setOffset', 'stat', 'initdb', 'stor', 'splicelistAppend',
+    'getPropCount', 'getIndxCount',
 )
 
 class RemoteLayer(s_layer.Layer):
@@ -29,6 +30,9 @@ class RemoteLayer(s_layer.Layer):
         # a remote layer may never be revd
         self.canrev = False
 
+        # nor cached, since it may be edited by other cortexes
+        self.cancache = False
+
         if teleurl is None:
             teleurl = self.conf.get('remote:telepath')
 
@@ -50,6 +54,10 @@ class RemoteLayer(s_layer.Layer):
         async for item in await self.remote.getLiftRows(*args, **kwargs):
             yield item
 
+    async def getBuidPropsMulti(self, *args, **kwargs):
+        async for item in await self.remote.getBuidPropsMulti(*args, **kwargs):
+            yield item
+
     async def splices(self, *args, **kwargs):
         async for item in await self.remote.splices(*args, **kwargs):
             yield item
@@ -2,6 +2,7 @@ import types
 import asyncio
 import logging
 import contextlib
+import collections
 
 import synapse.exc as s_exc
 import synapse.common as s_common
@@ -50,6 +51,11 @@ class Snap(s_base.Base):
         self.bulk = False
         self.bulksops = []
 
+        self.rowwindow = 1000   # the number of lift rows to materialize into nodes at once
+        self.addwindow = 1000   # the number of nodedefs to add in a single EditAtom
+        self.pivwindow = 1000   # the number of inbound nodes to resolve pivots for at once
+        self.filtpace = 1000    # the number of inbound nodes to sync filter between yields of the CPU
+
         # variables used by the storm runtime
         self.vars = {}
 
@@ -57,9 +63,10 @@ class Snap(s_base.Base):
 
         self.debug = False      # Set to true to enable debug output.
         self.write = False      # True when the snap has a write lock on a layer.
+        self.readonly = False   # True while running a storm query with the readonly option.
 
-        self.tagcache = s_cache.FixedCache(self._addTagNode, size=10000)
-        self.buidcache = s_cache.FixedCache(self._getNodeByBuid, size=100000)
+        self.tagcache = s_cache.LruCache(self._addTagNode, size=10000)
+        self.buidcache = s_cache.LruCache(self._getNodeByBuid, size=100000)
 
         self.onfini(self.stack.close)
         self.changelog = []
@@ -85,8 +92,17 @@ class Snap(s_base.Base):
     def getStormRuntime(self, opts=None, user=None):
         runt = s_storm.Runtime(self, opts=opts, user=user)
         self.core.stormrunts[runt.iden] = runt
-        yield runt
-        self.core.stormrunts.pop(runt.iden, None)
+
+        readonly = self.readonly
+        if runt.getOpt('readonly'):
+            self.readonly = True
+
+        try:
+            yield runt
+
+        finally:
+            self.readonly = readonly
+            self.core.stormrunts.pop(runt.iden, None)
 
     async def iterStormPodes(self, text, opts=None, user=None):
         '''
@@ -116,6 +132,27 @@ class Snap(s_base.Base):
             async for x in runt.iterStormQuery(query):
                 yield x
 
+    async def count(self, text, opts=None, user=None):
+        '''
+        Return the number of nodes which result from a storm query.
+
+        Notes:
+            Queries made only of lifts (and commands such as count) are counted
+            from the layer index rows without constructing the nodes.
+        '''
+        query = self.core.getStormQuery(text)
+        with self.getStormRuntime(opts=opts, user=user) as runt:
+
+            count = await runt.getStormQueryCount(query)
+            if count is not None:
+                return count
+
+            count = 0
+            async for node, path in runt.iterStormQuery(query):
+                count += 1
+
+            return count
+
     @s_coro.genrhelp
     async def eval(self, text, opts=None, user=None):
         '''
@@ -169,24 +206,140 @@ class Snap(s_base.Base):
         buid = s_common.buid(ndef)
         return await self.getNodeByBuid(buid)
 
-    async def _getNodesByTag(self, name, valu=None, cmpr='='):
-        name = s_chop.tag(name)
+    async def getPropCount(self, form, prop=''):
+        '''
+        Return an estimate of the number of nodes for a form, prop, univ prop or tag.
+
+        Args:
+            form (str): The form name (or None for a univ prop or tag across all forms).
+            prop (str): The relative prop name ('' for the form itself, '#tag' for a tag).
+
+        Returns:
+            (int): The sum of the layer counts or None if any layer does not keep prop counts.
+        '''
+        count = 0
+        for layr in self.layers:
+
+            valu = await layr.getPropCount(form, prop)
+            if valu is None:
+                return None
+
+            count += valu
+
+        return count
+
+    async def getEqCount(self, full, valu):
+        '''
+        Return an estimate of the number of nodes where the prop is equal to the value.
+
+        Returns:
+            (int): The sum of the layer index counts or None if they can not be counted.
+        '''
+        prop = self.model.prop(full)
+        if prop is None:
+            raise s_exc.NoSuchProp(name=full)
+
+        if prop.isrunt:
+            return None
+
+        lops = prop.getLiftOps(valu)
+        if len(lops) != 1 or lops[0][0] != 'indx':
+            return None
+
+        tabl, pref, iops = lops[0][1]
+        if len(iops) != 1 or iops[0][0] != 'eq':
+            return None
+
+        count = 0
+        for layr in self.layers:
+
+            valu = await layr.getIndxCount(tabl, pref, iops[0][1])
+            if valu is None:
+                return None
+
+            count += valu
+
+        return count
+
+    async def getNodesByNdefs(self, ndefs):
+        '''
+        Return a list of Nodes (or None) for a list of (form,valu) tuples.
+
+        Args:
+            ndefs (list): A list of (form,valu) ndef tuples.
+
+        Returns:
+            (list): A Node or None for each ndef.
+
+        Notes:
+            All of the uncached nodes are loaded from each layer at once.
+        '''
+        buids = [s_common.buid(ndef) for ndef in ndefs]
+        await self._loadBuidCache(sorted(set(buids)))
+        return [await self.getNodeByBuid(buid) for buid in buids]
+
+    async def getNodesByIndxEqs(self, tabl, pref, indxs, rawprop):
+        '''
+        Return the nodes for a list of equality index values of a single prop.
+
+        Args:
+            tabl (str): The index table name (byprop or byuniv).
+            pref (bytes): The index prefix for the prop.
+            indxs (list): A list of index bytes.
+            rawprop (str): The "raw" propname used to filter rows from lower layers.
+
+        Returns:
+            (dict): A dict of {indx: [Node, ...]}.
+
+        Notes:
+            The index values are sorted and resolved with a single cursor pass per layer.
+        '''
+        retn = collections.defaultdict(list)
+
+        lops = (
+            ('indx:eqs', (tabl, pref, tuple(sorted(set(indxs))))),
+        )
+
+        async for row, node in self.getLiftNodes(lops, rawprop):
+            retn[row[1]].append(node)
+
+        return retn
+
+    def _getTagLiftOps(self, name, valu=None, cmpr='='):
+
         pref = b'#' + name.encode('utf8') + b'\x00'
-        cmpf = None
 
         if valu is None:
             iops = (('pref', b''), )
-            lops = (
-                ('indx', ('byuniv', pref, iops)),
-            )
-        elif valu is not None and cmpr == '@=':
-            lops = self.tagtype.getLiftOps('univ', cmpr, (None, '#' + name, valu))
-        else:
-            iops = self.tagtype.getIndxOps(valu, cmpr)
-            lops = (
+            return (
                 ('indx', ('byuniv', pref, iops)),
             )
 
+        if cmpr == '@=':
+            return self.tagtype.getLiftOps('univ', cmpr, (None, '#' + name, valu))
+
+        iops = self.tagtype.getIndxOps(valu, cmpr)
+        return (
+            ('indx', ('byuniv', pref, iops)),
+        )
+
+    def _getFormTagLiftOps(self, form, tag):
+
+        # maybe use Encoder here?
+        fenc = form.name.encode('utf8') + b'\x00'
+        tenc = b'#' + tag.encode('utf8') + b'\x00'
+
+        iops = (('pref', b''), )
+        return (
+            ('indx', ('byprop', fenc + tenc, iops)),
+        )
+
+    async def _getNodesByTag(self, name, valu=None, cmpr='='):
+        name = s_chop.tag(name)
+        cmpf = None
+
+        lops = self._getTagLiftOps(name, valu=valu, cmpr=cmpr)
+
         async for row, node in self.getLiftNodes(lops, '#' + name, cmpr=cmpf):
             yield node
 
@@ -205,14 +358,7 @@ class Snap(s_base.Base):
 
         tag = s_chop.tag(tag)
 
-        # maybe use Encoder here?
-        fenc = form.name.encode('utf8') + b'\x00'
-        tenc = b'#' + tag.encode('utf8') + b'\x00'
-
-        iops = (('pref', b''), )
-        lops = (
-            ('indx', ('byprop', fenc + tenc, iops)),
-        )
+        lops = self._getFormTagLiftOps(form, tag)
 
         # a small speed optimization...
         rawprop = '#' + tag
@@ -266,6 +412,110 @@ class Snap(s_base.Base):
         async for node in self._getNodesByProp(full, valu=valu, cmpr=cmpr):
             yield node
 
+    async def getNodeCountBy(self, full, valu=None, cmpr='=', maxsize=None):
+        '''
+        Return the number of nodes getNodesBy() would yield without constructing them.
+
+        Args:
+            full (str): The property/tag name.
+            valu (obj): A lift compatible value for the type.
+            cmpr (str): An optional alternate comparator.
+            maxsize (int): Stop counting once there are at least this many nodes.
+
+        Returns:
+            (int): The number of nodes or None if the lift can not be counted from index rows alone.
+        '''
+        if cmpr == '*type=':
+            return None
+
+        if full.startswith('#'):
+            name = s_chop.tag(full)
+            lops = self._getTagLiftOps(name, valu=valu, cmpr=cmpr)
+            return await self.getLiftCount(lops, '#' + name, maxsize=maxsize)
+
+        fields = full.split('#', 1)
+        if len(fields) > 1:
+
+            name, tag = fields
+
+            form = self.model.form(name)
+            if form is None:
+                raise s_exc.NoSuchForm(form=name)
+
+            # tag interval filters require the node
+            if valu is not None and self.model.type('ival').getCmprCtor(cmpr) is not None:
+                return None
+
+            tag = s_chop.tag(tag)
+            lops = self._getFormTagLiftOps(form, tag)
+            return await self.getLiftCount(lops, '#' + tag, maxsize=maxsize)
+
+        prop = self.model.prop(full)
+        if prop is None:
+            raise s_exc.NoSuchProp(name=full)
+
+        if prop.isrunt:
+            return None
+
+        if prop.type.getLiftHintCmpr(valu, cmpr=cmpr) is not None:
+            return None
+
+        lops = prop.getLiftOps(valu, cmpr=cmpr)
+        return await self.getLiftCount(lops, prop.name, maxsize=maxsize)
+
+    async def getLiftCount(self, lops, rawprop, maxsize=None):
+        '''
+        Count the nodes for a series of lift operations from their index rows.
+
+        Args:
+            lops (list): A list of lift operations.
+            rawprop (str): The "raw" propname used to skip rows shadowed by a higher layer.
+            maxsize (int): Stop counting once there are at least this many nodes.
+
+        Returns:
+            (int): The number of nodes getLiftNodes() would yield for the lift (or a count
+            of at least maxsize).
+
+        Notes:
+            Rows from the top layer are counted directly.  For rows from a lower layer,
+            the props of the higher layers are checked (using the node cache) to drop
+            rows whose prop was set again above them.
+        '''
+        count = 0
+        top = len(self.layers) - 1
+
+        size = self.rowwindow
+        if maxsize is not None:
+            size = max(1, min(size, maxsize))
+
+        async for chunk in s_coro.chunks(self.getLiftRows(lops), size=size):
+
+            lower = [(origlayer, row[0]) for origlayer, row in chunk if origlayer < top]
+
+            count += len(chunk) - len(lower)
+
+            if lower:
+
+                buids = list({buid: None for origlayer, buid in lower})
+
+                # the highest layer index which sets rawprop for each buid
+                setby = {}
+                for layeridx in range(1, top + 1):
+                    async for buid, props in self.core.getLayrPropsMulti(self.layers[layeridx], buids):
+                        if rawprop in props:
+                            setby[buid] = layeridx
+
+                for origlayer, buid in lower:
+                    if setby.get(buid, -1) <= origlayer:
+                        count += 1
+
+                await asyncio.sleep(0)
+
+            if maxsize is not None and count >= maxsize:
+                break
+
+        return count
+
     async def _getNodesByProp(self, full, valu=None, cmpr='='):
 
         prop = self.model.prop(full)
@@ -517,19 +767,49 @@ class Snap(s_base.Base):
         Args:
             nodedefs (list): A list of nodedef tuples.
 
-        Returns:
-            (list): A list of xact messages.
+        Yields:
+            (synapse.lib.node.Node): The Node (or None) for each nodedef.
+
+        Notes:
+            Nodedefs are added in windows of addwindow.  The existing nodes for
+            a window are loaded with one getBuidPropsMulti() call per layer and
+            the props of all the new (or merged) nodes are stored with a single
+            EditAtom.
         '''
+        todo = []
+        for nodedef in nodedefs:
+
+            todo.append(nodedef)
+            if len(todo) >= self.addwindow:
+                async for node in self._addNodeDefs(todo):
+                    yield node
+                todo = []
 
-        for (formname, formvalu), forminfo in nodedefs:
+        async for node in self._addNodeDefs(todo):
+            yield node
+
+    async def _addNodeDefs(self, nodedefs):
+
+        if not nodedefs:
+            return
 
-            props = forminfo.get('props')
+        nodes = await self._addNodeDefsBulk(nodedefs)
 
-            # remove any universal created props...
-            if props is not None:
-                props.pop('.created', None)
+        for i, ((formname, formvalu), forminfo) in enumerate(nodedefs):
+
+            if nodes is not None:
+                node = nodes[i]
+
+            else:
+
+                props = forminfo.get('props')
+
+                # remove any universal created props...
+                if props is not None:
+                    props.pop('.created', None)
+
+                node = await self.addNode(formname, formvalu, props=props)
 
-            node = await self.addNode(formname, formvalu, props=props)
             if node is not None:
                 tags = forminfo.get('tags')
                 if tags is not None:
@@ -538,8 +818,132 @@ class Snap(s_base.Base):
 
             yield node
 
+    async def _addNodeDefsBulk(self, nodedefs):
+        '''
+        Add a window of nodedefs in a single EditAtom and return a list of their Nodes.
+
+        Returns None without storing anything if any nodedef fails before the commit, so the
+        window may be added one node at a time with the usual per-node error handling.
+        Errors other than SynErr (bad nodedef data) are logged before falling back.
+        '''
+        nodes = {}
+        with s_editatom.EditAtom(self.core.bldgbuids) as editatom:
+
+            try:
+
+                fnibs = {}  # buid -> (fnib, props)
+                buids = []
+
+                for i, ((formname, formvalu), forminfo) in enumerate(nodedefs):
+
+                    if i and not i % 100:
+                        await asyncio.sleep(0)  # give other tasks some time
+
+                    props = forminfo.get('props')
+
+                    # remove any universal created props...
+                    if props is not None:
+                        props.pop('.created', None)
+
+                    fnib = self._getNodeFnib(formname, formvalu)
+
+                    buid = fnib[3]
+                    buids.append(buid)
+
+                    item = fnibs.get(buid)
+                    if item is None:
+                        fnibs[buid] = (fnib, dict(props or {}))
+                        continue
+
+                    self._mergeNodeDefProps(fnib[0], item[1], props or {})
+
+                await self._loadBuidCache(fnibs.keys())
+
+                for i, (buid, (fnib, props)) in enumerate(fnibs.items()):
+
+                    if i and not i % 100:
+                        await asyncio.sleep(0)
+
+                    node = await self._addNodeFnibOps(fnib, editatom, props)
+                    if node is not None:
+                        for name, valu in props.items():
+                            await node._setops(name, valu, editatom)
+
+                    nodes[buid] = node
+
+            except asyncio.CancelledError:
+                raise
+
+            except s_exc.SynErr:
+                return None
+
+            except Exception:
+                logger.exception('bulk node add error (adding the nodes one at a time)')
+                return None
+
+            await editatom.commit(self)
+
+            for buid, node in nodes.items():
+                if node is None:
+                    nodes[buid] = editatom.mybldgbuids[buid]
+
+        return [nodes.get(buid) for buid in buids]
+
+    def _mergeNodeDefProps(self, form, props, newprops):
+        '''
+        Merge the props of a duplicate nodedef the way sequential addNode() calls would.
+        '''
+        for name, valu in newprops.items():
+
+            curv = props.get(name)
+            prop = form.prop(name)
+
+            # unknown props and bad values are left for Node._setops() to report
+            if curv is None or prop is None:
+                props[name] = valu
+                continue
+
+            # read only props keep the value they were first set to
+            if prop.info.get('ro'):
+                continue
+
+            try:
+                curn = prop.type.norm(curv)[0]
+                norm = prop.type.norm(valu)[0]
+            except Exception:
+                props[name] = valu
+                continue
+
+            props[name] = prop.type.merge(curn, norm)
+
+    async def _loadBuidCache(self, buids):
+        '''
+        Load the (possibly missing) nodes for any uncached buids into the buid cache at once.
+        '''
+        buids = [buid for buid in buids if buid not in self.buidcache.cache]
+        if not buids:
+            return
+
+        layrprops = []
+        for layr in self.layers:
+            layrprops.append({buid: props async for buid, props in self.core.getLayrPropsMulti(layr, buids)})
+
+        for buid in buids:
+
+            props = {}
+            for layerprops in layrprops:
+                props.update(layerprops.get(buid, {}))
+
+            node = s_node.Node(self, buid, props.items())
+            self.buidcache.put(buid, None if node.ndef is None else node)
+
+        await asyncio.sleep(0)
+
     async def stor(self, sops):
 
+        if self.readonly:
+            raise s_exc.IsReadOnly(mesg='Storm query edits nodes but the readonly option is set.')
+
         if self.bulk:
             self.bulksops.extend(sops)
             return
@@ -570,10 +974,18 @@ class Snap(s_base.Base):
 
         Yields:
             (tuple): (layer_indx, (buid, ...)) rows.
+
+        Notes:
+            The lifts for all layers are started at once and prefetch up to
+            rowwindow rows, but rows are still yielded in layer order.
         '''
-        for layer_idx, layr in enumerate(self.layers):
-            async for x in layr.getLiftRows(lops):
-                yield layer_idx, x
+        genrs = [self._getLayrLiftRows(layer_idx, layr, lops) for (layer_idx, layr) in enumerate(self.layers)]
+        async for item in s_coro.ordered(genrs, size=self.rowwindow):
+            yield item
+
+    async def _getLayrLiftRows(self, layer_idx, layr, lops):
+        async for x in layr.getLiftRows(lops):
+            yield layer_idx, x
 
     async def getRowNodes(self, rows, rawprop, cmpr=None):
         '''
@@ -583,7 +995,8 @@ class Snap(s_base.Base):
         valu is the buid of a node.
 
         Args:
-            rows: A generator of (layer_idx, (buid, ...)) tuples.
+            rows: A generator of (layer_idx, (buid, ...)) tuples.  Rows are read in windows of rowwindow buids
+                whose props are retrieved from each layer in a single getBuidPropsMulti() call.
             rawprop(str):  "raw" propname i.e. if a tag, starts with "#".  Used for filtering so that we skip the props
                 for a buid if we're asking from a higher layer than the row was from (and hence, we'll presumable
                 get/have gotten the row when that layer is lifted.
@@ -591,54 +1004,64 @@ class Snap(s_base.Base):
         Yields:
             (tuple): (row, node)
         '''
-        count = 0
-        async for origlayer, row in rows:
-            count += 1
-            if not count % 5:
-                await asyncio.sleep(0)  # give other tasks some time
-            props = {}
-            buid = row[0]
-            node = self.buidcache.cache.get(buid)
-            # Evaluate layers top-down to more quickly abort if we've found a higher layer with the property set
-            for layeridx in range(len(self.layers) - 1, -1, -1):
-                layr = self.layers[layeridx]
-                layerprops = await layr.getBuidProps(buid)
-                # We mark this node to drop iff we see the prop set in this layer *and* we're looking at the props
-                # from a higher (i.e. closer to write, higher idx) layer.
-                if layeridx > origlayer and rawprop in layerprops:
-                    props = None
-                    break
-                if node is None:
-                    for k, v in layerprops.items():
-                        if k not in props:
-                            props[k] = v
-            if props is None:
-                continue
-            if node is None:
-                node = s_node.Node(self, buid, props.items())
-                if node and node.ndef is not None:
-                    self.buidcache.put(buid, node)
+        async for chunk in s_coro.chunks(rows, size=self.rowwindow):
 
-            if node.ndef is not None:
-                if cmpr:
-                    if rawprop == node.form.name:
-                        valu = node.ndef[1]
-                    else:
-                        valu = node.get(rawprop)
-                    if valu is None:
-                        # cmpr required to evaluate something; cannot know if this
-                        # node is valid or not without the prop being present.
-                        continue
-                    if not cmpr(valu):
-                        continue
+            # gather the props for the whole window of buids from each layer at once
+            buids = list({row[0]: None for origlayer, row in chunk})
 
-                yield row, node
+            layrprops = []
+            for layr in self.layers:
+                layrprops.append({buid: props async for buid, props in self.core.getLayrPropsMulti(layr, buids)})
+
+            count = 0
+            for origlayer, row in chunk:
+
+                count += 1
+                if not count % 100:
+                    await asyncio.sleep(0)  # give other tasks some time
+
+                props = {}
+                buid = row[0]
+                node = self.buidcache.cached(buid)
+                # Evaluate layers top-down to more quickly abort if we've found a higher layer with the property set
+                for layeridx in range(len(self.layers) - 1, -1, -1):
+                    layerprops = layrprops[layeridx].get(buid, {})
+                    # We mark this node to drop iff we see the prop set in this layer *and* we're looking at the props
+                    # from a higher (i.e. closer to write, higher idx) layer.
+                    if layeridx > origlayer and rawprop in layerprops:
+                        props = None
+                        break
+                    if node is None:
+                        for k, v in layerprops.items():
+                            if k not in props:
+                                props[k] = v
+                if props is None:
+                    continue
+                if node is None:
+                    node = s_node.Node(self, buid, props.items())
+                    if node and node.ndef is not None:
+                        self.buidcache.put(buid, node)
+
+                if node.ndef is not None:
+                    if cmpr:
+                        if rawprop == node.form.name:
+                            valu = node.ndef[1]
+                        else:
+                            valu = node.get(rawprop)
+                        if valu is None:
+                            # cmpr required to evaluate something; cannot know if this
+                            # node is valid or not without the prop being present.
+                            continue
+                        if not cmpr(valu):
+                            continue
+
+                    yield row, node
 
     async def _getNodeByBuid(self, buid):
         props = {}
         for layr in self.layers:
-            layerprops = await layr.getBuidProps(buid)
-            props.update(layerprops)
+            async for _, layerprops in self.core.getLayrPropsMulti(layr, (buid,)):
+                props.update(layerprops)
 
         node = s_node.Node(self, buid, props.items())
 
@@ -0,0 +1,192 @@
+import shutil
+import tempfile
+
+import synapse.common as s_common
+
+import synapse.lib.base as s_base
+import synapse.lib.msgpack as s_msgpack
+import synapse.lib.lmdbslab as s_lmdbslab
+
+# commit the temporary slab every so many writes to bound the replay log
+COMMIT_EVERY = 10000
+
+class Spooled(s_base.Base):
+    '''
+    A Base class for collections which hold up to size items in memory
+    and then spill over to a temporary slab.
+
+    Args:
+        size (int): The number of items to hold in memory.
+        dirn (str): The directory to create the temporary slab in (or None for the system temp dir).
+    '''
+    async def __anit__(self, size=10000, dirn=None):
+
+        await s_base.Base.__anit__(self)
+
+        self.size = size
+        self.dirn = dirn
+
+        self.slab = None
+        self.slabdirn = None
+        self.fallback = False
+        self.writes = 0
+
+        self.onfini(self._finiFallBack)
+
+    async def _initFallBack(self):
+
+        self.fallback = True
+
+        if self.dirn is not None:
+            s_common.gendir(self.dirn)
+
+        self.slabdirn = tempfile.mkdtemp(dir=self.dirn)
+        self.slab = await s_lmdbslab.Slab.anit(self.slabdirn, sync='none')
+
+    def _wrote(self):
+
+        self.writes += 1
+        if not self.writes % COMMIT_EVERY:
+            self.slab.forcecommit()
+
+    async def _finiFallBack(self):
+
+        if self.slab is not None:
+            await self.slab.fini()
+            self.slab = None
+
+        if self.slabdirn is not None:
+            shutil.rmtree(self.slabdirn, ignore_errors=True)
+            self.slabdirn = None
+
+        self.fallback = False
+
+    async def clear(self):
+        '''
+        Remove all the items and any temporary slab.
+        '''
+        await self._finiFallBack()
+
+class Set(Spooled):
+    '''
+    A set of msgpack compatible values which spills to a temporary slab.
+
+    Example:
+
+        async with await s_spooled.Set.anit(size=1000) as seen:
+            await seen.add(buid)
+            if buid in seen:
+                ...
+    '''
+    async def __anit__(self, size=10000, dirn=None):
+
+        await Spooled.__anit__(self, size=size, dirn=dirn)
+
+        self.len = 0
+        self.realset = set()
+
+    def __len__(self):
+        return self.len
+
+    def __contains__(self, valu):
+
+        if self.fallback:
+            return self.slab.get(s_msgpack.en(valu)) is not None
+
+        return valu in self.realset
+
+    async def add(self, valu):
+        '''
+        Add a value to the set.
+        '''
+        if not self.fallback:
+
+            if valu in self.realset:
+                return
+
+            self.realset.add(valu)
+            self.len += 1
+
+            if self.len >= self.size:
+
+                await self._initFallBack()
+
+                self.slab.putmulti([(s_msgpack.en(v), b'\x01') for v in self.realset])
+                self.realset.clear()
+
+            return
+
+        if self.slab.put(s_msgpack.en(valu), b'\x01', overwrite=False):
+            self.len += 1
+            self._wrote()
+
+    async def clear(self):
+        await Spooled.clear(self)
+        self.len = 0
+        self.realset.clear()
+
+class Dict(Spooled):
+    '''
+    A dictionary of msgpack compatible keys and values which spills to a temporary slab.
+    '''
+    async def __anit__(self, size=10000, dirn=None):
+
+        await Spooled.__anit__(self, size=size, dirn=dirn)
+
+        self.len = 0
+        self.realdict = {}
+
+    def __len__(self):
+
+        if self.fallback:
+            return self.len
+
+        return len(self.realdict)
+
+    def __contains__(self, name):
+
+        if self.fallback:
+            return self.slab.get(s_msgpack.en(name)) is not None
+
+        return name in self.realdict
+
+    def get(self, name, defv=None):
+        '''
+        Return the value for a key or the default value.
+        '''
+        if not self.fallback:
+            return self.realdict.get(name, defv)
+
+        byts = self.slab.get(s_msgpack.en(name))
+        if byts is None:
+            return defv
+
+        return s_msgpack.un(byts)
+
+    async def set(self, name, valu):
+        '''
+        Set the value for a key.
+        '''
+        if not self.fallback:
+
+            self.realdict[name] = valu
+
+            if len(self.realdict) >= self.size:
+
+                await self._initFallBack()
+
+                self.slab.putmulti([(s_msgpack.en(k), s_msgpack.en(v)) for (k, v) in self.realdict.items()])
+                self.len = len(self.realdict)
+                self.realdict.clear()
+
+            return
+
+        if self.slab.replace(s_msgpack.en(name), s_msgpack.en(valu)) is None:
+            self.len += 1
+
+        self._wrote()
+
+    async def clear(self):
+        await Spooled.clear(self)
+        self.len = 0
+        self.realdict.clear()
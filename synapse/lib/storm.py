@@ -1,6 +1,9 @@
+import os
+import heapq
 import asyncio
 import logging
 import argparse
+import itertools
 import collections
 
 import synapse.exc as s_exc
@@ -9,6 +12,9 @@ import synapse.common as s_common
 
 import synapse.lib.ast as s_ast
 import synapse.lib.node as s_node
+import synapse.lib.spooled as s_spooled
+import synapse.lib.msgpack as s_msgpack
+import synapse.lib.lmdbslab as s_lmdbslab
 import synapse.lib.cache as s_cache
 import synapse.lib.types as s_types
 import synapse.lib.stormtypes as s_stormtypes
@@ -71,6 +77,31 @@ class Runtime:
     def initPath(self, node):
         return s_node.Path(self, dict(self.vars), [node])
 
+    def getSpoolDirn(self):
+        '''
+        Return the directory within the cortex directory where storm operations spill to disk.
+        '''
+        return os.path.join(self.snap.core.dirn, 'tmp')
+
+    async def getSpooledSet(self):
+        '''
+        Return a new spooled Set for deduplicating the nodes in a storm pipeline.
+
+        Notes:
+            The set holds up to the cortex storm:spool:size values in memory before
+            spilling to a temporary slab within the cortex directory.  The caller
+            must fini the set.
+        '''
+        size = self.snap.core.conf.get('storm:spool:size')
+        return await s_spooled.Set.anit(size=size, dirn=self.getSpoolDirn())
+
+    async def getSpooledDict(self):
+        '''
+        Return a new spooled Dict for tracking per-node state in a storm pipeline.
+        '''
+        size = self.snap.core.conf.get('storm:spool:size')
+        return await s_spooled.Dict.anit(size=size, dirn=self.getSpoolDirn())
+
     def getOpt(self, name, defval=None):
         return self.opts.get(name, defval)
 
@@ -159,10 +190,31 @@ class Runtime:
         for name, valu in query.opts.items():
             self.opts.setdefault(name, valu)
 
+        if self.opts.get('readonly') and not query.isReadOnly():
+            raise s_exc.IsReadOnly(mesg='Storm query edits nodes but the readonly option is set.')
+
         async for node, path in query.iterNodePaths(self):
             self.tick()
             yield node, path
 
+    async def getStormQueryCount(self, query):
+        '''
+        Return the number of nodes the query yields or None if it must be run to count them.
+
+        Notes:
+            Queries with inbound nodes, a result limit, or a graph projection are not counted.
+        '''
+        for name, valu in query.opts.items():
+            self.opts.setdefault(name, valu)
+
+        if self.inputs or self.opts.get('ndefs') or self.opts.get('idens'):
+            return None
+
+        if self.opts.get('limit') is not None or self.opts.get('graph') not in (False, None):
+            return None
+
+        return await query.getNodeCount(self)
+
 class Parser(argparse.ArgumentParser):
 
     def __init__(self, prog=None, descr=None):
@@ -205,6 +257,12 @@ class Cmd:
     '''
     name = 'cmd'
 
+    # set to True by commands which implement getNodeCount()
+    countable = False
+
+    # set to True by commands which never edit nodes
+    readonly = False
+
     def __init__(self, argv):
         self.opts = None
         self.argv = argv
@@ -232,11 +290,69 @@ class Cmd:
         ''' Abstract base method '''
         raise s_exc.NoSuchImpl('Subclass must implement execStormCmd')
 
+    def getPropArgs(self, runt, pname):
+        '''
+        Return a (form, name) tuple for a relative or full secondary prop command argument.
+
+        Args:
+            runt (Runtime): The storm runtime.
+            pname (str): A relative (:prop or .univ) or full secondary property name.
+
+        Returns:
+            (tuple): The Form (or None for a relative prop) and the relative prop name.
+        '''
+        prop = None
+        if not pname.startswith((':', '.')):
+            # Are we a full prop name?
+            prop = runt.snap.core.model.prop(pname)
+            if prop is None or prop.isform:
+                mesg = f'{self.name} argument requires a relative secondary ' \
+                    f'property name or a full path to the secondary property.'
+                raise s_exc.BadSyntaxError(mesg=mesg, valu=pname)
+
+        if prop:
+            return prop.form, prop.name
+
+        return None, pname.strip(':')
+
+    def getPropValuFunc(self, runt, pname):
+        '''
+        Return a function which returns the value of a relative or full secondary prop for a node.
+
+        Args:
+            runt (Runtime): The storm runtime.
+            pname (str): A relative (:prop or .univ) or full secondary property name.
+
+        Returns:
+            (function): A function which returns the prop value for a node (or None).
+        '''
+        form, name = self.getPropArgs(runt, pname)
+
+        def getvalu(node):
+
+            if form and node.form is not form:
+                return None
+
+            return node.get(name)
+
+        return getvalu
+
+    async def getNodeCount(self, runt, count):
+        '''
+        Return the number of nodes the command yields for count inbound nodes.
+
+        Notes:
+            This is only called for commands which set countable and allows
+            count only queries to skip constructing the inbound nodes.
+        '''
+        raise s_exc.NoSuchImpl('Subclass must implement getNodeCount')
+
 class HelpCmd(Cmd):
     '''
     List available commands and a brief description for each.
     '''
     name = 'help'
+    readonly = True
 
     def getArgParser(self):
         pars = Cmd.getArgParser(self)
@@ -265,6 +381,8 @@ class LimitCmd(Cmd):
     '''
 
     name = 'limit'
+    countable = True
+    readonly = True
 
     def getArgParser(self):
         pars = Cmd.getArgParser(self)
@@ -283,6 +401,15 @@ class LimitCmd(Cmd):
                 await runt.printf(f'limit reached: {self.opts.count}')
                 break
 
+    async def getNodeCount(self, runt, count):
+
+        # the limit is only checked after a node is yielded
+        if count and count >= self.opts.count:
+            await runt.printf(f'limit reached: {self.opts.count}')
+            return max(self.opts.count, 1)
+
+        return count
+
 class UniqCmd(Cmd):
     '''
     Filter nodes by their uniq iden values.
@@ -296,6 +423,7 @@ class UniqCmd(Cmd):
     '''
 
     name = 'uniq'
+    readonly = True
 
     def getArgParser(self):
         pars = Cmd.getArgParser(self)
@@ -303,15 +431,15 @@ class UniqCmd(Cmd):
 
     async def execStormCmd(self, runt, genr):
 
-        buidset = set()
+        async with await runt.getSpooledSet() as buidset:
 
-        async for node, path in genr:
+            async for node, path in genr:
 
-            if node.buid in buidset:
-                continue
+                if node.buid in buidset:
+                    continue
 
-            buidset.add(node.buid)
-            yield node, path
+                await buidset.add(node.buid)
+                yield node, path
 
 class MaxCmd(Cmd):
     '''
@@ -326,6 +454,7 @@ class MaxCmd(Cmd):
     '''
 
     name = 'max'
+    readonly = True
 
     def getArgParser(self):
         pars = Cmd.getArgParser(self)
@@ -337,29 +466,11 @@ class MaxCmd(Cmd):
         maxvalu = None
         maxitem = None
 
-        pname = self.opts.propname
-        prop = None
-        if not pname.startswith((':', '.')):
-            # Are we a full prop name?
-            prop = runt.snap.core.model.prop(pname)
-            if prop is None or prop.isform:
-                mesg = f'{self.name} argument requires a relative secondary ' \
-                    f'property name or a full path to the secondary property.'
-                raise s_exc.BadSyntaxError(mesg=mesg, valu=pname)
-
-        if prop:
-            name = prop.name
-            form = prop.form
-        else:
-            form = None
-            name = pname.strip(':')
+        getvalu = self.getPropValuFunc(runt, self.opts.propname)
 
         async for node, path in genr:
 
-            if form and node.form is not form:
-                continue
-
-            valu = node.get(name)
+            valu = getvalu(node)
             if valu is None:
                 continue
 
@@ -382,6 +493,7 @@ class MinCmd(Cmd):
 
     '''
     name = 'min'
+    readonly = True
 
     def getArgParser(self):
         pars = Cmd.getArgParser(self)
@@ -393,29 +505,11 @@ class MinCmd(Cmd):
         minvalu = None
         minitem = None
 
-        pname = self.opts.propname
-        prop = None
-        if not pname.startswith((':', '.')):
-            # Are we a full prop name?
-            prop = runt.snap.core.model.prop(pname)
-            if prop is None or prop.isform:
-                mesg = f'{self.name} argument requires a relative secondary ' \
-                    f'property name or a full path to the secondary property.'
-                raise s_exc.BadSyntaxError(mesg=mesg, valu=pname)
-
-        if prop:
-            name = prop.name
-            form = prop.form
-        else:
-            form = None
-            name = pname.strip(':')
+        getvalu = self.getPropValuFunc(runt, self.opts.propname)
 
         async for node, path in genr:
 
-            if form and node.form is not form:
-                continue
-
-            valu = node.get(name)
+            valu = getvalu(node)
             if valu is None:
                 continue
 
@@ -426,6 +520,310 @@ class MinCmd(Cmd):
         if minitem:
             yield minitem
 
+class _Reverse:
+    '''
+    Invert the ordering of a heap entry.
+    '''
+    __slots__ = ('item',)
+
+    def __init__(self, item):
+        self.item = item
+
+    def __lt__(self, othr):
+        return othr.item < self.item
+
+class TopCmd(Cmd):
+    '''
+    Consume nodes and yield the nodes with the highest values for a property.
+
+    Only the requested number of nodes are kept while consuming the inbound
+    nodes.  Nodes are yielded from the highest value to the lowest and nodes
+    without the property are dropped.
+
+    Examples:
+
+        inet:ipv4 +#foo.bar | top :asn
+
+        file:bytes +#foo.bar | top file:bytes:size --size 100
+
+    '''
+    name = 'top'
+    readonly = True
+    reverse = False
+
+    def getArgParser(self):
+        pars = Cmd.getArgParser(self)
+        pars.add_argument('propname')
+        pars.add_argument('--size', type=int, default=10, help='The number of nodes to yield.')
+        return pars
+
+    async def execStormCmd(self, runt, genr):
+
+        size = self.opts.size
+        getvalu = self.getPropValuFunc(runt, self.opts.propname)
+
+        # a heap whose smallest entry is the first to be displaced
+        heap = []
+        seqn = itertools.count()
+
+        async for node, path in genr:
+
+            valu = getvalu(node)
+            if valu is None:
+                continue
+
+            if size <= 0:
+                continue
+
+            # ties are broken by the order the nodes arrived in
+            if self.reverse:
+                entry = _Reverse((valu, next(seqn)))
+            else:
+                entry = (valu, -next(seqn))
+
+            item = (entry, node, path)
+
+            if len(heap) < size:
+                heapq.heappush(heap, item)
+                continue
+
+            if heap[0][0] < entry:
+                heapq.heapreplace(heap, item)
+
+        heap.sort(key=lambda x: x[0], reverse=True)
+        for entry, node, path in heap:
+            yield node, path
+
+class BottomCmd(TopCmd):
+    '''
+    Consume nodes and yield the nodes with the lowest values for a property.
+
+    Only the requested number of nodes are kept while consuming the inbound
+    nodes.  Nodes are yielded from the lowest value to the highest and nodes
+    without the property are dropped.
+
+    Examples:
+
+        inet:ipv4 +#foo.bar | bottom :asn
+
+        file:bytes +#foo.bar | bottom file:bytes:size --size 100
+
+    '''
+    name = 'bottom'
+    reverse = True
+
+class SortCmd(Cmd):
+    '''
+    Consume nodes and yield them sorted by the value of a property.
+
+    Sorted runs of up to --budget nodes are kept in memory.  Once a run is
+    full, the runs are spilled to a temporary slab in the cortex directory
+    and merged back together
+    while yielding.  Nodes from a spilled sort keep their path nodes and
+    metadata but not variables set on the path.  Nodes without the property
+    are dropped.
+
+    Examples:
+
+        inet:ipv4 +#foo.bar | sort :asn
+
+        file:bytes +#foo.bar | sort file:bytes:size --reverse
+
+    '''
+    name = 'sort'
+    readonly = True
+
+    def getArgParser(self):
+        pars = Cmd.getArgParser(self)
+        pars.add_argument('propname')
+        pars.add_argument('--reverse', default=False, action='store_true', help='Sort from the highest value to the lowest.')
+        pars.add_argument('--budget', type=int, default=100000, help='The maximum number of nodes to sort in memory.')
+        return pars
+
+    async def execStormCmd(self, runt, genr):
+
+        budget = max(self.opts.budget, 1)
+        reverse = self.opts.reverse
+        getvalu = self.getPropValuFunc(runt, self.opts.propname)
+
+        run = []
+        slab = None
+
+        def sortkey(x):
+            return x[0]
+
+        with s_common.getTempDir(dirn=runt.getSpoolDirn()) as dirn:
+
+            try:
+
+                async for node, path in genr:
+
+                    valu = getvalu(node)
+                    if valu is None:
+                        continue
+
+                    run.append((valu, node, path))
+                    if len(run) < budget:
+                        continue
+
+                    if slab is None:
+                        slab = await s_lmdbslab.Slab.anit(dirn, sync='none')
+                        runs = []
+
+                    runs.append(self._spillRun(slab, len(runs), sorted(run, key=sortkey, reverse=reverse)))
+                    run.clear()
+
+                    await asyncio.sleep(0)
+
+                if slab is None:
+                    run.sort(key=sortkey, reverse=reverse)
+                    for valu, node, path in run:
+                        yield node, path
+                    return
+
+                if run:
+                    runs.append(self._spillRun(slab, len(runs), sorted(run, key=sortkey, reverse=reverse)))
+                    run.clear()
+
+                genrs = [self._iterRun(slab, pref) for pref in runs]
+
+                count = 0
+                for valu, iden, idens, meta in heapq.merge(*genrs, key=sortkey, reverse=reverse):
+
+                    count += 1
+                    if not count % 1000:
+                        await asyncio.sleep(0)
+
+                    nodes = []
+                    for buid in idens:
+                        pnode = await runt.snap.getNodeByBuid(buid)
+                        if pnode is not None:
+                            nodes.append(pnode)
+
+                    node = await runt.snap.getNodeByBuid(iden)
+                    if node is None:
+                        continue
+
+                    if not nodes or nodes[-1] is not node:
+                        nodes.append(node)
+
+                    path = s_node.Path(runt, dict(runt.vars), nodes)
+                    path.metadata.update(meta)
+
+                    yield node, path
+
+            finally:
+                if slab is not None:
+                    await slab.fini()
+
+    def _spillRun(self, slab, indx, run):
+
+        pref = s_common.int64en(indx)
+
+        rows = []
+        for seqn, (valu, node, path) in enumerate(run):
+            byts = s_msgpack.en((valu, node.buid, [n.buid for n in path.nodes], path.metadata))
+            rows.append((pref + s_common.int64en(seqn), byts))
+
+        slab.putmulti(rows, append=True)
+        return pref
+
+    def _iterRun(self, slab, pref):
+        for lkey, byts in slab.scanByPref(pref):
+            yield s_msgpack.un(byts)
+
+class StatsCmd(Cmd):
+    '''
+    Consume nodes and print the count, sum, min and max of a property.
+
+    The statistics are computed in a single pass over the inbound nodes and
+    may be grouped by the value of another property.  No nodes are yielded.
+
+    Examples:
+
+        inet:ipv4 +#foo.bar | stats :asn
+
+        file:bytes +#foo.bar | stats :size --by :mime
+
+    '''
+    name = 'stats'
+    readonly = True
+
+    def getArgParser(self):
+        pars = Cmd.getArgParser(self)
+        pars.add_argument('propname')
+        pars.add_argument('--by', default=None, help='A property whose value is used to group the nodes.')
+        return pars
+
+    async def execStormCmd(self, runt, genr):
+
+        if False:  # make this method an async generator function
+            yield None
+
+        name = self.getPropArgs(runt, self.opts.propname)[1]
+        getvalu = self.getPropValuFunc(runt, self.opts.propname)
+
+        getgrop = None
+        if self.opts.by is not None:
+            grname = self.getPropArgs(runt, self.opts.by)[1]
+            getgrop = self.getPropValuFunc(runt, self.opts.by)
+
+        # group -> [count, sum, min, max, prop, grop prop]
+        stats = {}
+
+        count = 0
+        async for node, path in genr:
+
+            count += 1
+            if not count % 1000:
+                await asyncio.sleep(0)
+
+            valu = getvalu(node)
+            if valu is None:
+                continue
+
+            grop = None
+            if getgrop is not None:
+                grop = getgrop(node)
+
+            numb = isinstance(valu, (int, float)) and not isinstance(valu, bool)
+
+            stat = stats.get(grop)
+            if stat is None:
+
+                grprop = None
+                if getgrop is not None:
+                    grprop = node.form.props.get(grname)
+
+                stats[grop] = [1, valu if numb else None, valu, valu, node.form.props.get(name), grprop]
+                continue
+
+            stat[0] += 1
+
+            if stat[1] is not None:
+                stat[1] = stat[1] + valu if numb else None
+
+            if valu < stat[2]:
+                stat[2] = valu
+
+            if valu > stat[3]:
+                stat[3] = valu
+
+        for grop, (size, summ, minv, maxv, prop, grprop) in sorted(stats.items(), key=lambda x: repr(x[0])):
+
+            if prop is not None:
+                minv = prop.type.repr(minv, defval=minv)
+                maxv = prop.type.repr(maxv, defval=maxv)
+
+            mesg = f'count={size} sum={summ} min={minv} max={maxv}'
+
+            if getgrop is not None:
+                if grprop is not None and grop is not None:
+                    grop = grprop.type.repr(grop, defval=grop)
+                mesg = f'{grop}: {mesg}'
+
+            await runt.printf(mesg)
+
 class DelNodeCmd(Cmd):
     '''
     Delete nodes produced by the previous query logic.
@@ -715,6 +1113,8 @@ class SpinCmd(Cmd):
 
     '''
     name = 'spin'
+    countable = True
+    readonly = True
 
     async def execStormCmd(self, runt, genr):
 
@@ -730,6 +1130,9 @@ class SpinCmd(Cmd):
             if not i % 1000:
                 await asyncio.sleep(0)
 
+    async def getNodeCount(self, runt, count):
+        return 0
+
 class CountCmd(Cmd):
     '''
     Iterate through query results, and print the resulting number of nodes
@@ -741,6 +1144,8 @@ class CountCmd(Cmd):
 
     '''
     name = 'count'
+    countable = True
+    readonly = True
 
     async def execStormCmd(self, runt, genr):
 
@@ -755,6 +1160,10 @@ class CountCmd(Cmd):
 
         await runt.printf(f'Counted {i} nodes.')
 
+    async def getNodeCount(self, runt, count):
+        await runt.printf(f'Counted {count} nodes.')
+        return count
+
 class IdenCmd(Cmd):
     '''
     Lift nodes by iden.
@@ -764,6 +1173,7 @@ class IdenCmd(Cmd):
         iden b25bc9eec7e159dce879f9ec85fb791f83b505ac55b346fcb64c3c51e98d1175 | count
     '''
     name = 'iden'
+    readonly = True
 
     def getArgParser(self):
         pars = Cmd.getArgParser(self)
@@ -832,6 +1242,7 @@ class NoderefsCmd(Cmd):
 
     '''
     name = 'noderefs'
+    readonly = True
 
     def getArgParser(self):
         pars = Cmd.getArgParser(self)
@@ -872,21 +1283,21 @@ class NoderefsCmd(Cmd):
         if self.opts.degrees < 1:
             raise s_exc.BadOperArg(mesg='degrees must be greater than or equal to 1', arg='degrees')
 
-        visited = set()
+        async with await runt.getSpooledSet() as visited:
 
-        async for node, path in genr:
+            async for node, path in genr:
 
-            if self.opts.join:
-                yield node, path
+                if self.opts.join:
+                    yield node, path
 
-            if self.opts.unique is False:
-                visited = set()
+                if self.opts.unique is False:
+                    await visited.clear()
 
-            # Don't revisit the inbound node from genr
-            visited.add(node.buid)
+                # Don't revisit the inbound node from genr
+                await visited.add(node.buid)
 
-            async for nnode, npath in self.doRefs(node, path, visited):
-                yield nnode, npath
+                async for nnode, npath in self.doRefs(node, path, visited):
+                    yield nnode, npath
 
     async def doRefs(self, srcnode, srcpath, visited):
 
@@ -913,7 +1324,7 @@ class NoderefsCmd(Cmd):
                     if pnode.buid in visited:
                         continue
 
-                    visited.add(pnode.buid)
+                    await visited.add(pnode.buid)
 
                     # Are we clear to yield this node?
                     if pnode.ndef[0] in self.omit_forms:
@@ -1021,6 +1432,7 @@ class SleepCmd(Cmd):
 
     '''
     name = 'sleep'
+    readonly = True
 
     async def execStormCmd(self, runt, genr):
         async for item in genr:
@@ -1037,11 +1449,14 @@ class GraphCmd(Cmd):
     Generate a subgraph from the given input nodes and command line options.
     '''
     name = 'graph'
+    readonly = True
 
     def getArgParser(self):
 
         pars = Cmd.getArgParser(self)
         pars.add_argument('--degrees', type=int, default=1, help='How many degrees to graph out.')
+        pars.add_argument('--max-nodes', type=int, default=None, help='The maximum number of nodes to include in the graph.')
+        pars.add_argument('--max-edges', type=int, default=None, help='The maximum number of edges to include in the graph.')
 
         pars.add_argument('--pivot', default=[], action='append', help='Specify a storm pivot for all nodes. (must quote)')
         pars.add_argument('--filter', default=[], action='append', help='Specify a storm filter for all nodes. (must quote)')
@@ -1056,6 +1471,9 @@ class GraphCmd(Cmd):
         rules = {
             'degrees': self.opts.degrees,
 
+            'maxnodes': self.opts.max_nodes,
+            'maxedges': self.opts.max_edges,
+
             'pivots': [],
             'filters': [],
 
@@ -1088,7 +1506,5 @@ class GraphCmd(Cmd):
 
         subg = s_ast.SubGraph(rules)
 
-        genr = subg.run(runt, genr)
-
         async for node, path in subg.run(runt, genr):
             yield node, path
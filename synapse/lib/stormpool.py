@@ -0,0 +1,369 @@
+'''
+A pool of worker processes which run read-only storm queries for a Cortex.
+'''
+import time
+import asyncio
+import logging
+import multiprocessing
+
+import synapse.exc as s_exc
+import synapse.cells as s_cells
+import synapse.common as s_common
+import synapse.cortex as s_cortex
+import synapse.dyndeps as s_dyndeps
+
+import synapse.lib.ast as s_ast
+import synapse.lib.base as s_base
+import synapse.lib.coro as s_coro
+import synapse.lib.msgpack as s_msgpack
+import synapse.lib.lmdblayer as s_lmdblayer
+
+logger = logging.getLogger(__name__)
+
+# forking a process with a running loop and open LMDB environments is not safe
+mpctx = multiprocessing.get_context('spawn')
+
+# the most messages (and seconds) a worker buffers before sending them to the cortex
+SEND_WINDOW = 100
+SEND_DELAY = 0.1
+
+def _getCtorPath(ctor):
+    return f'{ctor.__module__}.{ctor.__qualname__}'
+
+class StormPool(s_base.Base):
+    '''
+    A pool of worker processes which run read-only storm queries.
+
+    Args:
+        core (synapse.cortex.Cortex): The Cortex which owns the pool.
+        size (int): The maximum number of worker processes.
+
+    Notes:
+        Each worker opens the cortex layers with read-only slabs and yields the same
+        messages as Cortex.streamstorm().  Workers only see committed edits, so any
+        uncommitted layer writes are committed before a query is sent to a worker.
+        Workers are started on demand and a worker whose query is abandoned (or
+        returns an error) is terminated.
+    '''
+    async def __anit__(self, core, size=2):
+
+        await s_base.Base.__anit__(self)
+
+        self.core = core
+        self.size = size
+
+        self.idle = []
+        self.sema = asyncio.Semaphore(size)
+
+        self.stats = {
+            'queries': 0,
+            'workers': 0,
+        }
+
+        async def fini():
+            await asyncio.gather(*[work.fini() for work in self.idle])
+            self.idle.clear()
+
+        self.onfini(fini)
+
+    def stat(self):
+        '''
+        Return a dictionary of statistics for the pool.
+        '''
+        stats = dict(self.stats)
+        stats['size'] = self.size
+        stats['idle'] = len(self.idle)
+        return stats
+
+    def canRunQuery(self, query):
+        '''
+        Return True if the (initialized) Query may be run by a worker.
+        '''
+        # remote layers may not be opened by the workers
+        if not all(isinstance(layr, s_lmdblayer.LmdbLayer) for layr in self.core.layers):
+            return False
+
+        if not query.isReadOnly():
+            return False
+
+        # runt nodes are lifted by functions which are registered with the cortex
+        todo = [query]
+        while todo:
+
+            astn = todo.pop()
+            todo.extend(astn.kids)
+
+            if not isinstance(astn, s_ast.Value) or not isinstance(astn.valu, str):
+                continue
+
+            prop = self.core.model.prop(astn.valu)
+            if prop is not None and prop.isrunt:
+                return False
+
+        return True
+
+    def getWorkerInfo(self):
+        '''
+        Return the info used to construct the WorkerCore in a worker process.
+        '''
+        core = self.core
+
+        cmds = [_getCtorPath(ctor) for ctor in core.stormcmds.values() if ctor.readonly]
+
+        libs = []
+        todo = [((), core.libroot)]
+        while todo:
+
+            path, (name, kids, funcs) = todo.pop()
+
+            ctor = funcs.get('ctor')
+            if ctor is not None:
+                libs.append((path, _getCtorPath(ctor)))
+
+            todo.extend((path + (n,), k) for (n, k) in kids.items())
+
+        conf = {
+            'storm:spool:size': core.conf.get('storm:spool:size'),
+            # the layers are written by the cortex so the worker must not cache their props
+            'node:cache:size': 0,
+        }
+
+        return {
+            'dirn': core.dirn,
+            'conf': conf,
+            'mods': list(core.modules.keys()),
+            'cmds': cmds,
+            'libs': libs,
+            'layers': [layr.dirn for layr in core.layers],
+        }
+
+    async def _commitLayers(self):
+        '''
+        Commit the layers which have uncommitted writes so the workers may read them.
+        '''
+        for layr in self.core.layers:
+            if layr.layrslab.dirty:
+                await layr.commit()
+
+    async def storm(self, text, opts=None):
+        '''
+        Run a read-only storm query in a worker process and yield the storm messages.
+        '''
+        async with self.sema:
+
+            await self._commitLayers()
+
+            if self.idle:
+                work = self.idle.pop()
+            else:
+                work = await Worker.anit(self.getWorkerInfo())
+                self.stats['workers'] += 1
+
+            self.stats['queries'] += 1
+
+            done = False
+            fail = False
+            try:
+
+                async for mesg in work.storm(text, opts=opts):
+
+                    # a worker which returns an error may not be reused
+                    if mesg[0] == 'err':
+                        fail = True
+
+                    yield mesg
+
+                done = True
+
+            finally:
+
+                if done and not fail and not self.isfini:
+                    self.idle.append(work)
+
+                else:
+                    await work.fini()
+
+class Worker(s_base.Base):
+    '''
+    A worker process in a StormPool.
+    '''
+    async def __anit__(self, info):
+
+        await s_base.Base.__anit__(self)
+
+        self.busy = False
+        self.conn, conn = mpctx.Pipe()
+
+        self.proc = mpctx.Process(target=workermain, args=(conn, info), daemon=True)
+        self.proc.start()
+
+        conn.close()
+
+        self.onfini(self._finiWorker)
+
+        # the worker reports whether it could construct the WorkerCore
+        try:
+            retn = s_msgpack.un(await s_coro.executor(self.conn.recv_bytes))
+        except EOFError:
+            await self.fini()
+            raise s_exc.LinkShut(mesg='Storm pool worker exited during startup.')
+
+        if not retn[0]:
+            await self.fini()
+            s_common.result(retn)
+
+    async def _finiWorker(self):
+
+        # an idle worker exits when asked and a busy one is terminated
+        if not self.busy:
+
+            try:
+                self.conn.send_bytes(s_msgpack.en(('fini', {})))
+            except OSError:  # pragma: no cover
+                pass
+
+            await s_coro.executor(self.proc.join, timeout=1)
+
+        if self.proc.is_alive():
+            self.proc.terminate()
+            await s_coro.executor(self.proc.join)
+
+        self.conn.close()
+
+    async def storm(self, text, opts=None):
+        '''
+        Send a storm query to the worker process and yield the storm messages.
+        '''
+        self.busy = True
+        self.conn.send_bytes(s_msgpack.en(('storm', {'text': text, 'opts': opts})))
+
+        while True:
+
+            try:
+                byts = await s_coro.executor(self.conn.recv_bytes)
+            except EOFError:
+                raise s_exc.LinkShut(mesg='Storm pool worker exited.')
+
+            for mesg in s_msgpack.un(byts):
+
+                if mesg[0] == 'done':
+                    self.busy = False
+                    return
+
+                yield mesg
+
+class WorkerCore(s_cortex.Cortex):
+    '''
+    A read-only Cortex which is constructed in a worker process to run storm queries.
+
+    Only the data model, the read-only storm commands and libraries and the layers
+    are loaded.  Core modules are constructed for their model definitions but they
+    are not initialized.
+    '''
+    async def __anit__(self, info):
+
+        await s_base.Base.__anit__(self)
+
+        self.dirn = info.get('dirn')
+        self.conf = s_common.config(info.get('conf'), self.confdefs)
+
+        self._initCoreState()
+
+        async def fini():
+            await asyncio.gather(*[layr.fini() for layr in self.layers])
+        self.onfini(fini)
+
+        for dirn in info.get('layers'):
+            self.layers.append(await s_cells.initFromDirn(dirn, readonly=True))
+
+        self.layer = self.layers[-1]
+
+        self.view = s_cortex.View(self, self.layers)
+
+        mdefs = []
+        for ctor in info.get('mods'):
+
+            modu = self._loadCoreModule(ctor)
+            if modu is None:
+                continue
+
+            mdef = modu.getModelDefs()
+            if mdef is not None:
+                mdefs.extend(mdef)
+
+        self.model.addDataModels(mdefs)
+
+        for ctor in info.get('cmds'):
+            self.addStormCmd(s_dyndeps.getDynLocal(ctor))
+
+        for path, ctor in info.get('libs'):
+            self.addStormLib(path, s_dyndeps.getDynLocal(ctor))
+
+class MesgSender:
+    '''
+    Send storm messages from a worker process in msgpack encoded batches.
+    '''
+    def __init__(self, conn):
+        self.conn = conn
+        self.mesgs = []
+        self.tick = time.monotonic()
+
+    async def put(self, mesg):
+
+        self.mesgs.append(mesg)
+
+        if len(self.mesgs) >= SEND_WINDOW or time.monotonic() - self.tick >= SEND_DELAY:
+            self.flush()
+
+    def flush(self):
+        self.conn.send_bytes(s_msgpack.en(self.mesgs))
+        self.mesgs.clear()
+        self.tick = time.monotonic()
+
+async def _workerLoop(conn, info):
+
+    try:
+        core = await WorkerCore.anit(info)
+    except Exception as e:
+        logger.exception('storm pool worker startup error')
+        conn.send_bytes(s_msgpack.en(s_common.retnexc(e)))
+        return
+
+    conn.send_bytes(s_msgpack.en((True, None)))
+
+    async with core:
+
+        while True:
+
+            mesg = s_msgpack.un(await s_coro.executor(conn.recv_bytes))
+            if mesg[0] == 'fini':
+                return
+
+            text = mesg[1].get('text')
+            opts = mesg[1].get('opts')
+
+            sender = MesgSender(conn)
+
+            try:
+
+                async with await core.snap() as snap:
+
+                    snap.link(sender.put)
+
+                    async for pode in snap.iterStormPodes(text, opts=opts):
+                        await sender.put(('node', pode))
+
+            except Exception as e:
+                enfo = s_common.err(e)
+                enfo[1].pop('esrc', None)
+                enfo[1].pop('ename', None)
+                await sender.put(('err', enfo))
+
+            await sender.put(('done', {}))
+            sender.flush()
+
+def workermain(conn, info):  # pragma: no cover
+    '''
+    The entry point for a StormPool worker process.
+    '''
+    asyncio.run(_workerLoop(conn, info))
@@ -76,6 +76,28 @@ class Type:
         '''
         return None
 
+    def getRegexLiftInfo(self, query):
+        '''
+        Return the info dict for a regex lift operation on this type.
+        '''
+        info = {}
+
+        pref = self.getRegexIndxPref(query)
+        if pref is not None:
+            info['pref'] = pref
+
+        return info
+
+    def getRegexIndxPref(self, query):
+        '''
+        Return index bytes which begin the index of every value matching the regex or None.
+
+        Notes:
+            This allows anchored regex lifts to be satisfied by an index prefix scan
+            for types whose index bytes are the encoded string value.
+        '''
+        return None
+
     def _normStormNode(self, node):
         return self.norm(node.ndef[1])
 
@@ -204,6 +226,16 @@ class Type:
             ('eq', indx),
         )
 
+    def indxByNorm(self, norm):
+        '''
+        Return the equality index bytes for a value which was already normalized by this type.
+        '''
+        indx = self.indx(norm)
+        if indx is None:
+            raise s_exc.NoSuchIndx(name=self.name)
+
+        return indx
+
     def getStorIndx(self, norm):
 
         indx = self.indx(norm)
@@ -1196,6 +1228,17 @@ class StrBase(Type):
             ('pref', valu.encode('utf8', 'surrogatepass')),
         )
 
+    def getRegexIndxPref(self, query):
+
+        text = s_chop.regexpref(query)
+        if not text:
+            return None
+
+        pref = self.indxByPref(text)[0][1]
+
+        # index bytes beyond this may be replaced by a hash (see getStorIndx)
+        return pref[:248]
+
     def indx(self, norm):
         return norm.encode('utf8', 'surrogatepass')
 
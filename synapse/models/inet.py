@@ -238,6 +238,15 @@ class Fqdn(s_types.Type):
     def indx(self, norm):
         return norm[::-1].encode('utf8')
 
+    def getRegexIndxPref(self, query):
+
+        # the index is reversed so an end anchored regex has an index prefix
+        text = s_chop.regexsufx(query)
+        if not text:
+            return None
+
+        return text[::-1].encode('utf8')[:248]
+
     def indxByEq(self, valu):
 
         if valu == '':
@@ -3,6 +3,7 @@ An RMI framework for synapse.
 '''
 
 import os
+import time
 import asyncio
 import logging
 import contextlib
@@ -23,6 +24,15 @@ logger = logging.getLogger(__name__)
 
 televers = (3, 0)
 
+# optional protocol features advertised by the client in the tele:syn handshake
+telefeats = ('t2:credit', 't2:yields')
+
+# the number of generator items a proxy allows in flight on a pool link
+genrcredit = 10000
+
+# the minimum number of seconds between checks for idle pool links
+poolidlewait = 0.1
+
 class Aware:
     '''
     The telepath.Aware mixin allows shared objects to
@@ -197,8 +207,37 @@ class Proxy(s_base.Base):
 
         valu = proxy.getFooValu(x, y)
 
+    The proxy runs calls on a pool of links which may be configured using
+    openurl() options or url query parameters:
+
+        proxy = await s_telepath.openurl('tcp://127.0.0.1:3344/foo?pool:min=4&pool:max=32')
+
     '''
-    async def __anit__(self, link, name):
+    confdefs = (
+
+        ('pool:min', {'defval': 0,
+            'doc': 'The number of pool links to open on connect and keep when they are idle.'}),
+
+        ('pool:max', {'defval': 4,
+            'doc': 'The maximum number of idle pool links.'}),
+
+        ('pool:idle', {'defval': 60.0,
+            'doc': 'The number of seconds an idle pool link (above pool:min) is kept open (or 0 to keep them open).'}),
+
+        ('pool:retry', {'defval': 3,
+            'doc': 'The number of times to retry connecting a pool link.'}),
+
+        ('pool:backoff', {'defval': 0.1,
+            'doc': 'The delay (doubled for each retry) before retrying to connect a pool link.'}),
+
+        ('zip', {'defval': None,
+            'doc': 'Compress messages with a codec (zstd, lz4 or zlib) or "auto" for the best codec both sides support.'}),
+
+        ('zip:size', {'defval': s_link.zipsize,
+            'doc': 'Messages smaller than this many bytes are not compressed.'}),
+    )
+
+    async def __anit__(self, link, name, conf=None):
 
         await s_base.Base.__anit__(self)
         self.tid = s_threads.iden()
@@ -206,11 +245,29 @@ class Proxy(s_base.Base):
         self.link = link
         self.name = name
 
+        if conf is None:
+            conf = {}
+
+        self.conf = s_common.config(conf, self.confdefs)
+
         self.tasks = {}
         self.shares = {}
 
         self.sess = None
+        self.feats = set()
+
+        # the compression codec which was negotiated in the handshake
+        self.zip = None
         self.links = collections.deque()
+        self.poollinks = set()
+
+        self.poolstats = {
+            'opened': 0,
+            'closed': 0,
+            'reused': 0,
+            'reaped': 0,
+            'retries': 0,
+        }
 
         self.synack = None
         self.syndone = asyncio.Event()
@@ -243,15 +300,27 @@ class Proxy(s_base.Base):
         self.onfini(fini)
         self.link.onfini(self.fini)
 
+    def getPoolStats(self):
+        '''
+        Return a dictionary of statistics for the pool links.
+        '''
+        stats = dict(self.poolstats)
+        stats['size'] = len(self.poollinks)
+        stats['idle'] = len(self.links)
+        stats['busy'] = len(self.poollinks) - len(self.links)
+        return stats
+
     async def getPoolLink(self):
 
         while self.links and not self.isfini:
 
-            link = self.links.popleft()
+            # the most recently used link is reused to let the others go idle
+            link = self.links.pop()
 
             if link.isfini:
                 continue
 
+            self.poolstats['reused'] += 1
             return link
 
         # we need a new one...
@@ -263,9 +332,34 @@ class Proxy(s_base.Base):
         host = self.link.get('host')
         port = self.link.get('port')
 
-        # TODO loop / backoff
-        link = await s_link.connect(host, port, ssl=ssl)
+        retry = self.conf.get('pool:retry')
+        delay = self.conf.get('pool:backoff')
+
+        while True:
 
+            try:
+                link = await s_link.connect(host, port, ssl=ssl)
+                break
+
+            except OSError:
+
+                if retry <= 0 or self.isfini:
+                    raise
+
+                retry -= 1
+                self.poolstats['retries'] += 1
+
+                await asyncio.sleep(delay)
+                delay *= 2
+
+        self.poolstats['opened'] += 1
+        self.poollinks.add(link)
+
+        async def fini():
+            self.poollinks.discard(link)
+            self.poolstats['closed'] += 1
+
+        link.onfini(fini)
         self.onfini(link)
 
         return link
@@ -275,12 +369,73 @@ class Proxy(s_base.Base):
         if link.isfini:
             return
 
-        # a pool of 4 max for now...
-        if len(self.links) >= 4:
+        if len(self.links) >= self.conf.get('pool:max'):
             return await link.fini()
 
+        link.set('pool:tick', time.monotonic())
         self.links.append(link)
 
+    async def _initPoolLinks(self):
+        '''
+        Open the pool:min pool links and start closing idle links.
+        '''
+        size = self.conf.get('pool:min') - len(self.poollinks)
+        if size > 0:
+            for link in await asyncio.gather(*[self._initPoolLink() for i in range(size)]):
+                await self._putPoolLink(link)
+
+        self.schedCoro(self._poolIdleLoop())
+
+    async def _poolIdleLoop(self):
+
+        idle = self.conf.get('pool:idle')
+        if idle <= 0:
+            return
+
+        wait = max(idle / 2, poolidlewait)
+
+        while not await self.waitfini(timeout=wait):
+
+            tick = time.monotonic() - idle
+
+            # the least recently used links are on the left
+            while len(self.links) > self.conf.get('pool:min'):
+
+                link = self.links[0]
+                if link.get('pool:tick') > tick:
+                    break
+
+                self.links.popleft()
+                self.poolstats['reaped'] += 1
+
+                await link.fini()
+
+    async def _cancelPoolLink(self, link):
+        '''
+        Cancel a generator stream and return the pool link once the stream ends.
+        '''
+        try:
+
+            await link.tx(('t2:cancel', {}))
+
+            while True:
+
+                mesg = await link.rx()
+                if mesg is None:
+                    return
+
+                if mesg[0] != 't2:yield':
+                    continue
+
+                retn = mesg[1].get('retn')
+                if retn is None or not retn[0]:
+                    await self._putPoolLink(link)
+                    return
+
+        except Exception:
+            logger.exception('Proxy._cancelPoolLink')
+            await link.fini()
+
     def __enter__(self):
         '''
         Convenience function to enable using Proxy objects as synchronous context managers.
@@ -348,10 +503,20 @@ class Proxy(s_base.Base):
                     'sess': self.sess,
         })
 
+        # the server only advances a generator while we have granted it credit
+        credit = None
+        if 't2:credit' in self.feats:
+            credit = genrcredit
+            mesg[1]['credit'] = credit
+
         link = await self.getPoolLink()
 
         await link.tx(mesg)
 
+        # the server enables compression on a pool link once it receives the t2:init
+        if self.zip is not None and link.zip is None:
+            link.setLinkZip(self.zip, size=self.conf.get('zip:size'))
+
         mesg = await link.rx()
         if mesg is None:
             return
@@ -365,6 +530,8 @@ class Proxy(s_base.Base):
 
             async def genrloop():
 
+                done = 0
+
                 try:
 
                     while True:
@@ -373,6 +540,22 @@ class Proxy(s_base.Base):
                         if mesg is None:
                             return
 
+                        # a batch of items from a server which supports t2:yields
+                        if mesg[0] == 't2:yields':
+
+                            for item in mesg[1].get('items'):
+
+                                yield item
+
+                                # grant credit for consumed items in half window increments
+                                if credit is not None:
+                                    done += 1
+                                    if done >= credit // 2:
+                                        await link.tx(('t2:credit', {'credit': done}))
+                                        done = 0
+
+                            continue
+
                         assert mesg[0] == 't2:yield'
 
                         retn = mesg[1].get('retn')
@@ -386,8 +569,19 @@ class Proxy(s_base.Base):
 
                         yield s_common.result(retn)
 
+                        if credit is not None:
+                            done += 1
+                            if done >= credit // 2:
+                                await link.tx(('t2:credit', {'credit': done}))
+                                done = 0
+
                 except GeneratorExit as e:
-                    # if they bail early on the genr, fini the link
+
+                    # if they bail early on the genr, cancel the stream to reuse the link
+                    if credit is not None and not self.isfini:
+                        self.schedCoro(self._cancelPoolLink(link))
+                        return
+
                     await link.fini()
 
             return s_coro.GenrHelp(genrloop())
@@ -430,8 +624,22 @@ class Proxy(s_base.Base):
             'auth': auth,
             'vers': televers,
             'name': self.name,
+            'feats': telefeats,
         })
 
+        name = self.conf.get('zip')
+        if name is not None:
+
+            codecs = tuple(s_link.zipcodecs.keys())
+            if name != 'auto':
+
+                if name not in s_link.zipcodecs:
+                    raise s_exc.BadOptValu(name='zip', valu=name, mesg=f'Unknown compression codec: {name}')
+
+                codecs = (name,)
+
+            mesg[1]['zip'] = {'codecs': codecs, 'size': self.conf.get('zip:size')}
+
         await self.link.tx(mesg)
 
         self.synack = await self.link.rx()
@@ -440,6 +648,11 @@ class Proxy(s_base.Base):
             raise s_exc.LinkShutDown(mesg=mesg)
 
         self.sess = self.synack[1].get('sess')
+        self.feats = set(self.synack[1].get('feats', ()))
+
+        self.zip = self.synack[1].get('zip')
+        if self.zip is not None:
+            self.link.setLinkZip(self.zip, size=self.conf.get('zip:size'))
 
         vers = self.synack[1].get('vers')
         if vers[0] != televers[0]:
@@ -601,13 +814,34 @@ async def openurl(url, **opts):
         certdir = s_certdir.CertDir(certpath)
         sslctx = certdir.getClientSSLContext()
 
+    # proxy options may also be given as url query parameters
+    conf = {}
+    confdefs = dict(Proxy.confdefs)
+    for qkey, qval in info.get('query', {}).items():
+
+        cdef = confdefs.get(qkey)
+        if cdef is None:
+            continue
+
+        defv = cdef.get('defval')
+        if defv is not None:
+            try:
+                qval = type(defv)(qval)
+            except ValueError:
+                raise s_exc.BadUrl(mesg=f'Invalid url query value {qkey}={qval}', name=qkey, valu=qval)
+
+        conf[qkey] = qval
+
+    conf.update({k: v for (k, v) in opts.items() if k in confdefs})
+
     link = await s_link.connect(host, port, ssl=sslctx)
 
-    prox = await Proxy.anit(link, name)
+    prox = await Proxy.anit(link, name, conf=conf)
     prox.onfini(link)
 
     try:
         await prox.handshake(auth=auth)
+        await prox._initPoolLinks()
 
     except Exception as e:
         await prox.fini()
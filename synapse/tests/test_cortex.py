@@ -9,8 +9,10 @@ import synapse.glob as s_glob
 import synapse.common as s_common
 import synapse.telepath as s_telepath
 
+import synapse.lib.ast as s_ast
 import synapse.lib.coro as s_coro
 import synapse.lib.node as s_node
+import synapse.lib.storm as s_storm
 import synapse.lib.msgpack as s_msgpack
 
 import synapse.tests.utils as s_t_utils
@@ -1644,6 +1646,189 @@ class CortexTest(s_t_utils.SynTest):
             await core1.addFeedData('syn.nodes', podes)
             await self.agenlen(3, core1.eval('testint'))
 
+    async def test_cortex_storm_plans(self):
+
+        async with self.getTestCore() as core:
+
+            stat = (await core.stat()).get('storm:plans')
+
+            q0 = core.getStormQuery('teststr=$foo | limit 10')
+            q1 = core.getStormQuery('teststr=$foo | limit 10')
+            q2 = core.getStormQuery('  teststr = $foo  |  limit 10 ')
+            q3 = core.getStormQuery('teststr=$foo | limit 20')
+            q4 = core.getStormQuery('teststr="$foo" | limit 10')
+
+            self.true(q0 is q1)
+            self.true(q0 is q2)
+            self.true(q0 is not q3)
+            self.true(q0 is not q4)
+
+            plans = (await core.stat()).get('storm:plans')
+            self.eq(plans['hits'] - stat['hits'], 2)
+            self.eq(plans['misses'] - stat['misses'], 3)
+
+            await self.agenlen(1, core.eval('[ teststr=hehe ]'))
+            opts = {'vars': {'foo': 'hehe'}}
+            self.len(1, await alist(core.eval('teststr=$foo | limit 10', opts=opts)))
+            self.len(1, await alist(core.eval('teststr = $foo | limit 10', opts=opts)))
+
+            # changing the storm commands invalidates any cached plans
+            core.addStormCmd(s_storm.MaxCmd)
+            self.true(q0 is not core.getStormQuery('teststr=$foo | limit 10'))
+
+    async def test_cortex_pivot_lifter(self):
+
+        async with self.getTestCore() as core:
+
+            lifter = s_ast.PivotLifter(core.model)
+
+            prop = core.model.prop('inet:dns:a:ipv4')
+            ipv4 = core.model.form('inet:ipv4').type
+
+            tmpl, indx = lifter.getLift('inet:dns:a:ipv4', '1.2.3.4')
+            self.eq(tmpl, ('byprop', prop.pref, 'ipv4'))
+            self.eq(indx, prop.type.indx(0x01020304))
+
+            # normalized values of the same type skip norm()
+            with patch.object(prop.type, 'norm', side_effect=Exception('newp')):
+                self.eq((tmpl, prop.type.indx(5)), lifter.getLift('inet:dns:a:ipv4', 5, srctype=ipv4))
+                self.raises(Exception, lifter.getLift, 'inet:dns:a:ipv4', 6)
+
+            # lifts are memoized per value
+            self.true(lifter.getLift('inet:dns:a:ipv4', 5) is lifter.getLift('inet:dns:a:ipv4', 5))
+            self.eq(lifter.getLift('refs:n1', ['inet:ipv4', 5]), lifter.getLift('refs:n1', ('inet:ipv4', 5)))
+
+            self.raises(s_exc.BadTypeValu, lifter.getLift, 'inet:dns:a:ipv4', 'newp')
+            self.raises(s_exc.NoSuchProp, lifter.getLift, 'inet:dns:a:newp', 5)
+
+    async def test_cortex_lift_hints(self):
+
+        async with self.getTestCore() as core:
+
+            await core.eval('[ inet:fqdn=woot.com inet:fqdn=vertex.link +#bad ]').spin()
+            await core.eval('[ inet:fqdn=a.foo.com inet:fqdn=b.foo.com +#bad ]').spin()
+
+            text = 'inet:fqdn +#bad +:zone=vertex.link'
+            self.eq(['vertex.link'], [n.ndef[1] async for n in core.eval(text)])
+
+            query = core.getStormQuery(text)
+
+            # the cheaper tag filter is evaluated first
+            cond = core.getStormQuery('inet:fqdn +(:zone=vertex.link and #bad)').kids[1].kids[1]
+            self.isinstance(cond.kids[0], s_ast.TagCond)
+
+            # conditions which may edit nodes are never reordered
+            cond = core.getStormQuery('inet:fqdn +({ [ +#seen ] } and :zone^=vertex)').kids[1].kids[1]
+            self.isinstance(cond.kids[0], s_ast.SubqCond)
+
+            count = len(await alist(core.eval('inet:fqdn')))
+            await self.agenlen(1, core.eval('inet:fqdn +({ [ +#seen ] } and :zone^=vertex)'))
+            await self.agenlen(count, core.eval('inet:fqdn#seen'))
+
+            async with await core.snap() as snap:
+
+                runt = s_storm.Runtime(snap)
+                form = core.model.form('inet:fqdn')
+                lift = await query.kids[0]._getHintLift(runt, form)
+
+                # remote layers do not keep prop counts and use the tag lift
+                if await snap.getPropCount('inet:fqdn') is None:
+                    self.eq(lift, ('tag', 'bad', None))
+                else:
+                    self.eq(lift, ('prop', 'inet:fqdn:zone', 'vertex.link'))
+
+    async def test_cortex_filt_sync(self):
+
+        async with self.getTestCore() as core:
+
+            await core.eval('[ inet:ipv4=1.2.3.4 :asn=10 +#foo=(2015, 2016) ]').spin()
+            await core.eval('[ inet:ipv4=5.6.7.8 :asn=20 +#bar ]').spin()
+            await core.eval('[ inet:ipv4=9.9.9.9 ]').spin()
+            await core.eval('[ inet:asn=10 :name=ten ]').spin()
+
+            async with await core.snap() as snap:
+
+                runt = s_storm.Runtime(snap)
+
+                def getsync(text):
+                    return core.getStormQuery(text).kids[1].kids[1].getCondSync(runt)
+
+                self.nn(getsync('inet:ipv4 +(#foo or (:asn=10 and not #bar))'))
+                self.nn(getsync('inet:ipv4 +#foo@=2015'))
+                self.nn(getsync('inet:ipv4 +inet:ipv4:asn>15'))
+                self.nn(getsync('inet:ipv4 +inet:ipv4=1.2.3.4'))
+
+                # subqueries, implicit pivots and runtime values are awaited per node
+                self.none(getsync('inet:ipv4 +{ -> inet:asn }'))
+                self.none(getsync('inet:ipv4 +(#foo or { -> inet:asn })'))
+                self.none(getsync('inet:ipv4 +:asn::name=ten'))
+                self.none(getsync('inet:ipv4 +:asn=$asn'))
+
+            for filtpace in (1000, 2):
+
+                async def getvals(text, opts=None):
+                    async with await core.snap() as snap:
+                        snap.filtpace = filtpace
+                        return [n.ndef[1] async for n in snap.eval(text, opts=opts)]
+
+                self.eq([0x01020304], await getvals('inet:ipv4 +#foo'))
+                self.eq([0x05060708, 0x09090909], await getvals('inet:ipv4 -#foo'))
+                self.eq([0x01020304, 0x05060708], await getvals('inet:ipv4 +(#foo or #bar)'))
+                self.eq([0x01020304], await getvals('inet:ipv4 +(:asn=10 and not #bar)'))
+                self.eq([0x05060708], await getvals('inet:ipv4 +:asn>15'))
+                self.eq([0x05060708], await getvals('inet:ipv4 +inet:ipv4:asn>15'))
+                self.eq([0x01020304], await getvals('inet:ipv4 +#foo@=2015'))
+                self.eq([0x01020304], await getvals('inet:ipv4 +inet:ipv4=1.2.3.4'))
+                self.eq([0x01020304, 0x05060708], await getvals('inet:ipv4 +:asn -:asn=0'))
+                self.eq([0x01020304], await getvals('inet:ipv4 +:asn::name=ten'))
+                self.eq([0x01020304], await getvals('inet:ipv4 +{ -> inet:asn +:name=ten }'))
+                self.eq([0x01020304], await getvals('inet:ipv4 +:asn=$asn', opts={'vars': {'asn': 10}}))
+
+            # sync filters do not read ahead of the nodes they yield
+            await self.agenlen(1, core.eval('inet:ipv4 [ +#hehe ] +#foo | limit 1'))
+            await self.agenlen(1, core.eval('inet:ipv4#hehe'))
+
+    async def test_cortex_node_cache(self):
+
+        async with self.getTestCore() as core:
+
+            await self.agenlen(1, core.eval('[ teststr=hehe :tick=2015 +#foo ]'))
+
+            node = (await alist(core.eval('teststr=hehe')))[0]
+
+            # remote layers are never cached
+            if core.layer.cancache:
+
+                self.nn(core.nodecache.cached((core.layer, node.buid)))
+
+                stat = (await core.stat()).get('node:cache')
+                self.gt(stat['size'], 0)
+                self.gt(stat['bytes'], 0)
+
+            # edits from any snap remove the cached props
+            await self.agenlen(1, core.eval('teststr=hehe [ :tick=2016 -#foo ]'))
+            self.none(core.nodecache.cached((core.layer, node.buid)))
+
+            nodes = await alist(core.eval('teststr=hehe'))
+            self.eq(nodes[0].get('tick'), 1451606400000)
+            self.none(nodes[0].getTag('foo'))
+
+            # edits stored directly to the layer also remove the cached props
+            await core.layer.stor(core.model.prop('teststr:tick').getSetOps(node.buid, 1483228800000))
+            self.none(core.nodecache.cached((core.layer, node.buid)))
+
+            nodes = await alist(core.eval('teststr=hehe'))
+            self.eq(nodes[0].get('tick'), 1483228800000)
+
+            await self.agenlen(0, core.eval('teststr=hehe | delnode'))
+            await self.agenlen(0, core.eval('teststr=hehe'))
+
+            # node:cache:size=0 disables the cache
+            core.nodecache = None
+            await self.agenlen(1, core.eval('[ teststr=hehe ]'))
+            await self.agenlen(1, core.eval('teststr=hehe'))
+            self.eq(0, (await core.stat())['node:cache']['size'])
+
     async def test_stat(self):
 
         async with self.getTestDmon(mirror='dmoncoreauth') as dmon:
@@ -2288,6 +2473,42 @@ class CortexTest(s_t_utils.SynTest):
             self.none(alldefs.get(('syn:tag', 'nope')))
             self.none(alldefs.get(('inet:dns:a', ('vertex.link', 0x05050505))))
 
+    async def test_storm_subgraph_budget(self):
+
+        async with self.getTestCore() as core:
+
+            await core.eval('[ inet:dns:a=(woot.com, 1.2.3.4) inet:dns:a=(vertex.link, 1.2.3.4) ]').spin()
+            await core.eval('[ inet:dns:a=(vertex.link, 5.6.7.8) inet:dns:a=(newp.com, 9.9.9.9) ]').spin()
+
+            async def graph(text, rules):
+                ret = {}
+                async for node, path in core.storm(text, opts={'graph': rules}):
+                    ret[node.ndef] = sorted(e[0] for e in path.metadata.get('edges'))
+                return ret
+
+            rules = {'degrees': 2, 'pivots': ['-> *', '<- *']}
+            full = await graph('inet:fqdn=woot.com', dict(rules))
+            self.len(5, full)
+
+            # queries which are not only pivots and filters run per node
+            self.eq(full, await graph('inet:fqdn=woot.com', dict(rules, pivots=['-> * | uniq', '<- * | uniq'])))
+            self.eq(full, await graph('inet:fqdn=woot.com', dict(rules, concurrency=1, pivots=['-> * | uniq', '<- *'])))
+
+            # filters are run per frontier
+            nodes = await graph('inet:fqdn', dict(rules, filters=['-inet:fqdn:issuffix=1']))
+            self.notin(('inet:fqdn', 'com'), nodes)
+            self.isin(('inet:fqdn', 'newp.com'), nodes)
+
+            mesgs = await core.streamstorm('inet:fqdn=woot.com | graph --degrees 2 --pivot {-> *} --pivot {<- *} --max-nodes 3').list()
+            nodes = [m[1] for m in mesgs if m[0] == 'node']
+            self.len(3, nodes)
+
+            prints = [m[1].get('mesg') for m in mesgs if m[0] == 'print']
+            self.isin('graph pruned 2 nodes and 0 edges over budget', prints)
+
+            nodes = await graph('inet:fqdn=woot.com', dict(rules, maxedges=2))
+            self.eq(2, sum(len(edges) for edges in nodes.values()))
+
     async def test_storm_lib_time(self):
 
         async with self.getTestCore() as core:
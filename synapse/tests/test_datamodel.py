@@ -24,3 +24,35 @@ class DataModelTest(s_t_utils.SynTest):
             self.false(modelinfo.isuniv('seen'))
             self.true(modelinfo.isprop('testtype10:intprop'))
             self.true(modelinfo.isprop('testtype10.seen'))
+
+    async def test_datamodel_pivmaps(self):
+
+        async with self.getTestCore() as core:
+
+            modl = core.model
+
+            self.isin(('fqdn', 'inet:fqdn'), modl.pivsout['inet:dns:a'])
+            self.isin(('ipv4', 'inet:ipv4'), modl.pivsout['inet:dns:a'])
+            self.isin(('n1', None), modl.pivsout['refs'])
+
+            self.eq(('fqdn',), modl.pivsrc[('inet:dns:a', 'inet:fqdn')])
+            self.eq(('inet:dns:a:fqdn',), modl.pivdst[('inet:fqdn', 'inet:dns:a')])
+            self.none(modl.pivsrc.get(('inet:fqdn', 'inet:dns:a')))
+
+            self.isin(modl.prop('inet:dns:a:fqdn'), modl.pivsin['inet:fqdn'])
+
+            # the maps are rebuilt when models are added
+            mdef = {
+                'types': (
+                    ('test:pivmap', ('str', {}), {}),
+                ),
+                'forms': (
+                    ('test:pivmap', {}, (
+                        ('fqdn', ('inet:fqdn', {}), {}),
+                    )),
+                ),
+            }
+            modl.addDataModels([('test', mdef)])
+
+            self.eq((('fqdn', 'inet:fqdn'),), modl.pivsout['test:pivmap'])
+            self.eq(('test:pivmap:fqdn',), modl.pivdst[('inet:fqdn', 'test:pivmap')])
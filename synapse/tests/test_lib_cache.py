@@ -34,6 +34,48 @@ class CacheTest(s_t_utils.SynTest):
         self.len(0, cache.fifo)
         self.len(0, cache.cache)
 
+    def test_lib_cache_lru(self):
+
+        def callback(name):
+            return name.lower()
+
+        cache = s_cache.LruCache(callback, size=2)
+
+        self.eq('foo', cache.get('FOO'))
+        self.eq('bar', cache.get('BAR'))
+
+        # touching FOO makes BAR the least recently used
+        self.eq('foo', cache.get('FOO'))
+        self.eq('baz', cache.get('BAZ'))
+
+        self.len(2, cache)
+        self.nn(cache.cached('FOO'))
+        self.nn(cache.cached('BAZ'))
+        self.none(cache.cached('BAR'))
+
+        self.eq('baz', cache.pop('BAZ'))
+        self.len(1, cache)
+
+        cache.clear()
+        self.len(0, cache)
+
+        cache = s_cache.LruCache(callback, size=100, maxbytes=10, sizefunc=len)
+
+        cache.get('AAAA')
+        cache.get('BBBB')
+        self.eq(8, cache.bytes)
+
+        cache.get('CCCC')
+        self.eq(8, cache.bytes)
+        self.none(cache.cached('AAAA'))
+
+        cache.put('DDDD', 'dddddd')
+        self.eq(10, cache.bytes)
+        self.eq(('CCCC', 'DDDD'), tuple(cache.cache.keys()))
+
+        cache.clear()
+        self.eq(0, cache.bytes)
+
     def test_lib_cache_memoize(self):
 
         misses = 0
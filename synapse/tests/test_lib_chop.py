@@ -77,3 +77,33 @@ class ChopTest(s_t_utils.SynTest):
         for tv, ev in tvs:
             gv = s_chop.stormstring(tv)
             self.eq(gv, ev)
+
+    def test_chop_regexpref(self):
+        self.none(s_chop.regexpref('foo'))
+        self.none(s_chop.regexpref('^foo|bar'))
+        self.none(s_chop.regexpref('^(?i)foo'))
+        self.eq('', s_chop.regexpref('^.*foo'))
+        self.eq('foo', s_chop.regexpref('^foo'))
+        self.eq('foo', s_chop.regexpref('^foo$'))
+        self.eq('foo', s_chop.regexpref('^foo[0-9]'))
+        self.eq('fo', s_chop.regexpref('^foo?'))
+        self.eq('fo', s_chop.regexpref('^foo*'))
+        self.eq('fo', s_chop.regexpref('^foo{2}'))
+        self.eq('foo', s_chop.regexpref('^foo+'))
+        self.eq('foo.bar', s_chop.regexpref('^foo\\.bar'))
+        self.eq('foo', s_chop.regexpref('^foo\\d'))
+        self.eq('fo', s_chop.regexpref('^fo\\.?'))
+        self.eq('foo', s_chop.regexpref('^foo\\'))
+
+    def test_chop_regexsufx(self):
+        self.none(s_chop.regexsufx('foo'))
+        self.none(s_chop.regexsufx('foo\\$'))
+        self.none(s_chop.regexsufx('foo|bar$'))
+        self.eq('', s_chop.regexsufx('foo.*$'))
+        self.eq('foo', s_chop.regexsufx('^foo$'))
+        self.eq('.foo', s_chop.regexsufx('\\.foo$'))
+        self.eq('foo', s_chop.regexsufx('[0-9]foo$'))
+        self.eq('oo', s_chop.regexsufx('f?oo$'))
+        self.eq('', s_chop.regexsufx('foo+$'))
+        self.eq('foo', s_chop.regexsufx('\\dfoo$'))
+        self.eq('\\foo', s_chop.regexsufx('\\\\foo$'))
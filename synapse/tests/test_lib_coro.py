@@ -1,3 +1,5 @@
+import time
+import asyncio
 import contextlib
 
 import synapse.exc as s_exc
@@ -38,6 +40,47 @@ class CoroTest(s_t_utils.SynTest):
 
         await self.agenraises(s_exc.MustBeLocal, s_coro.genr2agenr(badgenr, 10))
 
+    async def test_coro_chunks(self):
+
+        async def agen(n):
+            for i in range(n):
+                yield i
+
+        self.eq([[0, 1, 2], [3, 4, 5], [6]], [c async for c in s_coro.chunks(agen(7), size=3)])
+        self.eq([[0, 1, 2]], [c async for c in s_coro.chunks(agen(3), size=3)])
+        self.eq([], [c async for c in s_coro.chunks(agen(0), size=3)])
+
+    async def test_coro_ordered(self):
+
+        async def slow(name, n):
+            for i in range(n):
+                await asyncio.sleep(0.1)
+                yield (name, i)
+
+        async def boom():
+            yield 'hehe'
+            raise s_exc.NoSuchIden()
+
+        genrs = [slow('a', 3), slow('b', 3), slow('c', 3)]
+
+        tick = time.time()
+        items = [x async for x in s_coro.ordered(genrs, size=10)]
+        took = time.time() - tick
+
+        self.eq(items, [(n, i) for n in 'abc' for i in range(3)])
+
+        # all three were drained at once
+        self.lt(took, 0.7)
+
+        self.eq([(0, 0)], [x async for x in s_coro.ordered([slow(0, 1)])])
+
+        with self.raises(s_exc.NoSuchIden):
+            [x async for x in s_coro.ordered([slow('a', 1), boom()])]
+
+        # exiting early cancels the others
+        async for item in s_coro.ordered([slow('a', 3), slow('b', 100)], size=2):
+            break
+
     async def test_coro_genrhelp(self):
 
         @s_coro.genrhelp
@@ -1,4 +1,13 @@
+import os
 import contextlib
+
+import synapse.common as s_common
+
+import synapse.lib.layer as s_layer
+import synapse.lib.migrate as s_migrate
+import synapse.lib.lmdblayer as s_lmdblayer
+
+from synapse.tests.utils import alist
 import synapse.tests.utils as s_t_utils
 
 
@@ -35,14 +44,363 @@ class LayerTest(s_t_utils.SynTest):
                 node = await snap.addNode('teststr', 'c', {'tick': '1972'})
                 oper = ('teststr', 'tick', (0, 24*60*60*366))
 
+                # the generic (full scan) ival lifts must survive bad values
+                funcs = {
+                    'prop:ival': s_layer.Layer._liftByPropIval,
+                    'univ:ival': s_layer.Layer._liftByUnivIval,
+                    'form:ival': s_layer.Layer._liftByFormIval,
+                }
+
                 async def liftByHandler(lopf, expt):
                     count = 0
-                    lops = ((lopf, oper),)
-                    async for node in snap.getLiftRows(lops):
-                        count += 1
+                    for layr in snap.layers:
+                        async for row in funcs[lopf](layr, (lopf, oper)):
+                            count += 1
                     self.assertTrue(count == expt)
 
                 with patch_snap(snap):
                     await liftByHandler('prop:ival', 1)
                     await liftByHandler('univ:ival', 1)
                     await liftByHandler('form:ival', 1)
+
+    async def test_layer_getbuidpropsmulti(self):
+
+        async with self.getTestCore() as core:
+
+            async with await core.snap() as snap:
+                node0 = await snap.addNode('teststr', 'a', {'tick': '2001'})
+                node1 = await snap.addNode('teststr', 'b')
+
+            layr = core.layers[0]
+            buids = (node1.buid, b'\x00' * 32, node0.buid)
+            rows = [row async for row in layr.getBuidPropsMulti(buids)]
+
+            self.eq([r[0] for r in rows], buids)
+            self.eq(rows[0][1], await layr.getBuidProps(node1.buid))
+            self.eq(rows[1][1], {})
+            self.eq(rows[2][1]['*teststr'], 'a')
+            self.eq(rows[2][1]['tick'], 978307200000)
+
+            # lifts which span several materialization windows
+            async with await core.snap() as snap:
+                snap.rowwindow = 2
+                self.len(2, await alist(snap.getNodesBy('teststr')))
+                self.len(1, await alist(snap.getNodesBy('teststr:tick')))
+
+    async def test_layer_stor_batch(self):
+
+        async with self.getTestCore() as core:
+
+            layr = core.layers[0]
+            buid = s_common.buid()
+
+            tick = core.model.prop('teststr:tick')
+            form = core.model.form('teststr')
+
+            # the net effect of the ops is stored regardless of their order
+            sops = []
+            sops.extend(form.getSetOps(buid, 'hehe'))
+            sops.extend(tick.getSetOps(buid, 10))
+            sops.extend(tick.getSetOps(buid, 20))
+            sops.extend(tick.getSetOps(buid, 10))
+            sops.extend(tick.getDelOps(buid))
+            sops.extend(tick.getSetOps(buid, 30))
+            await layr.stor(sops)
+
+            self.eq({'*teststr': 'hehe', 'tick': 30}, await layr.getBuidProps(buid))
+            self.eq(((buid, 30),), await alist(layr.iterPropRows('teststr', 'tick')))
+
+            self.len(0, await alist(layr.getLiftRows(tick.getLiftOps(10))))
+            self.len(0, await alist(layr.getLiftRows(tick.getLiftOps(20))))
+            self.len(1, await alist(layr.getLiftRows(tick.getLiftOps(30))))
+
+            await layr.stor(tick.getDelOps(buid))
+            self.eq({'*teststr': 'hehe'}, await layr.getBuidProps(buid))
+            self.len(0, await alist(layr.iterPropRows('teststr', 'tick')))
+
+    async def test_layer_covering(self):
+
+        async with self.getTestCore() as core:
+
+            layr = core.layers[0]
+            self.false(layr.covering)
+
+            async with await core.snap() as snap:
+                await snap.addNode('teststr', 'foo', {'tick': '2001', '.seen': ('2010', '2011')})
+                await snap.addNode('teststr', 'bar', {'tick': '2002'})
+                node = await snap.addNode('testint', 10)
+                await node.addTag('hehe', valu=('2015', '2016'))
+
+            formrows = await alist(layr.iterFormRows('teststr'))
+            proprows = await alist(layr.iterPropRows('teststr', 'tick'))
+            univrows = await alist(layr.iterUnivRows('#hehe'))
+
+            async with await s_migrate.Migration.anit(core, s_common.guid()) as migr:
+                await migr.addCoveringIndx()
+
+            self.true(layr.covering)
+
+            self.eq(formrows, await alist(layr.iterFormRows('teststr')))
+            self.eq(proprows, await alist(layr.iterPropRows('teststr', 'tick')))
+            self.eq(univrows, await alist(layr.iterUnivRows('#hehe')))
+            self.len(1, await alist(layr.iterUnivRows('.seen')))
+            self.len(1, await alist(layr.iterPropRows('testint', '#hehe')))
+
+            # the covering indexes are maintained by storage operations
+            await core.eval('teststr=bar [ :tick=2003 ]').spin()
+            await core.eval('teststr=foo [ -:tick -.seen ]').spin()
+            await core.eval('[ teststr=baz :tick=2004 ]').spin()
+
+            self.eq(('bar', 'baz', 'foo'), sorted(r[1] for r in await alist(layr.iterFormRows('teststr'))))
+            self.eq((1041379200000, 1072915200000), sorted(r[1] for r in await alist(layr.iterPropRows('teststr', 'tick'))))
+            self.len(0, await alist(layr.iterUnivRows('.seen')))
+
+            self.len(2, await core.eval('teststr~="^ba"').list())
+            self.len(1, await core.eval('teststr:tick@=(2003, 2004)').list())
+
+            await core.eval('teststr=baz | delnode').spin()
+            self.eq(('bar', 'foo'), sorted(r[1] for r in await alist(layr.iterFormRows('teststr'))))
+
+            # migrating a node buid moves the covering rows
+            async with await s_migrate.Migration.anit(core, s_common.guid()) as migr:
+                async for mlayr, buid, valu in migr.getFormTodo('testint'):
+                    await migr.setNodeForm(mlayr, buid, 'testint', valu, valu + 1000)
+
+            self.eq([1010], [r[1] for r in await alist(layr.iterFormRows('testint'))])
+            rows = await alist(layr.iterUnivRows('#hehe'))
+            self.len(1, rows)
+            self.eq(rows[0][0], s_common.buid(('testint', 1010)))
+
+    async def test_layer_covering_fresh(self):
+
+        with self.getTestDir() as dirn:
+
+            conf = {'lmdb:covering': True}
+            s_common.yamlsave(conf, dirn, 'cell.yaml')
+
+            async with await s_lmdblayer.LmdbLayer.anit(dirn) as layr:
+                self.true(layr.covering)
+
+            # the covering state is stored in the layer
+            s_common.yamlsave({}, dirn, 'cell.yaml')
+            async with await s_lmdblayer.LmdbLayer.anit(dirn) as layr:
+                self.true(layr.covering)
+
+            async with await s_lmdblayer.LmdbLayer.anit(dirn, readonly=True) as layr:
+                self.true(layr.covering)
+
+    async def test_layer_ival_indx(self):
+
+        async with self.getTestCore() as core:
+
+            await core.eval('[ teststr=a .seen=(2010, 2012) +#foo=(2010, 2011) ]').spin()
+            await core.eval('[ teststr=b .seen=(2014, 2015) +#foo=(2014, 2016) ]').spin()
+            await core.eval('[ teststr=c .seen=(2012, 2013) +#foo ]').spin()
+            await core.eval('[ testint=10 .seen=(2011, 2014) ]').spin()
+
+            layr = core.layers[0]
+
+            ival = core.model.type('ival').norm(('2011', '2013'))[0]
+            rows = await alist(layr._liftByUnivIval(('univ:ival', (None, '.seen', ival))))
+            buids = set(r[0] for r in rows)
+            self.eq(buids, {s_common.buid(('teststr', 'a')), s_common.buid(('teststr', 'c')),
+                            s_common.buid(('testint', 10))})
+
+            rows = await alist(layr._liftByPropIval(('prop:ival', ('teststr', '.seen', ival))))
+            self.len(2, rows)
+
+            # the ival max is exclusive
+            ival = core.model.type('ival').norm(('2015', '2016'))[0]
+            self.len(0, await alist(layr._liftByUnivIval(('univ:ival', (None, '.seen', ival)))))
+
+            # tags with no ival are skipped
+            self.eq(['a'], [n.ndef[1] for n in await core.eval('teststr#foo@=(2009, 2011)').list()])
+            self.eq(['a', 'b'], sorted(n.ndef[1] for n in await core.eval('#foo@=(2010, 2015)').list()))
+            self.eq(['b'], [n.ndef[1] for n in await core.eval('teststr#foo@=2015').list()])
+            self.len(1, await core.eval('teststr.seen@=(2012, 2013)').list())
+
+    async def test_layer_ival_bukts(self):
+
+        async with self.getTestCore() as core:
+
+            layr = core.layers[0]
+            self.true(layr.ivalindx)
+
+            await core.eval('[ teststr=a .seen=(2010, 2012) +#foo=(2010, 2011) ]').spin()
+            await core.eval('[ teststr=b .seen=(2014, 2015) +#foo=(2014, 2016) ]').spin()
+            await core.eval('[ teststr=c .seen=(2012, "?") +#foo ]').spin()
+            await core.eval('[ teststr=d .seen=2013 +#foo=(2013, 2014) ]').spin()
+            await core.eval('[ testint=10 .seen=(1969, 2014) ]').spin()
+
+            queries = (
+                'teststr.seen@=(2011, 2013)',
+                'teststr.seen@=2013',
+                'teststr.seen@=(2050, 2051)',
+                '.seen@=(1968, 1970)',
+                '.seen@=(2012, 2013)',
+                'teststr#foo@=(2013, 2015)',
+                '#foo@=(2010, 2013)',
+                '#foo@=2015',
+            )
+
+            async def getNdefs():
+                retn = []
+                for text in queries:
+                    retn.append(sorted(n.ndef for n in await core.eval(text).list()))
+                return retn
+
+            ndefs = await getNdefs()
+            self.eq(ndefs[0], (('teststr', 'a'), ('teststr', 'c')))
+            self.eq(ndefs[1], (('teststr', 'c'), ('teststr', 'd')))
+            self.eq(ndefs[2], (('teststr', 'c'),))
+            self.eq(ndefs[3], (('testint', 10),))
+            self.eq(ndefs[5], (('teststr', 'b'), ('teststr', 'd')))
+            self.eq(ndefs[6], (('teststr', 'a'),))
+            self.eq(ndefs[7], (('teststr', 'b'),))
+
+            # the full scan fallback gives the same results
+            layr.ivalindx = False
+            self.eq(ndefs, await getNdefs())
+            layr.ivalindx = True
+
+            # updates and deletes are reflected in the index (.seen is merged)
+            self.len(1, await core.eval('teststr.seen@=(2016, 2017)').list())
+            await core.eval('teststr=a [ .seen=2020 -#foo ]').spin()
+            self.len(2, await core.eval('teststr.seen@=(2016, 2017)').list())
+            self.eq([], await core.eval('#foo@=(2010, 2011)').list())
+
+            self.len(1, await core.eval('#foo@=2013').list())
+            await core.eval('teststr=d | delnode').spin()
+            self.len(0, await core.eval('#foo@=2013').list())
+
+            ndefs = await getNdefs()
+
+            # simulate a layer from before the ival index and migrate it
+            layr.layrslab.dropdb(layr.bypropival)
+            layr.layrslab.dropdb(layr.byunivival)
+            layr.layrslab.delete(b'layer:ivalindx')
+            layr.ivalindx = False
+
+            async with await s_migrate.Migration.anit(core, s_common.guid()) as migr:
+                await migr.addIvalIndx()
+
+            self.true(layr.ivalindx)
+            self.eq(ndefs, await getNdefs())
+
+    def test_layer_ivalindx(self):
+
+        def indx(minv, maxv):
+            return s_lmdblayer.timeindx(minv) + s_lmdblayer.timeindx(maxv)
+
+        # a one msec interval is in the first level
+        self.eq(0, s_lmdblayer.ivalindx(indx(0, 1))[0])
+        self.eq(0, s_lmdblayer.ivalindx(indx(0, 1024))[0])
+        self.eq(1, s_lmdblayer.ivalindx(indx(0, 1025))[0])
+        self.eq(1, s_lmdblayer.ivalindx(indx(1023, 1025))[0])
+
+        byts = s_lmdblayer.ivalindx(indx(-1, 0x7fffffffffffffff))
+        self.eq(len(s_lmdblayer.IVAL_SHIFTS) - 1, byts[0])
+        self.eq(byts[9:], indx(-1, 0x7fffffffffffffff))
+
+    async def test_layer_prop_counts(self):
+
+        async with self.getTestCore() as core:
+
+            layr = core.layers[0]
+            self.true(layr.propcounted)
+
+            await core.eval('[ teststr=a :tick=2015 .seen=2016 +#foo.bar ]').spin()
+            await core.eval('[ teststr=b :tick=2015 +#foo ]').spin()
+            await core.eval('[ testint=10 +#foo ]').spin()
+
+            async def getCounts():
+                return (
+                    await layr.getPropCount('teststr'),
+                    await layr.getPropCount('teststr', 'tick'),
+                    await layr.getPropCount('teststr', '#foo'),
+                    await layr.getPropCount(None, '#foo'),
+                    await layr.getPropCount(None, '.seen'),
+                )
+
+            self.eq((2, 2, 2, 3, 1), await getCounts())
+
+            # setting a prop again does not change the counts
+            await core.eval('teststr=a [ :tick=2016 ]').spin()
+            self.eq(2, await layr.getPropCount('teststr', 'tick'))
+
+            await core.eval('teststr=a [ -:tick -#foo ]').spin()
+            self.eq((2, 1, 1, 2, 1), await getCounts())
+
+            prop = core.model.prop('teststr:tick')
+            indx = prop.type.indx(prop.type.norm('2015')[0])
+            self.eq(1, await layr.getIndxCount('byprop', prop.pref, indx))
+            self.eq(0, await layr.getIndxCount('byprop', prop.pref, b'newp'))
+
+            async with await core.snap() as snap:
+                self.eq(2, await snap.getPropCount('teststr'))
+                self.eq(1, await snap.getEqCount('teststr:tick', '2015'))
+                self.none(await snap.getEqCount('teststr:tick', ('2015', '2016'), ))
+
+            counts = await getCounts()
+
+            # simulate a layer from before the prop counts and migrate it
+            layr.layrslab.dropdb(layr.bypropcount)
+            layr.layrslab.delete(b'layer:propcounts')
+            layr.propcounts.clear()
+            layr.propcounted = False
+
+            self.none(await layr.getPropCount('teststr'))
+
+            async with await s_migrate.Migration.anit(core, s_common.guid()) as migr:
+                await migr.addPropCounts()
+
+            self.true(layr.propcounted)
+            self.eq(counts, await getCounts())
+
+            # the counts persist
+            await core.fini()
+            async with await s_lmdblayer.LmdbLayer.anit(layr.dirn) as layr:
+                self.eq(counts, await getCounts())
+
+    async def test_layer_regex_pref(self):
+
+        async with self.getTestCore() as core:
+
+            await core.eval('[ teststr=foobar teststr=foobaz teststr=barfoo teststr="foo.bar" ]').spin()
+            await core.eval('[ inet:fqdn=www.vertex.link inet:fqdn=vertex.link inet:fqdn=woot.com ]').spin()
+
+            layr = core.layers[0]
+
+            lops = core.model.form('teststr').getLiftOps('^foob', cmpr='~=')
+            self.eq(lops[0][1][2], {'pref': b'foob'})
+            self.len(2, await alist(layr.getLiftRows(lops)))
+
+            # the prefix only narrows the scan, the regex is still checked
+            self.len(1, await core.eval('teststr~="^foo.bar"').list())
+            self.len(1, await core.eval('teststr~="^foo\\.bar"').list())
+            self.len(2, await core.eval('teststr~="^fooba[rz]$"').list())
+            self.len(3, await core.eval('teststr~="^f?o"').list())
+            self.len(0, await core.eval('teststr~="^FOO"').list())
+            self.len(1, await core.eval('teststr~="^(?i)BAR"').list())
+
+            self.len(2, await core.eval('inet:fqdn~="^w"').list())
+            self.len(1, await core.eval('inet:fqdn:host~="^ve"').list())
+
+            # inet:fqdn is indexed in reverse so end anchored regexes scan an index prefix
+            lops = core.model.form('inet:fqdn').getLiftOps('\\.vertex\\.link$', cmpr='~=')
+            self.eq(lops[0][1][2], {'pref': b'knil.xetrev.'})
+            self.len(1, await alist(layr.getLiftRows(lops)))
+            self.len(2, await core.eval('inet:fqdn~="vertex\\.link$"').list())
+
+            # no index prefix for types which do not index as strings
+            self.eq({}, core.model.prop('teststr:tick').type.getRegexLiftInfo('^2'))
+
+    def test_layer_fairpace(self):
+
+        pace = s_layer.FairPace()
+        self.false(any(pace.due() for i in range(100)))
+
+        pace.tick -= 1
+        self.false(any(pace.due() for i in range(s_layer.FAIR_ITERS - 1)))
+        self.true(pace.due())
+        self.false(pace.due())
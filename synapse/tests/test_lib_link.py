@@ -1,6 +1,19 @@
+import time
+import zlib
+import asyncio
+import logging
+import unittest.mock as mock
+
+import msgpack
+
+import synapse.exc as s_exc
+
 import synapse.tests.utils as s_test
 
 import synapse.lib.link as s_link
+import synapse.lib.msgpack as s_msgpack
+
+logger = logging.getLogger(__name__)
 
 class LinkTest(s_test.SynTest):
 
@@ -20,3 +33,111 @@ class LinkTest(s_test.SynTest):
         await link.send(b'visi')
         self.eq(b'vert', await link.recvsize(4))
         self.none(await link.recvsize(1))
+
+    async def test_link_zip(self):
+
+        mesgs = []
+        done = asyncio.Event()
+
+        async def onlink(link):
+            link.setLinkZip('zlib')
+            while len(mesgs) < 3:
+                mesgs.append(await link.rx())
+            await link.tx(('hehe', 'V' * 10000))
+            await link.fini()
+            done.set()
+
+        serv = await s_link.listen('127.0.0.1', 0, onlink)
+        host, port = serv.sockets[0].getsockname()
+
+        async with await s_link.connect(host, port) as link:
+
+            with self.raises(s_exc.BadOptValu):
+                link.setLinkZip('newp')
+
+            link.setLinkZip('zlib', size=100)
+
+            await link.tx(('haha', 'small'))
+            await link.tx(('haha', 'V' * 10000))
+            await link.txbyts(s_msgpack.en(('haha', b'V' * 10000)))
+
+            self.eq(('hehe', 'V' * 10000), await link.rx())
+
+            await asyncio.wait_for(done.wait(), timeout=5)
+
+        serv.close()
+
+        self.eq(mesgs, [('haha', 'small'), ('haha', 'V' * 10000), ('haha', b'V' * 10000)])
+
+    async def test_link_zip_reject(self):
+
+        zips = []
+        retn = asyncio.Queue()
+
+        async def onlink(link):
+            if zips.pop():
+                link.setLinkZip('zlib')
+            await retn.put(await link.rx())
+
+        serv = await s_link.listen('127.0.0.1', 0, onlink)
+        host, port = serv.sockets[0].getsockname()
+
+        async def check(code, valu, zip=True):
+            zips.append(zip)
+            async with await s_link.connect(host, port) as link:
+                await link.send(s_msgpack.en(msgpack.ExtType(code, zlib.compress(s_msgpack.en(valu)))))
+                return await asyncio.wait_for(retn.get(), timeout=5)
+
+        with mock.patch('synapse.lib.link.unzipsize', 1000):
+
+            self.eq(('haha', 'V' * 900), await check(1, ('haha', 'V' * 900)))
+
+            # compressed messages are not accepted until compression is enabled
+            self.none(await check(1, ('haha', 'V' * 900), zip=False))
+
+            # unknown codecs
+            self.none(await check(99, ('haha', 'V' * 900)))
+
+            # messages which decompress to more than unzipsize bytes
+            self.none(await check(1, ('haha', 'V' * 1000)))
+
+        serv.close()
+
+    async def test_link_rx_throughput(self):
+
+        rates = {}
+
+        for size, count in ((1000000, 100), (100000000, 2)):
+
+            sizes = []
+            done = asyncio.Event()
+
+            async def onlink(link):
+                while len(sizes) < count:
+                    mesg = await link.rx()
+                    self.eq(mesg[0], 'blob')
+                    sizes.append(len(mesg[1]))
+                await link.fini()
+                done.set()
+
+            serv = await s_link.listen('127.0.0.1', 0, onlink)
+            host, port = serv.sockets[0].getsockname()
+
+            blob = b'V' * size
+
+            async with await s_link.connect(host, port) as link:
+
+                tick = time.perf_counter()
+
+                for i in range(count):
+                    await link.tx(('blob', blob))
+
+                await asyncio.wait_for(done.wait(), timeout=30)
+
+                rates[size] = size * count / (time.perf_counter() - tick)
+
+            serv.close()
+
+            self.eq(sizes, [size] * count)
+
+        logger.warning('link rx MB/sec: 1MB=%.1f 100MB=%.1f', rates[1000000] / 1e6, rates[100000000] / 1e6)
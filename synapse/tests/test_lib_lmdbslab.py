@@ -65,14 +65,111 @@ class LmdbSlabTest(s_t_utils.SynTest):
             items = list(scan)
             self.eq(items, ((b'\x00\x02', b'visi'), (b'\x00\x02', b'zomg')))
 
+            # multiple prefix scans share a single cursor across commits
+            scan = slab.scanByPrefMulti((b'\x00\x02', b'\x00\x04', b'\x00\x01'), db=foo)
+            self.eq((b'\x00\x02', [(b'\x00\x02', b'haha')]), next(scan))
+
+            slab.forcecommit()
+
+            items = list(scan)
+            self.eq(items, ((b'\x00\x04', []), (b'\x00\x01', [(b'\x00\x01', b'hehe')])))
+
+            items = list(slab.scanByDupsMulti((b'\x00\x01', b'\x00\x02', b'\x00\x04'), db=bar))
+            self.eq(items[0], (b'\x00\x01', [(b'\x00\x01', b'hehe')]))
+            self.len(3, items[1][1])
+            self.eq(items[2], (b'\x00\x04', []))
+
+            items = list(slab.scanByDupsMulti((b'\x00\x02', b'\x00\x04'), db=foo))
+            self.eq(items, ((b'\x00\x02', [(b'\x00\x02', b'haha')]), (b'\x00\x04', [])))
+
+            slab.dropdb(foo)
+            self.none(slab.get(b'\x00\x01', db=foo))
+            self.eq(b'hehe', slab.get(b'\x00\x01', db=bar))
+
+            # a batch only writes the last edit of each key / dup
+            batch = s_lmdbslab.Batch(slab)
+
+            batch.put(b'\x00\x09', b'newp', foo)
+            batch.put(b'\x00\x08', b'hoho', foo)
+            self.eq(b'newp', batch.get(b'\x00\x09', foo))
+            self.none(slab.get(b'\x00\x09', db=foo))
+
+            batch.delete(b'\x00\x09', foo)
+            self.none(batch.get(b'\x00\x09', foo))
+
+            batch.putdup(b'\x00\x02', b'newp', bar)
+            batch.deldup(b'\x00\x02', b'newp', bar)
+            batch.deldup(b'\x00\x02', b'visi', bar)
+            batch.deldup(b'\x00\x02', b'zomg', bar)
+            batch.putdup(b'\x00\x02', b'zomg', bar)
+            batch.putdup(b'\x00\x07', b'hehe', bar)
+
+            batch.commit()
+            self.len(0, batch.edits)
+
+            self.eq(b'hoho', slab.get(b'\x00\x08', db=foo))
+            self.none(slab.get(b'\x00\x09', db=foo))
+
+            items = list(slab.scanByDups(b'\x00\x02', db=bar))
+            self.eq(items, ((b'\x00\x02', b'haha'), (b'\x00\x02', b'zomg')))
+            self.eq(b'hehe', slab.get(b'\x00\x07', db=bar))
+
+            self.eq(1, slab.delmulti(((b'\x00\x08', None), (b'\x00\x09', None)), db=foo))
+            self.eq(1, slab.delmulti(((b'\x00\x02', b'haha'), (b'\x00\x02', b'newp')), db=bar))
+            self.eq(items[1:], tuple(slab.scanByDups(b'\x00\x02', db=bar)))
+
             # start a scan and then fini the whole db...
-            scan = slab.scanByPref(b'\x00', db=foo)
+            scan = slab.scanByPref(b'\x00', db=bar)
             self.eq((b'\x00\x01', b'hehe'), next(scan))
 
             await slab.fini()
 
             self.raises(s_exc.IsFini, next, scan)
 
+    async def test_lmdbslab_sync(self):
+
+        with self.getTestDir() as dirn:
+
+            path = os.path.join(dirn, 'test.lmdb')
+
+            with self.raises(s_exc.BadConfValu):
+                await s_lmdbslab.Slab.anit(path, map_size=100000, sync='newp')
+
+            async with await s_lmdbslab.Slab.anit(path, map_size=100000, sync='periodic') as slab:
+
+                foo = slab.initdb('foo')
+
+                slab.put(b'\x00\x01', b'hehe', db=foo)
+                slab.putmulti(((b'\x00\x02', b'haha'), (b'\x00\x03', b'hoho')), db=foo)
+
+                ostat = slab.stat()
+                self.eq('periodic', ostat['sync'])
+                self.eq(2, ostat['xactops'])
+
+                self.true(slab.forcecommit())
+                self.true(slab.unsynced)
+
+                stat = slab.stat()
+                self.eq(0, stat['xactops'])
+                self.eq(ostat['commits'] + 1, stat['commits'])
+                self.eq(2, stat['xactops:max'])
+
+                await slab._syncInThread()
+                self.false(slab.unsynced)
+                self.ge(slab.stat()['syncs'], 1)
+
+                slab.put(b'\x00\x04', b'hoho', db=foo)
+
+            async with await s_lmdbslab.Slab.anit(path, map_size=100000, sync='none') as slab:
+                foo = slab.initdb('foo')
+                self.eq(b'hoho', slab.get(b'\x00\x04', db=foo))
+                slab.put(b'\x00\x05', b'lulz', db=foo)
+
+            async with await s_lmdbslab.Slab.anit(path, map_size=100000) as slab:
+                foo = slab.initdb('foo')
+                self.eq(b'lulz', slab.get(b'\x00\x05', db=foo))
+                self.eq('always', slab.stat()['sync'])
+
     async def test_lmdbslab_grow(self):
 
         with self.getTestDir() as dirn:
@@ -156,6 +253,7 @@ class LmdbSlabTest(s_t_utils.SynTest):
                 self.raises(s_exc.IsReadOnly, newdb.pop, b'1234')
                 self.raises(s_exc.IsReadOnly, newdb.delete, b'1234')
                 self.raises(s_exc.IsReadOnly, newdb.putmulti, ((b'1234', b'3456'),))
+                self.raises(s_exc.IsReadOnly, newdb.delmulti, ((b'1234', None),))
 
                 # While we have the DB open in readonly, have another process write a bunch of data to cause the
                 # map size to be increased
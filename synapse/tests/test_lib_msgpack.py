@@ -13,6 +13,11 @@ class MsgPackTest(s_t_utils.SynTest):
         byts = s_msgpack.en(('hehe', 10))
         self.eq(byts, b'\x92\xa4hehe\n')
 
+    def test_msgpack_enarray(self):
+        items = [s_msgpack.en(('hehe', i)) for i in range(20)]
+        self.eq(s_msgpack.un(s_msgpack.enarray(items)), tuple(('hehe', i) for i in range(20)))
+        self.eq(s_msgpack.un(s_msgpack.enarray(())), ())
+
     def test_msgpack_un(self):
         item = s_msgpack.un(b'\x92\xa4hehe\n')
         self.eq(item, ('hehe', 10))
@@ -2,6 +2,7 @@ import os
 import random
 import asyncio
 import contextlib
+import unittest.mock as mock
 
 import synapse.common as s_common
 
@@ -79,6 +80,191 @@ class SnapTest(s_t_utils.SynTest):
                 self.len(1, nodes)
                 self.eq(nodes[0], node)
 
+    async def test_addNodes_bulk(self):
+
+        async with self.getTestCore() as core:
+
+            async with await core.snap() as snap:
+
+                snap.addwindow = 3
+
+                await snap.addNode('teststr', 'hehe', props={'tick': 3})
+
+                ndefs = (
+                    (('teststr', 'hehe'), {'props': {'bar': ('testint', 10)}}),
+                    (('teststr', 'haha'), {'props': {'tick': 1}}),
+                    (('teststr', 'haha'), {'props': {'tick': 2}, 'tags': {'foo': (None, None)}}),
+                    (('testint', 20), {}),
+                )
+                nodes = await alist(snap.addNodes(ndefs))
+                self.len(4, nodes)
+
+                self.eq(nodes[0].ndef, ('teststr', 'hehe'))
+                self.eq(nodes[0].get('tick'), 3)
+                self.eq(nodes[0].get('bar'), ('testint', 10))
+
+                # duplicate nodedefs share the node with merged props
+                self.true(nodes[1] is nodes[2])
+                self.eq(nodes[1].get('tick'), 2)
+                self.nn(nodes[1].getTag('foo'))
+
+                self.eq(nodes[3].ndef, ('testint', 20))
+
+                # merge type props of duplicate nodedefs are merged rather than replaced
+                ndefs = (
+                    (('teststr', 'hoho'), {'props': {'.seen': ('2015', '2016')}}),
+                    (('teststr', 'hoho'), {'props': {'.seen': ('2017', '2018')}}),
+                    (('teststr', 'hehe'), {'props': {'.seen': ('2012', '2013')}}),
+                    (('teststr', 'hehe'), {'props': {'.seen': ('2011', '2012')}}),
+                )
+                nodes = await alist(snap.addNodes(ndefs))
+
+                self.eq(nodes[0].get('.seen'), (1420070400000, 1514764800000))
+                self.eq(nodes[2].get('.seen'), (1293840000000, 1356998400000))
+
+            await self.agenlen(3, core.eval('teststr'))
+            await self.agenlen(1, core.eval('testint=10'))
+            await self.agenlen(1, core.eval('teststr=haha +#foo'))
+
+            # a bad nodedef falls back to adding the window one node at a time
+            async with await core.snap() as snap:
+
+                snap.strict = False
+
+                ndefs = (
+                    (('testint', 30), {}),
+                    (('testint', 'newp'), {}),
+                    (('testint', 40), {}),
+                )
+                nodes = await alist(snap.addNodes(ndefs))
+                self.len(3, nodes)
+                self.eq(nodes[0].ndef, ('testint', 30))
+                self.none(nodes[1])
+                self.eq(nodes[2].ndef, ('testint', 40))
+
+                # other errors in the bulk path are logged before the fallback
+                async def newp(buids):
+                    raise Exception('newp')
+
+                with self.getLoggerStream('synapse.lib.snap', 'bulk node add error') as stream:
+
+                    with mock.patch.object(snap, '_loadBuidCache', newp):
+                        nodes = await alist(snap.addNodes(((('testint', 50), {}),)))
+
+                    self.true(stream.wait(1))
+
+                self.eq(nodes[0].ndef, ('testint', 50))
+
+    async def test_snap_pivots(self):
+
+        async with self.getTestCore() as core:
+
+            await core.eval('[ inet:dns:a=(woot.com, 1.2.3.4) inet:dns:a=(vertex.link, 1.2.3.4) ]').spin()
+            await core.eval('[ inet:dns:a=(vertex.link, 5.6.7.8) inet:fqdn=newp.com +#foo ]').spin()
+
+            queries = (
+                'inet:fqdn +inet:fqdn <- *',
+                'inet:ipv4 +inet:ipv4 <+- *',
+                'inet:dns:a -> *',
+                'inet:dns:a -> inet:fqdn',
+                'inet:fqdn -> inet:dns:a',
+                'inet:dns:a :fqdn -> *',
+                'inet:dns:a :ipv4 -+> inet:ipv4',
+                'syn:tag=foo -> *',
+                'inet:fqdn -> #',
+            )
+
+            async def pivot(text, size):
+                async with await core.snap() as snap:
+                    snap.pivwindow = size
+                    return [(n.ndef, [x.ndef for x in p.nodes]) async for n, p in snap.storm(text)]
+
+            for text in queries:
+                # windows of one node are the same as resolving each pivot alone
+                self.eq(await pivot(text, 1), await pivot(text, 2))
+                self.eq(await pivot(text, 1), await pivot(text, 1000))
+
+            self.len(9, await pivot('inet:fqdn +inet:fqdn <- *', 1000))
+            self.len(6, await pivot('inet:dns:a :ipv4 -+> inet:ipv4', 2))
+
+            async with await core.snap() as snap:
+
+                nodes = await snap.getNodesByNdefs((('inet:ipv4', 0x01020304), ('inet:ipv4', 1), ('inet:ipv4', 0x01020304)))
+                self.eq(nodes[0].ndef, ('inet:ipv4', 0x01020304))
+                self.none(nodes[1])
+                self.true(nodes[0] is nodes[2])
+
+                prop = core.model.prop('inet:dns:a:fqdn')
+                indxs = [prop.type.indx('vertex.link'), prop.type.indx('woot.com'), prop.type.indx('newp.com')]
+                found = await snap.getNodesByIndxEqs('byprop', prop.pref, indxs, prop.name)
+                self.len(2, found[indxs[0]])
+                self.len(1, found[indxs[1]])
+                self.len(0, found[indxs[2]])
+
+    async def test_snap_count(self):
+
+        async with self.getTestCore() as core:
+
+            await core.eval('[ inet:fqdn=woot.com inet:fqdn=vertex.link +#bad inet:fqdn=a.foo.com +#bad.x ]').spin()
+
+            queries = (
+                ('inet:fqdn', 6),
+                ('inet:fqdn#bad', 3),
+                ('#bad.x', 3),
+                ('inet:fqdn:zone=foo.com', 2),
+                ('inet:fqdn=woot.com', 1),
+                ('inet:fqdn#bad | count', 3),
+                ('inet:fqdn | limit 2', 2),
+                ('inet:fqdn | spin', 0),
+                ('inet:fqdn +#bad', 3),
+                ('inet:fqdn +{ #bad }=4', 6),
+                ('inet:fqdn +{ #bad | limit 1 }>2', 0),
+            )
+
+            async with await core.snap() as snap:
+
+                for text, size in queries:
+                    self.eq(size, await snap.count(text))
+                    self.eq(size, len(await alist(snap.eval(text))))
+
+                # only lifts are counted without running the query
+                with snap.getStormRuntime() as runt:
+                    self.eq(3, await runt.getStormQueryCount(core.getStormQuery('inet:fqdn#bad')))
+                    self.none(await runt.getStormQueryCount(core.getStormQuery('inet:fqdn +#bad')))
+                    self.none(await runt.getStormQueryCount(core.getStormQuery('inet:fqdn | uniq')))
+
+                with snap.getStormRuntime(opts={'ndefs': [('inet:fqdn', 'woot.com')]}) as runt:
+                    self.none(await runt.getStormQueryCount(core.getStormQuery('inet:fqdn')))
+
+                # subquery sizes are counted once per filter and only up to the compared value
+                calls = []
+                getLiftCount = snap.getLiftCount
+
+                async def getLiftCountCalls(lops, rawprop, maxsize=None):
+                    calls.append(maxsize)
+                    return await getLiftCount(lops, rawprop, maxsize=maxsize)
+
+                with mock.patch.object(snap, 'getLiftCount', getLiftCountCalls):
+                    self.len(6, await alist(snap.eval('inet:fqdn +{ #bad }>2')))
+                    self.len(6, await alist(snap.eval('inet:fqdn +{ #bad }>0')))
+
+                self.eq(calls, [2])
+
+                # subqueries which depend on the inbound node are run for each node
+                await alist(snap.eval('[ teststr=aa teststr=ab teststr=b ]'))
+                await alist(snap.eval('[ testint=1 :loc=a ]'))
+                await alist(snap.eval('[ testint=2 :loc=b ]'))
+
+                nodes = await alist(snap.eval('testint $x=:loc +{ teststr^=$x } = 2'))
+                self.eq([2], [n.ndef[1] for n in nodes])
+
+                mesgs = await alist(core.streamstorm('inet:fqdn +{ #bad | limit 1 }>2'))
+                self.len(1, [m for m in mesgs if m[0] == 'print' and m[1].get('mesg') == 'limit reached: 1'])
+
+                # the count command still prints the count
+                mesgs = await alist(core.streamstorm('inet:fqdn#bad | count | spin'))
+                self.isin('Counted 3 nodes.', [m[1].get('mesg') for m in mesgs if m[0] == 'print'])
+
     async def test_addNodeRace(self):
         ''' Test when a reader might retrieve a partially constructed node '''
         NUM_TASKS = 2
@@ -224,6 +410,36 @@ class SnapTest(s_t_utils.SynTest):
                 nodes = await alist(snap.getNodesBy('#woot', 1))
                 self.len(0, nodes)
 
+    async def test_snap_count_layers(self):
+
+        async with self.getTestCore() as core1:
+            node = (('inet:ipv4', 1), {'props': {'asn': 42}, 'tags': {'woot': (1, 2)}})
+            await alist(core1.addNodes([node]))
+            await core1.fini()
+
+            async with self._getTestCoreMultiLayer(core1.dirn) as core:
+
+                await alist(core.addNodes([(('inet:ipv4', 1), {'props': {'asn': 43}})]))
+                await alist(core.addNodes([(('inet:ipv4', 2), {'props': {'asn': 42}})]))
+
+                queries = (
+                    'inet:ipv4',
+                    'inet:ipv4:asn=42',
+                    'inet:ipv4:asn=43',
+                    'inet:ipv4#woot',
+                    '#woot',
+                    'inet:ipv4 | count',
+                )
+
+                async with await core.snap() as snap:
+                    for text in queries:
+                        with snap.getStormRuntime() as runt:
+                            count = await runt.getStormQueryCount(core.getStormQuery(text))
+                        self.nn(count)
+                        self.eq(count, len(await alist(snap.eval(text))))
+
+                self.eq(1, await core.count('inet:ipv4:asn=42'))
+
     async def test_cortex_lift_layers_dup(self):
         '''
         Test a two layer cortex where a lift operation might give the same node twice incorrectly
@@ -0,0 +1,72 @@
+import os
+
+import synapse.lib.spooled as s_spooled
+
+import synapse.tests.utils as s_t_utils
+
+class SpooledTest(s_t_utils.SynTest):
+
+    async def test_spooled_set(self):
+
+        with self.getTestDir() as dirn:
+
+            async with await s_spooled.Set.anit(size=2, dirn=dirn) as sset:
+
+                await sset.add(10)
+                await sset.add(10)
+                self.len(1, sset)
+                self.false(sset.fallback)
+
+                await sset.add(20)
+                self.true(sset.fallback)
+                self.len(1, os.listdir(dirn))
+
+                await sset.add(30)
+                await sset.add(30)
+                await sset.add(b'visi')
+
+                self.len(4, sset)
+                self.isin(10, sset)
+                self.isin(b'visi', sset)
+                self.notin(40, sset)
+
+                await sset.clear()
+                self.len(0, sset)
+                self.notin(10, sset)
+                self.false(sset.fallback)
+                self.len(0, os.listdir(dirn))
+
+                await sset.add(10)
+                await sset.add(20)
+                self.true(sset.fallback)
+
+            # the temporary slab is removed on fini
+            self.len(0, os.listdir(dirn))
+
+    async def test_spooled_dict(self):
+
+        async with await s_spooled.Dict.anit(size=2) as sdict:
+
+            await sdict.set('foo', 10)
+            await sdict.set('foo', 20)
+            self.len(1, sdict)
+            self.false(sdict.fallback)
+
+            await sdict.set('bar', (1, 2))
+            self.true(sdict.fallback)
+
+            await sdict.set('baz', 30)
+            await sdict.set('baz', 40)
+
+            self.len(3, sdict)
+            self.isin('baz', sdict)
+            self.notin('newp', sdict)
+            self.eq(20, sdict.get('foo'))
+            self.eq(40, sdict.get('baz'))
+            self.eq((1, 2), sdict.get('bar'))
+            self.none(sdict.get('newp'))
+            self.eq('hehe', sdict.get('newp', 'hehe'))
+
+            await sdict.clear()
+            self.len(0, sdict)
+            self.none(sdict.get('foo'))
@@ -1,3 +1,4 @@
+import os
 import asyncio
 
 import synapse.exc as s_exc
@@ -261,6 +262,33 @@ class StormTest(s_t_utils.SynTest):
             nodes = await alist(core.eval('testcomp -> * | uniq | count'))
             self.len(1, nodes)
 
+        # dedup sets which spill to disk give the same results
+        queries = (
+            ('inet:dns:a -> * | uniq', None),
+            ('inet:dns:a | noderefs --unique', None),
+            ('inet:dns:a | noderefs', None),
+            ('inet:dns:a', {'graph': True}),
+        )
+
+        results = []
+        for size in (100, 2):
+
+            async with self.getTestCore(conf={'storm:spool:size': size}) as core:
+
+                await core.eval('[ inet:dns:a=(woot.com, 1.2.3.4) inet:dns:a=(vertex.link, 1.2.3.4) ]').spin()
+                await core.eval('[ inet:dns:a=(vertex.link, 5.6.7.8) ]').spin()
+
+                results.append([[n.ndef for n in await alist(core.eval(q, opts=opts))] for q, opts in queries])
+
+                # the temporary slabs are removed when the queries finish
+                tmpdir = os.path.join(core.dirn, 'tmp')
+                self.eq(size == 2, os.path.isdir(tmpdir))
+                if size == 2:
+                    self.len(0, os.listdir(tmpdir))
+
+        self.eq(results[0], results[1])
+        self.len(4, results[1][0])
+
     async def test_storm_iden(self):
         async with self.getTestCore() as core:
             q = "[teststr=beep teststr=boop]"
@@ -508,3 +536,81 @@ class StormTest(s_t_utils.SynTest):
                                   core.eval('testguid | max test:newp'))
             await self.agenraises(s_exc.BadSyntaxError,
                                   core.eval('testguid | min test:newp'))
+
+    async def test_storm_topsort(self):
+
+        async with self.getTestCore() as core:
+
+            await core.eval('[ testint=10 :loc=us ]').spin()
+            await core.eval('[ testint=20 :loc=us ]').spin()
+            await core.eval('[ testint=30 :loc=ca ]').spin()
+            await core.eval('for $i in $vals { [ testint=$i ] }', opts={'vars': {'vals': (5, 15, 25, 35)}}).spin()
+
+            nodes = await core.eval('testint | top testint:loc').list()
+            self.eq(['us', 'us', 'ca'], [n.get('loc') for n in nodes])
+            self.eq([10, 20, 30], [n.ndef[1] for n in nodes])
+
+            nodes = await core.eval('testint | top .created --size 2').list()
+            self.len(2, nodes)
+
+            self.len(0, await core.eval('testint | top :loc --size 0').list())
+
+            nodes = await core.eval('testint | bottom :loc --size 1').list()
+            self.eq([30], [n.ndef[1] for n in nodes])
+
+            # ties keep the order the nodes arrived in
+            nodes = await core.eval('testint | bottom :loc --size 2').list()
+            self.eq([30, 10], [n.ndef[1] for n in nodes])
+
+            for budget in (1, 2, 3, 100):
+
+                nodes = await core.eval(f'testint | sort :loc --budget {budget}').list()
+                self.eq([30, 10, 20], [n.ndef[1] for n in nodes])
+
+                nodes = await core.eval(f'testint | sort :loc --reverse --budget {budget}').list()
+                self.eq([10, 20, 30], [n.ndef[1] for n in nodes])
+
+            # spilled runs are kept in the cortex tmp directory until the sort is done
+            tmpdir = os.path.join(core.dirn, 'tmp')
+            async for node in core.eval('testint | sort :loc --budget 1'):
+                self.len(1, os.listdir(tmpdir))
+
+            self.len(0, os.listdir(tmpdir))
+
+            # spilled nodes keep their path nodes
+            await core.eval('[ inet:dns:a=(woot.com, 1.2.3.4) inet:dns:a=(vertex.link, 5.6.7.8) ]').spin()
+            await core.eval('inet:ipv4=1.2.3.4 [ :asn=20 ]').spin()
+            await core.eval('inet:ipv4=5.6.7.8 [ :asn=10 ]').spin()
+
+            q = 'inet:dns:a -> inet:ipv4 | sort :asn --budget 1'
+            podes = await alist(core.iterStormPodes(q, opts={'path': True}))
+            self.eq([0x05060708, 0x01020304], [p[0][1] for p in podes])
+            self.len(2, podes[0][1]['path']['nodes'])
+
+            await self.agenraises(s_exc.BadSyntaxError, core.eval('testint | top testint'))
+            await self.agenraises(s_exc.BadSyntaxError, core.eval('testint | sort test:newp'))
+
+    async def test_storm_stats(self):
+
+        async with self.getTestCore() as core:
+
+            await core.eval('[ inet:ipv4=1.2.3.4 :asn=10 :loc=us ]').spin()
+            await core.eval('[ inet:ipv4=1.2.3.5 :asn=20 :loc=us ]').spin()
+            await core.eval('[ inet:ipv4=5.6.7.8 :asn=30 :loc=ca ]').spin()
+            await core.eval('[ inet:ipv4=9.9.9.9 ]').spin()
+
+            async def prints(text):
+                mesgs = await alist(core.streamstorm(text))
+                self.len(0, [m for m in mesgs if m[0] == 'node'])
+                return [m[1].get('mesg') for m in mesgs if m[0] == 'print']
+
+            self.eq(['count=4 sum=60 min=0 max=30'], await prints('inet:ipv4 | stats :asn'))
+            self.eq(['count=4 sum=None min=?? max=us'], await prints('inet:ipv4 | stats inet:ipv4:loc'))
+
+            self.eq(['??: count=1 sum=0 min=0 max=0', 'ca: count=1 sum=30 min=30 max=30', 'us: count=2 sum=30 min=10 max=20'],
+                    await prints('inet:ipv4 | stats :asn --by :loc'))
+
+            self.eq(['10: count=1 sum=None min=us max=us', '20: count=1 sum=None min=us max=us', '30: count=1 sum=None min=ca max=ca'],
+                    await prints('inet:ipv4:asn>=10 | stats :loc --by :asn'))
+
+            self.eq([], await prints('inet:ipv4 | stats :newp'))
@@ -0,0 +1,119 @@
+import synapse.exc as s_exc
+import synapse.common as s_common
+import synapse.cortex as s_cortex
+
+import synapse.lib.const as s_const
+import synapse.lib.stormpool as s_stormpool
+
+import synapse.tests.utils as s_t_utils
+from synapse.tests.utils import alist
+
+class StormPoolTest(s_t_utils.SynTest):
+
+    async def test_stormpool(self):
+
+        async with self.getTestCore(conf={'storm:pool:size': 1}) as core:
+
+            await core.eval('[ inet:ipv4=1.2.3.4 +#foo ]').spin()
+            await core.eval('[ inet:ipv4=5.6.7.8 ]').spin()
+
+            opts = {'readonly': True}
+
+            pool = core.stormpool
+
+            self.true(pool.canRunQuery(core.getStormQuery('inet:ipv4 | uniq | count')))
+            self.false(pool.canRunQuery(core.getStormQuery('[ inet:ipv4=1.1.1.1 ]')))
+            self.false(pool.canRunQuery(core.getStormQuery('inet:ipv4 | delnode')))
+            self.false(pool.canRunQuery(core.getStormQuery('test:runt')))
+
+            msgs = await alist(core.streamstorm('inet:ipv4 +#foo | count', opts=opts))
+            nodes = [m[1] for m in msgs if m[0] == 'node']
+            self.len(1, nodes)
+            self.eq(nodes[0][0], ('inet:ipv4', 0x01020304))
+            self.printed(msgs, 'Counted 1 nodes.')
+            self.eq(1, msgs[-1][1]['count'])
+
+            # workers see the uncommitted edits of the cortex
+            await core.eval('[ inet:ipv4=9.9.9.9 ]').spin()
+
+            msgs = await alist(core.streamstorm('inet:ipv4', opts=opts))
+            self.eq(3, msgs[-1][1]['count'])
+
+            # abandoning a query discards the worker
+            genr = pool.storm('inet:ipv4', opts=opts)
+            async for mesg in genr:
+                break
+
+            await genr.aclose()
+            self.len(0, pool.idle)
+
+            msgs = await alist(core.streamstorm('inet:ipv4 | limit 2', opts=opts))
+            self.eq(2, msgs[-1][1]['count'])
+
+            # errors are returned as messages
+            msgs = await alist(core.streamstorm('inet:ipv4=newp', opts=opts))
+            self.eq('BadTypeValu', [m for m in msgs if m[0] == 'err'][0][1][0])
+
+            # workers which return an error are discarded
+            self.len(0, pool.idle)
+
+            # the readonly option is enforced by the workers and the cortex
+            msgs = await alist(core.streamstorm('[ inet:ipv4=1.1.1.1 ]', opts=opts))
+            self.eq('IsReadOnly', [m for m in msgs if m[0] == 'err'][0][1][0])
+
+            msgs = await alist(core.streamstorm('inet:ipv4 | graph --pivot { [ +#bar ] }', opts=opts))
+            self.eq('IsReadOnly', [m for m in msgs if m[0] == 'err'][0][1][0])
+
+            await self.agenraises(s_exc.IsReadOnly, core.eval('inet:ipv4 [ +#bar ]', opts=opts))
+            self.len(0, await alist(core.eval('syn:tag=bar')))
+
+            # runt nodes are lifted by the cortex
+            msgs = await alist(core.streamstorm('test:runt', opts=opts))
+            self.eq(4, msgs[-1][1]['count'])
+
+            # workers which fail to start raise their error
+            info = pool.getWorkerInfo()
+            info['layers'] = [s_common.genpath(core.dirn, 'newp')]
+            await self.asyncraises(s_exc.NoSuchName, s_stormpool.Worker.anit(info))
+
+            stat = (await core.stat())['storm:pool']
+            self.eq(6, stat['queries'])
+            self.eq(3, stat['workers'])
+            self.eq(0, stat['idle'])
+
+        async with self.getTestCore() as core:
+            self.none(core.stormpool)
+            self.none((await core.stat())['storm:pool'])
+            msgs = await alist(core.streamstorm('inet:ipv4', opts={'readonly': True}))
+            self.eq(0, msgs[-1][1]['count'])
+
+    async def test_stormpool_mapsize(self):
+
+        conf = {'storm:pool:size': 1, 'layer:lmdb:mapsize': s_const.mebibyte}
+
+        with self.getTestDir() as dirn:
+
+            s_common.yamlsave(conf, dirn, 'cell.yaml')
+
+            async with await s_cortex.Cortex.anit(dirn) as core:
+
+                opts = {'readonly': True}
+
+                await core.eval('[ inet:ipv4=1.2.3.4 ]').spin()
+
+                msgs = await alist(core.streamstorm('inet:ipv4', opts=opts))
+                self.eq(1, msgs[-1][1]['count'])
+                self.len(1, core.stormpool.idle)
+
+                # the idle worker reads the layer once the cortex has grown its map
+                mapsize = core.layer.layrslab.mapsize
+                await alist(core.addNodes([(('it:dev:str', f'{i}' + 'V' * 100000), {}) for i in range(30)]))
+                await core.eval('[ inet:ipv4=5.6.7.8 ]').spin()
+                self.gt(core.layer.layrslab.mapsize, mapsize)
+
+                msgs = await alist(core.streamstorm('inet:ipv4', opts=opts))
+                self.eq([], [m for m in msgs if m[0] == 'err'])
+                self.eq(2, msgs[-1][1]['count'])
+
+                msgs = await alist(core.streamstorm('it:dev:str', opts=opts))
+                self.eq(30, msgs[-1][1]['count'])
@@ -1,10 +1,13 @@
 import os
 import ssl
 import shutil
+import time
 import socket
 import asyncio
 import logging
 import threading
+import collections
+import unittest.mock as mock
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +16,7 @@ import synapse.common as s_common
 import synapse.telepath as s_telepath
 
 import synapse.lib.coro as s_coro
+import synapse.lib.link as s_link
 import synapse.lib.share as s_share
 import synapse.lib.certdir as s_certdir
 
@@ -48,6 +52,9 @@ class Foo:
         self.retnwait = threading.Event()
         self.genrexited = False
 
+        self.genrcount = 0
+        self.genrclosed = asyncio.Event()
+
     def bar(self, x, y):
         return x + y
 
@@ -76,6 +83,22 @@ class Foo:
         await asyncio.sleep(5)
         return 42
 
+    async def sleep(self, x):
+        await asyncio.sleep(x)
+        return x
+
+    async def fastgenr(self, x):
+        for i in range(x):
+            yield i
+
+    async def countgenr(self, x):
+        try:
+            for i in range(x):
+                self.genrcount = i + 1
+                yield i
+        finally:
+            self.genrclosed.set()
+
     async def corogenr(self, x):
         for i in range(x):
             yield i
@@ -336,6 +359,256 @@ class TeleTest(s_t_utils.SynTest):
 
             await self.asyncraises(s_exc.IsFini, asyncio.wait_for(task, timeout=2))
 
+    async def test_telepath_yields(self):
+
+        foo = Foo()
+
+        async with self.getTestDmon() as dmon:
+
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('foo', foo)
+
+            # count the messages received by the client
+            mesgs = collections.Counter()
+            linkrx = s_link.Link.rx
+
+            async def rx(link):
+                mesg = await linkrx(link)
+                if mesg is not None:
+                    mesgs[mesg[0]] += 1
+                return mesg
+
+            async def genrate(count):
+
+                async with await s_telepath.openurl('tcp://127.0.0.1/foo', port=addr[1]) as prox:
+
+                    mesgs.clear()
+
+                    tick = time.perf_counter()
+                    with mock.patch.object(s_link.Link, 'rx', rx):
+                        self.eq(list(range(count)), [x async for x in await prox.fastgenr(count)])
+                    took = time.perf_counter() - tick
+
+                    # sync generators and errors after some items
+                    self.eq((10, 20, 30), await alist(await prox.genr()))
+
+                    items = []
+                    with self.raises(s_exc.SynErr):
+                        async for item in await prox.corogenr('fred'):
+                            items.append(item)
+
+                    # slow generators deliver items before they are done
+                    genr = (await prox.corogenr(10)).genr
+                    self.eq(0, await asyncio.wait_for(genr.__anext__(), timeout=1))
+                    await genr.aclose()
+
+                return count / took
+
+            batched = await genrate(20000)
+
+            # the items arrive in a few batches followed by the end message
+            self.lt(mesgs['t2:yields'], 200)
+            self.eq(mesgs['t2:yield'], 1)
+
+            # clients which do not advertise t2:yields receive one message per item
+            with mock.patch('synapse.telepath.telefeats', ()):
+                legacy = await genrate(20000)
+
+            self.eq(mesgs['t2:yields'], 0)
+            self.eq(mesgs['t2:yield'], 20001)
+
+            logger.info('telepath genr items/sec: t2:yields=%d t2:yield=%d', batched, legacy)
+
+    async def test_telepath_credit(self):
+
+        foo = Foo()
+
+        async with self.getTestDmon() as dmon:
+
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('foo', foo)
+
+            with mock.patch('synapse.telepath.genrcredit', 10):
+
+                async with await s_telepath.openurl('tcp://127.0.0.1/foo', port=addr[1]) as prox:
+
+                    self.eq(prox.feats, {'t2:credit', 't2:yields'})
+
+                    self.eq(30, await prox.bar(10, 20))
+                    link = prox.links[0]
+
+                    # the server only runs the generator ahead of the consumer by the credit
+                    genr = (await prox.countgenr(1000)).genr
+                    self.eq(0, await genr.__anext__())
+
+                    await asyncio.sleep(0.2)
+                    self.eq(10, foo.genrcount)
+
+                    self.eq(list(range(1, 8)), [await genr.__anext__() for i in range(7)])
+
+                    await asyncio.sleep(0.2)
+                    self.eq(15, foo.genrcount)
+
+                    # cancelling the stream closes the generator and keeps the link
+                    self.len(0, prox.links)
+
+                    await genr.aclose()
+                    await asyncio.wait_for(foo.genrclosed.wait(), timeout=2)
+                    self.lt(foo.genrcount, 1000)
+
+                    await asyncio.sleep(0.1)
+                    self.len(1, prox.links)
+                    self.true(prox.links[0] is link)
+                    self.false(link.isfini)
+
+                    # streams longer than the credit complete normally
+                    self.eq(list(range(1000)), await alist(await prox.countgenr(1000)))
+                    self.eq((10, 20, 30), await alist(await prox.genr()))
+
+                    self.len(1, prox.links)
+                    self.true(prox.links[0] is link)
+
+            # clients which do not advertise t2:credit fini the link to cancel a stream
+            foo.genrclosed.clear()
+            with mock.patch('synapse.telepath.telefeats', ('t2:yields',)):
+
+                async with await s_telepath.openurl('tcp://127.0.0.1/foo', port=addr[1]) as prox:
+
+                    self.eq(prox.feats, {'t2:yields'})
+
+                    self.eq(30, await prox.bar(10, 20))
+                    link = prox.links[0]
+
+                    genr = (await prox.countgenr(100000)).genr
+                    self.eq(0, await genr.__anext__())
+
+                    await genr.aclose()
+
+                    self.true(link.isfini)
+                    self.len(0, prox.links)
+
+                    self.eq(list(range(10)), await alist(await prox.countgenr(10)))
+
+    async def test_telepath_pool(self):
+
+        foo = Foo()
+
+        async with self.getTestDmon() as dmon:
+
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('foo', foo)
+
+            url = 'tcp://127.0.0.1/foo?pool:min=2&pool:max=3&pool:idle=0.2'
+            async with await s_telepath.openurl(url, port=addr[1]) as prox:
+
+                self.eq(prox.conf.get('pool:min'), 2)
+                self.eq(prox.conf.get('pool:idle'), 0.2)
+
+                # the pool is prewarmed with pool:min links
+                stats = prox.getPoolStats()
+                self.eq(2, stats['size'])
+                self.eq(2, stats['idle'])
+                self.eq(2, stats['opened'])
+
+                self.eq(30, await prox.bar(10, 20))
+                self.eq(1, prox.getPoolStats()['reused'])
+
+                # links above pool:max are closed when the calls are done
+                self.eq([0.1] * 10, await asyncio.gather(*[prox.sleep(0.1) for i in range(10)]))
+
+                stats = prox.getPoolStats()
+                self.eq(10, stats['opened'])
+                self.eq(7, stats['closed'])
+                self.eq(3, stats['size'])
+                self.eq(3, stats['idle'])
+                self.eq(0, stats['busy'])
+
+                # idle links above pool:min are closed
+                await asyncio.sleep(0.5)
+
+                stats = prox.getPoolStats()
+                self.eq(2, stats['size'])
+                self.eq(1, stats['reaped'])
+
+            # malformed option values raise BadUrl
+            url = 'tcp://127.0.0.1/foo?pool:min=x'
+            await self.asyncraises(s_exc.BadUrl, s_telepath.openurl(url, port=addr[1]))
+
+            url = 'tcp://127.0.0.1/foo?pool:idle=abc'
+            await self.asyncraises(s_exc.BadUrl, s_telepath.openurl(url, port=addr[1]))
+
+            # pool:idle=0 keeps idle links open
+            url = 'tcp://127.0.0.1/foo?pool:min=0&pool:idle=0'
+            async with await s_telepath.openurl(url, port=addr[1]) as prox:
+
+                self.eq(30, await prox.bar(10, 20))
+                await asyncio.sleep(0.2)
+
+                stats = prox.getPoolStats()
+                self.eq(1, stats['size'])
+                self.eq(0, stats['reaped'])
+
+            # connecting a pool link is retried with a backoff
+            connect = s_link.connect
+            fails = [ConnectionRefusedError(), ConnectionRefusedError()]
+
+            async def flaky(host, port, ssl=None):
+                if fails:
+                    raise fails.pop()
+                return await connect(host, port, ssl=ssl)
+
+            opts = {'pool:backoff': 0.01}
+            async with await s_telepath.openurl('tcp://127.0.0.1/foo', port=addr[1], **opts) as prox:
+
+                with mock.patch('synapse.lib.link.connect', flaky):
+                    self.eq(30, await prox.bar(10, 20))
+
+                stats = prox.getPoolStats()
+                self.eq(1, stats['opened'])
+                self.eq(2, stats['retries'])
+
+                fails.extend([ConnectionRefusedError()] * 4)
+                await prox.links[0].fini()
+
+                with mock.patch('synapse.lib.link.connect', flaky):
+                    with self.raises(ConnectionRefusedError):
+                        await prox.bar(10, 20)
+
+                self.eq(5, prox.getPoolStats()['retries'])
+
+    async def test_telepath_zip(self):
+
+        foo = Foo()
+        best = list(s_link.zipcodecs.keys())[0]
+
+        async with self.getTestDmon() as dmon:
+
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('foo', foo)
+
+            async with await s_telepath.openurl('tcp://127.0.0.1/foo', port=addr[1]) as prox:
+                self.none(prox.zip)
+                self.none(prox.link.zip)
+
+            with self.raises(s_exc.BadOptValu):
+                await s_telepath.openurl('tcp://127.0.0.1/foo?zip=newp', port=addr[1])
+
+            async with await s_telepath.openurl('tcp://127.0.0.1/foo?zip=zlib', port=addr[1]) as prox:
+                self.eq('zlib', prox.zip)
+
+            async with await s_telepath.openurl('tcp://127.0.0.1/foo?zip=auto&zip:size=100', port=addr[1]) as prox:
+
+                self.eq(best, prox.zip)
+                self.eq(100, prox.link.zipsize)
+
+                valu = ('V' * 100000, b'V' * 100000)
+                self.eq(valu, await prox.echo(valu))
+                self.eq(list(range(20000)), await alist(await prox.fastgenr(20000)))
+
+                # pool links are compressed on both sides
+                self.nn(prox.links[0].zip)
+                self.len(1, [s for s in dmon.sessions.values() if s.zip == (best, 100)])
+
     async def test_telepath_blocking(self):
         ''' Make sure that async methods on the same proxy don't block each other '''
 